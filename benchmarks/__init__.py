@@ -0,0 +1,5 @@
+"""Glow Navigator Benchmarks
+
+Synthetic Glow source trees and timings of building and
+querying the graph at sizes beyond the test fixtures
+"""
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glow Navigator Build Benchmark
+
+Time each phase of building the graph from synthetic trees
+of several sizes and report files per second and peak memory.
+Each build runs in its own process so memory is not shared.
+With --update the graph of each tree is also updated after
+a template changes, as a check run does
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+# external libraries
+import click
+
+from . common import (
+    load_results,
+    peak_rss_mb,
+    print_regressions,
+    regressions,
+    save_results,
+    synthetic_trees)
+
+COMPARE_KEYS = ("seconds", "peak_rss_mb")
+
+
+def quietly(func, *args):
+    """Return the result of func with the progress bars kept off the results
+    """
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        return func(*args)
+    finally:
+        sys.stdout = stdout
+
+def measure_build(root, update=False):
+    """Return the timings of building the graph for the tree at root
+
+    With update the graph is built untimed and the timings
+    are of updating it after one template has changed
+    """
+    from glow_navigator.glow_navigator import GraphBuild, create_graph, update_graph
+    from glow_navigator.glow_utils import glow_file_object
+    os.chdir(root)
+    build = GraphBuild()
+    if update:
+        graph = quietly(create_graph, None)
+        template_file = sorted(glob.glob(os.path.abspath(glow_file_object("template")["path"])))[0]
+        with open(template_file) as f:
+            contents = f.read()
+        with open(template_file, "a") as f:
+            f.write("# changed\n")
+        try:
+            start_time = time.time()
+            files = len(quietly(update_graph, graph, build))
+            seconds = time.time() - start_time
+        finally:
+            with open(template_file, "w") as f:
+                f.write(contents)
+    else:
+        start_time = time.time()
+        graph = quietly(create_graph, None, build)
+        seconds = time.time() - start_time
+        files = sum(phase["items"] for phase in build.phases
+                    if phase["phase"].startswith(("Loading", "Analysing")))
+    return {
+        "files":            files,
+        "nodes":            graph.number_of_nodes(),
+        "edges":            graph.number_of_edges(),
+        "seconds":          seconds,
+        "files_per_second": files / seconds if seconds else 0,
+        "peak_rss_mb":      peak_rss_mb(),
+        "phases":           build.phases
+        }
+
+def run_measure(root, update=False):
+    """Return the timings from building the tree in a new process
+    """
+    command = [sys.executable, "-m", "benchmarks.bench_build", "--measure", root]
+    if update:
+        command.append("--measure-update")
+    output = subprocess.check_output(command)
+    return json.loads(output.splitlines()[-1])
+
+def print_result(name, result):
+    """Display the phases and totals of a build
+    """
+    print()
+    print("{}: {} files, {} nodes, {} edges".format(
+        name, result["files"], result["nodes"], result["edges"]))
+    print()
+    for phase in result["phases"]:
+        rate = phase["items"] / phase["seconds"] if phase["seconds"] else 0
+        print("  {:<28} {:>8} {:>9.3f}s {:>10.0f}/s".format(
+            phase["phase"], phase["items"], phase["seconds"], rate))
+    print("  {:<28} {:>8} {:>9.3f}s {:>10.0f}/s".format(
+        "Total", result["files"], result["seconds"], result["files_per_second"]))
+    if result["peak_rss_mb"] is None:
+        print("  Peak RSS n/a")
+    else:
+        print("  Peak RSS {:.1f} MB".format(result["peak_rss_mb"]))
+
+
+@click.command()
+@click.option("--sizes", default="1000,5000", help="Comma separated numbers of files")
+@click.option("--root", default=None, type=click.Path(file_okay=False),
+              help="Keep the generated trees here and reuse them")
+@click.option("--output", default=None, help="Save the results as JSON")
+@click.option("--baseline", default=None, type=click.Path(exists=True, dir_okay=False),
+              help="Results to compare with")
+@click.option("--threshold", default=20.0, help="Percent slower that counts as a regression")
+@click.option("--payload", default=1, help="Multiply the embedded XML of each object")
+@click.option("--update", is_flag=True,
+              help="Also time updating the graph after a template changes")
+@click.option("--measure", default=None, hidden=True)
+@click.option("--measure-update", is_flag=True, hidden=True)
+def main(sizes, root, output, baseline, threshold, payload, update,
+         measure, measure_update):
+    # pylint: disable=too-many-arguments
+    """Benchmark building the graph from synthetic Glow trees
+    """
+    if measure:
+        print(json.dumps(measure_build(measure, measure_update)))
+        return
+
+    results = {}
+    sizes = [int(x) for x in sizes.split(",") if x.strip()]
+    with synthetic_trees(sizes, root, payload) as trees:
+        for size, tree in trees:
+            name = "build {}".format(size) if payload == 1 else "build {}x{}".format(size, payload)
+            results[name] = run_measure(tree)
+            print_result(name, results[name])
+            if update:
+                results[name + " update"] = run_measure(tree, update=True)
+                print_result(name + " update", results[name + " update"])
+
+    if output:
+        save_results(results, output)
+    if baseline:
+        found = regressions(load_results(baseline), results, COMPARE_KEYS, threshold)
+        if print_regressions(found, threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glow Navigator Query Benchmark
+
+Time fixed query workloads over the graphs of synthetic trees
+of several sizes and report p50 / p95 / p99 latency: literal,
+lookahead and EDGE_MATCH searches, shallow and deep expansions,
+hub nodes, node details and property resolution
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+import math
+import os
+import sys
+import time
+
+# external libraries
+import click
+
+from . common import (
+    load_results,
+    print_regressions,
+    regressions,
+    save_results,
+    synthetic_trees)
+
+COMPARE_KEYS = ("p50", "p95")
+GRAPH_FILE = "glow_query.pickle"
+TARGETS = 10
+
+
+def load_tree_graph(root):
+    """Return the graph of the tree at root
+
+    The graph is built once and cached in the tree
+    """
+    from glow_navigator.glow_graph import graph_class
+    from glow_navigator.glow_navigator import (
+        CacheLoader, create_graph, save_graph)
+    file_name = os.path.join(root, GRAPH_FILE)
+    if os.path.isfile(file_name):
+        return CacheLoader(file_name).wait()
+    # import the graph class while the package is still on the path
+    graph_class()
+    cwd = os.getcwd()
+    os.chdir(root)
+    # keep the progress bars off the results
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        graph = create_graph(cache_file=None)
+    finally:
+        sys.stdout = stdout
+        os.chdir(cwd)
+    save_graph(graph, file_name)
+    return graph
+
+def spread(items, count=TARGETS):
+    """Return up to count items evenly spread over sorted items
+    """
+    items = sorted(items)
+    step = max(1, len(items) // count)
+    return items[::step][:count]
+
+def percentile(values, percent):
+    """Return the nearest rank percentile of sorted values
+    """
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+def workloads(graph):
+    """Return (name, calls) for each query workload over graph
+
+    Each call is one query, repeated in turn for each run
+    """
+    from glow_navigator.glow_navigator import (
+        GlowSession, add_property_edge_if_exists, get_node_data)
+    by_type = {}
+    for node, node_data in graph.nodes_iter(data=True):
+        by_type.setdefault(node_data.get("type"), []).append(node)
+    templates = spread(by_type.get("template", []))
+    modules = spread(by_type.get("module", []))
+    hubs = [node for node, _ in sorted(graph.in_degree().iteritems(),
+                                       key=lambda item: (-item[1], item[0]))[:TARGETS]]
+    shallow = GlowSession(graph, max_level=1)
+    deep = GlowSession(graph, max_level=0)
+    edges = GlowSession(graph, edge_match=True)
+
+    def details(node):
+        """Display a node as the navigator does when selected
+        """
+        shallow.print_selected_node(0, [(node, get_node_data(graph, node))])
+
+    return [
+        ("select literal", [
+            lambda n=n: shallow.select(r"name: Template {}\b".format(n))
+            for n in range(TARGETS)]),
+        ("select lookahead", [
+            lambda n=n: shallow.select(r"^(?=.*type: template)(?=.*Template {}\b)".format(n))
+            for n in range(TARGETS)]),
+        ("select edges", [
+            lambda n=n: edges.select(r"name: Tile {}\b".format(n))
+            for n in range(TARGETS)]),
+        ("expand shallow", [
+            lambda node=node: list(shallow.entries(node, graph.successors))
+            for node in templates]),
+        ("expand deep", [
+            lambda node=node: list(deep.entries(node, graph.successors))
+            for node in modules]),
+        ("expand hub", [
+            lambda node=node: list(shallow.entries(node, graph.predecessors))
+            for node in hubs]),
+        ("print node", [
+            lambda node=node: details(node)
+            for node in templates]),
+        # unresolved properties fall back to a search and add no edges
+        ("property lookup", [
+            lambda node=node: add_property_edge_if_exists(
+                graph, node, "ISynthetic.Unknown{}".format(node[:8]), {})
+            for node in templates]),
+        ]
+
+def measure_queries(graph, runs):
+    """Return the latency in ms of each workload over graph
+    """
+    results = {}
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        for name, calls in workloads(graph):
+            if not calls:
+                continue
+            latencies = []
+            for run in range(runs):
+                call = calls[run % len(calls)]
+                start_time = time.time()
+                call()
+                latencies.append((time.time() - start_time) * 1000)
+            latencies.sort()
+            results[name] = {
+                "runs":  runs,
+                "p50":   percentile(latencies, 50),
+                "p95":   percentile(latencies, 95),
+                "p99":   percentile(latencies, 99)
+                }
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return results
+
+def print_results(size, graph, results):
+    """Display the latencies of the workloads for one size
+    """
+    print()
+    print("{} files: {} nodes, {} edges".format(
+        size, graph.number_of_nodes(), graph.number_of_edges()))
+    print()
+    print("  {:<20} {:>10} {:>10} {:>10}".format("ms", "p50", "p95", "p99"))
+    for name, result in sorted(results.iteritems()):
+        print("  {:<20} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+            name, result["p50"], result["p95"], result["p99"]))
+
+
+@click.command()
+@click.option("--sizes", default="500,1000,2000", help="Comma separated numbers of files")
+@click.option("--root", default=None, type=click.Path(file_okay=False),
+              help="Keep the generated trees and graphs here and reuse them")
+@click.option("--runs", default=50, help="Queries timed per workload")
+@click.option("--output", default=None, help="Save the results as JSON")
+@click.option("--baseline", default=None, type=click.Path(exists=True, dir_okay=False),
+              help="Results to compare with")
+@click.option("--threshold", default=20.0, help="Percent slower that counts as a regression")
+@click.option("--backends", default="networkx",
+              help="Comma separated graph backends to query, see glow_graph")
+def main(sizes, root, runs, output, baseline, threshold, backends):
+    # pylint: disable=too-many-arguments
+    """Benchmark query latency over graphs of synthetic Glow trees
+    """
+    from glow_navigator.glow_graph import DEFAULT_BACKEND, convert_graph
+    backends = [x.strip() for x in backends.split(",") if x.strip()]
+    results = {}
+    with synthetic_trees([int(x) for x in sizes.split(",") if x.strip()], root) as trees:
+        for size, tree in trees:
+            graph = load_tree_graph(tree)
+            for backend in backends:
+                latencies = measure_queries(convert_graph(graph, backend), runs)
+                # networkx results keep the names of earlier baselines
+                label = size if backend == DEFAULT_BACKEND else "{} {}".format(size, backend)
+                print_results(label, graph, latencies)
+                for name, result in latencies.iteritems():
+                    results["{} {}".format(name, label)] = result
+
+    if output:
+        save_results(results, output)
+    if baseline:
+        found = regressions(load_results(baseline), results, COMPARE_KEYS, threshold)
+        if print_regressions(found, threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glow Navigator Benchmark Helpers
+
+Peak memory, saved results and comparison with a baseline
+shared by the benchmark suites
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+from contextlib import contextmanager
+import json
+import os
+import platform
+import shutil
+import tempfile
+
+from glow_navigator.glow_memory import peak_rss
+
+from . synthetic import generate_tree
+
+
+def peak_rss_mb():
+    """Return the peak resident memory of this process in MB
+
+    None where the platform does not report it
+    """
+    peak = peak_rss()
+    if peak is None:
+        return None
+    return peak / 1048576.0
+
+@contextmanager
+def synthetic_trees(sizes, root=None, payload=1):
+    """Provide (size, folder) of a synthetic tree for each size
+
+    Trees are kept and reused under root if given
+    otherwise they are removed afterwards
+    """
+    folder = root or tempfile.mkdtemp()
+    try:
+        trees = []
+        for size in sizes:
+            name = "glow_{}".format(size) if payload == 1 else "glow_{}x{}".format(size, payload)
+            tree = os.path.join(folder, name)
+            if not os.path.isdir(tree):
+                generate_tree(tree, size, payload=payload)
+            trees.append((size, tree))
+        yield trees
+    finally:
+        if root is None:
+            shutil.rmtree(folder)
+
+def save_results(results, file_name):
+    """Save results keyed by benchmark name as JSON
+    """
+    with open(file_name, "w") as f:
+        json.dump({"python": platform.python_version(), "results": results},
+                  f, indent=2, sort_keys=True)
+
+def load_results(file_name):
+    """Return the results saved in a file
+    """
+    with open(file_name) as f:
+        return json.load(f)["results"]
+
+def regressions(baseline, results, keys, threshold):
+    """Return (name, key, before, after) for each regression
+
+    A value regresses when it is more than threshold percent
+    above the baseline. Benchmarks or values missing from either
+    are skipped
+    """
+    found = []
+    for name, result in sorted(results.iteritems()):
+        before = baseline.get(name, {})
+        for key in keys:
+            if before.get(key) and result.get(key) is not None:
+                if result[key] > before[key] * (1 + threshold / 100.0):
+                    found.append((name, key, before[key], result[key]))
+    return found
+
+def print_regressions(found, threshold):
+    """Display the regressions and return True if there were any
+    """
+    print()
+    if not found:
+        print("No regressions beyond {}%".format(threshold))
+        return False
+    print("Regressions beyond {}%:".format(threshold))
+    for name, key, before, after in found:
+        print("  {:<30} {:<20} {:>10.3f} -> {:>10.3f} ({:+.0f}%)".format(
+            name, key, before, after, (after / before - 1) * 100))
+    return True
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-builtin
+
+"""Glow Navigator Synthetic Source
+
+Generate a Glow source tree of a given size with the same
+layout and kinds of references as a real one: entities with
+properties and rules, metadata, indexes, conditions, formflows
+with workflow XML, templates with tiles, bindings and search
+lists, modules, images, sounds and business tests
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+import os
+import random
+from xml.sax.saxutils import quoteattr
+import uuid
+
+# external libraries
+import click
+import yaml
+
+from glow_navigator.glow_config import settings
+
+# share of the files for each type of object, each
+# entity also has a metadata and an index file
+SHARES = (
+    ("entity",    0.05),
+    ("condition", 0.20),
+    ("formflow",  0.15),
+    ("template",  0.32),
+    ("module",    0.01),
+    ("image",     0.05),
+    ("sound",     0.01),
+    ("test",      0.11)
+    )
+
+PROPERTIES = 12
+MISSING = 0.02
+
+
+class SyntheticTree(object):
+    """Names and references shared by the generated files
+
+    Every reference is to an object that is generated
+    except for a small share left undefined on purpose.
+    Payload multiplies the activities of each workflow and
+    the controls of each template for large embedded XML
+    """
+
+    def __init__(self, files, seed=1, payload=1):
+        self.random = random.Random(seed)
+        self.payload = payload
+        self.counts = dict((kind, max(1, int(files * share))) for kind, share in SHARES)
+        self.entities = ["ISynthetic{}".format(n) for n in range(self.counts["entity"])]
+        self.conditions = [self.guid() for _ in range(self.counts["condition"])]
+        self.templates = [(self.guid(), "Template {}".format(n))
+                          for n in range(self.counts["template"])]
+        self.formflows = [(self.guid(), "Formflow {}".format(n))
+                          for n in range(self.counts["formflow"])]
+        self.images = [self.guid() for _ in range(self.counts["image"])]
+        self.sounds = [self.guid() for _ in range(self.counts["sound"])]
+        self.modules = sorted(set(self.code() for _ in range(self.counts["module"] * 2)))
+        self.modules = self.modules[:self.counts["module"]]
+
+    def guid(self):
+        """Return a random guid
+        """
+        return str(uuid.UUID(int=self.random.getrandbits(128)))
+
+    def code(self):
+        """Return a random three letter code
+        """
+        return "".join(self.random.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3))
+
+    def pick(self, items):
+        """Return a random item or sometimes an undefined reference
+        """
+        if self.random.random() < MISSING:
+            missing = self.guid()
+            return (missing, "Missing {}".format(missing)) if isinstance(items[0], tuple) else missing
+        return self.random.choice(items)
+
+    def prop(self):
+        """Return a random property name, sometimes a dotted path
+        """
+        name = "Prop{}".format(self.random.randrange(PROPERTIES))
+        if self.random.random() < 0.2:
+            name = "Parent.{}".format(name)
+        return name
+
+    ## objects
+
+    def entity(self, name):
+        """Return an entity with property rules
+        """
+        properties = {}
+        for n in range(PROPERTIES):
+            rules = [{"ruleType": "VAL",
+                      "methodName": "Validate{}".format(n),
+                      "conditionIds": [self.pick(self.conditions)]}]
+            if n % 4 == 0:
+                rules.append({"ruleType": "PRP", "methodName": "Calculate{}".format(n)})
+            properties["Prop{}".format(n)] = rules
+        properties["Close"] = [{"ruleType": "CMD", "methodName": "Close"}]
+        return {"name": name, "properties": properties}
+
+    def metadata(self, name):
+        """Return entity metadata with an aggregate property
+        """
+        return {
+            "entityType": name,
+            "metaData": {"readOnly": {"conditionId": self.pick(self.conditions)},
+                         "icon": self.pick(self.images)},
+            "properties": {"Lines": {"collectionAggregate": [
+                {"aggregateMode": "Sum",
+                 "name": "Total Lines",
+                 "propertyPath": self.prop().split(".")[-1]}]}}
+            }
+
+    def index(self, name):
+        """Return the index fields of an entity
+        """
+        return {"entityType": name,
+                "indexFields": [{"name": "Field{}".format(n), "propertyPath": "Prop{}".format(n)}
+                                for n in range(4)]}
+
+    def condition(self):
+        """Return a condition on some properties
+        """
+        paths = "".join('<simpleConditionExpression path="{}" />'.format(self.prop())
+                        for _ in range(self.random.randint(1, 3)))
+        return {
+            "code":        "Condition {}".format(self.random.getrandbits(32)),
+            "entityName":  self.random.choice(self.entities),
+            "description": "Synthetic condition",
+            "expression":  "<conditionExpression>{}</conditionExpression>".format(paths)
+            }
+
+    def formflow(self, guid, name):
+        """Return a formflow with tasks and workflow XML
+        """
+        activities = []
+        for n in range(self.random.randint(2, 8) * self.payload):
+            kind = self.random.random()
+            attrs = 'ResKey="{}" DisplayName="Step {}" sap:HintSize="200,{}"'.format(
+                self.guid(), n, n * 40)
+            if kind < 0.5:
+                activities.append('<p:ShowFormActivity {} FormPK="{}" />'.format(
+                    attrs, self.pick(self.templates)[0]))
+            elif kind < 0.65:
+                activities.append('<p:JumpToActivity {} WorkflowTemplatePK="{}" />'.format(
+                    attrs, self.pick(self.formflows)[0]))
+            elif kind < 0.85:
+                activities.append('<p:ConditionalIfActivity {} SelectedCondition="{}" />'.format(
+                    attrs, self.pick(self.conditions)))
+            elif kind < 0.95:
+                activities.append('<p:RunCommandActivity {} RuleName="Close" />'.format(attrs))
+            else:
+                activities.append('<p:PlayAudioActivity {} AudioPK="{}" />'.format(
+                    attrs, self.pick(self.sounds)))
+        definition = (
+            '<Activity xmlns="http://schemas.microsoft.com/netfx/2009/xaml/activities" '
+            'xmlns:p="http://cargowise.com/glow/bpm/activities" '
+            'xmlns:sap="http://schemas.microsoft.com/netfx/2009/xaml/activities/presentation">'
+            '<p:TaskActivitiesContainer DisplayName="Workflow">{}'
+            '</p:TaskActivitiesContainer></Activity>').format("".join(activities))
+        return {
+            "VM_PK":                 guid,
+            "VM_Name":               name,
+            "VM_EntityType":         self.random.choice(self.entities),
+            "VM_IsActive":           True,
+            "VM_SK_Image":           self.pick(self.images),
+            "BPMWorkflowTmplConds":  [{"VWT_ConditionId": self.pick(self.conditions),
+                                       "VWT_PK": self.guid()}],
+            "BPMTaskTmpls":          [{"VR_PK": self.guid(),
+                                       "VR_Description": "Task",
+                                       "VR_Type": "FRM",
+                                       "VR_VZ_Form": self.pick(self.templates)[0]}],
+            "VM_WorkflowDefinition": definition
+            }
+
+    def template(self, guid, name):
+        """Return a template with tiles, bindings and search lists
+        """
+        def placeholders(**values):
+            """Return placeholder elements for the values
+            """
+            return "".join('<placeholder name="{}" value={} />'.format(k, quoteattr(v))
+                           for k, v in sorted(values.iteritems()))
+
+        controls = []
+        for n in range(self.random.randint(4, 16) * self.payload):
+            kind = self.random.random()
+            control_id = self.guid()
+            if kind < 0.2:
+                target = self.random.choice((
+                    {"PagePK": self.pick(self.templates)[0]},
+                    {"Workflow": self.pick(self.formflows)[0]},
+                    {"CommandRule": "Close"}))
+                controls.append('<control code="TIL" id="{}">{}</control>'.format(
+                    control_id, placeholders(Text="Tile {}".format(n),
+                                             Image=self.pick(self.images), **target)))
+            elif kind < 0.3:
+                controls.append('<control code="SIM" id="{}">{}</control>'.format(
+                    control_id, placeholders(Image=self.pick(self.images))))
+            elif kind < 0.7:
+                prop = self.prop()
+                controls.append('<control code="TXT" id="{}" binding="{}">{}</control>'.format(
+                    control_id, prop, placeholders(BindingPath=prop,
+                                                   CaptionOverride="Caption {}".format(n))))
+            elif kind < 0.8:
+                columns = "<columns>{}</columns>".format("".join(
+                    "<FieldName>Field{}</FieldName>".format(x) for x in range(3)))
+                controls.append('<control code="SRL" id="{}">{}</control>'.format(
+                    control_id, placeholders(FilterType=self.random.choice(("Global", "Entity")),
+                                             ColumnDefinitions=columns)))
+            elif kind < 0.9:
+                controls.append('<control code="CMP" id="{}">{}</control>'.format(
+                    control_id, placeholders(ItemTemplateID=self.pick(self.templates)[0])))
+            else:
+                controls.append('<control code="BTN" id="{}">{}</control>'.format(
+                    control_id, placeholders(NewWorkflow=self.pick(self.formflows)[0])))
+        form_data = (
+            '<form id="{}" xmlns="http://wisetechglobal.com/glow/2017/05/26/form.xsd">'
+            '{}{}</form>').format(
+                self.guid(), placeholders(BackgroundImagePk=self.pick(self.images)),
+                "".join(controls))
+        return {
+            "VZ_PK":           guid,
+            "VZ_FormID":       name,
+            "VZ_EntityType":   self.random.choice(self.entities),
+            "VZ_FormFactor":   "DSK",
+            "VZ_IsActive":     True,
+            "VZ_FormType":     "PAG",
+            "VZ_FormData":     form_data
+            }
+
+    def module(self, code):
+        """Return a module with a landing page and formflows
+        """
+        return {
+            "V9_PK":                   self.guid(),
+            "V9_Name":                 "Module {}".format(code),
+            "V9_Code":                 code,
+            "V9_VZ_StartupForm":       self.pick(self.templates)[0],
+            "RestrictedWorkflows":     [self.pick(self.formflows)[0] for _ in range(5)],
+            "FormFlowRestrictionType": "INC"
+            }
+
+    def test(self, name):
+        """Return the text of a business test feature
+        """
+        lines = ["@{}".format(self.random.choice(self.modules)),
+                 "Feature: {}".format(name),
+                 "",
+                 "  Scenario: {}".format(name)]
+        for _ in range(self.random.randint(1, 4)):
+            lines.append("    Given I am on the {} form".format(self.pick(self.templates)[1]))
+            lines.append("    When I started activity {}".format(self.pick(self.formflows)[1]))
+        return "\n".join(lines) + "\n"
+
+
+def object_path(root, kind, name):
+    """Return the file name for an object of a kind
+    """
+    folder = os.path.dirname(settings[kind]["path"])
+    extension = os.path.splitext(settings[kind]["path"])[-1]
+    return os.path.join(root, folder, "{}{}".format(name, extension))
+
+def write_file(file_name, data):
+    """Write YAML data or text to a file, creating its folder
+    """
+    folder = os.path.dirname(file_name)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(file_name, "w") as f:
+        if isinstance(data, basestring):
+            f.write(data)
+        else:
+            dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+            yaml.dump(data, f, Dumper=dumper, default_flow_style=False)
+
+def generate_tree(root, files=1000, seed=1, payload=1):
+    """Write a synthetic Glow source tree of about files files
+
+    Returns the number of files written for each type
+    """
+    tree = SyntheticTree(files, seed, payload)
+    for name in tree.entities:
+        write_file(object_path(root, "entity", name), tree.entity(name))
+        write_file(object_path(root, "metadata", name), tree.metadata(name))
+        write_file(object_path(root, "index", name), tree.index(name))
+    for guid in tree.conditions:
+        write_file(object_path(root, "condition", guid.replace("-", "")), tree.condition())
+    for guid, name in tree.formflows:
+        write_file(object_path(root, "formflow", name), tree.formflow(guid, name))
+    for guid, name in tree.templates:
+        write_file(object_path(root, "template", name), tree.template(guid, name))
+    for code in tree.modules:
+        write_file(object_path(root, "module", code), tree.module(code))
+    for guid in tree.images:
+        write_file(object_path(root, "image", guid),
+                   {"SK_PK": guid, "SK_Name": "Image", "SK_MediaType": "PNG"})
+    for guid in tree.sounds:
+        write_file(object_path(root, "sound", guid),
+                   {"PK": guid, "Name": "Sound", "DurationInSeconds": 1, "MediaType": "WAV"})
+    for n in range(tree.counts["test"]):
+        name = "Test {}".format(n)
+        write_file(object_path(root, "test", name), tree.test(name))
+    counts = dict(tree.counts)
+    counts.update({"metadata": len(tree.entities), "index": len(tree.entities),
+                   "module": len(tree.modules)})
+    return counts
+
+
+@click.command()
+@click.argument("root", type=click.Path(file_okay=False))
+@click.option("--files", default=1000, help="Approximate number of files")
+@click.option("--seed", default=1, help="Seed for a repeatable tree")
+@click.option("--payload", default=1, help="Multiply the embedded XML of each object")
+def main(root, files, seed, payload):
+    """Write a synthetic Glow source tree to ROOT
+    """
+    counts = generate_tree(root, files, seed, payload)
+    print("Wrote {} files to {}".format(sum(counts.values()), root))
+    for kind, count in sorted(counts.iteritems()):
+        print("  {:<12} {}".format(kind, count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,686 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-builtin
+
+"""Glow Navigator Analysis
+
+Whole of graph questions answered with a single
+traversal rather than one walk per object
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+from collections import deque
+import csv
+import fnmatch
+import json
+import os.path
+import re
+
+from . glow_utils import (
+    base_name,
+    colorized,
+    full_guid,
+    glow_file_objects,
+    load_yaml_file,
+    pindent)
+
+
+## traversal
+
+def reachable(sources, func):
+    """Return dict of nodes reachable from any source with their depth
+
+    One breadth first search seeded with every source so
+    each node and edge is visited at most once. The func
+    is graph.successors (callees) or graph.predecessors (callers)
+    """
+    depths = dict.fromkeys(sources, 0)
+    queue = deque(depths)
+    while queue:
+        node = queue.popleft()
+        level = depths[node] + 1
+        for other in func(node):
+            if other not in depths:
+                depths[other] = level
+                queue.append(other)
+    return depths
+
+def edge_kind(edge_data):
+    """Return the relationship kind of an edge
+
+    Most edges are links with a link_type but tiles and
+    tasks are identified by their type alone
+    """
+    return edge_data.get("link_type") or edge_data.get("type")
+
+def add_link_index(graph):
+    """Compute and store adjacency indexes for each kind of link
+
+    Parallel edges of the same kind are collapsed so
+    that traversals only touch matching neighbours
+    """
+    index = {}
+    for parent, child, edge_data in graph.edges_iter(data=True):
+        kind = index.setdefault(edge_kind(edge_data), {"successors": {}, "predecessors": {}})
+        kind["successors"].setdefault(parent, set()).add(child)
+        kind["predecessors"].setdefault(child, set()).add(parent)
+    for kind in index.itervalues():
+        for adjacency in kind.itervalues():
+            for node, others in adjacency.iteritems():
+                adjacency[node] = sorted(others)
+    graph.graph["link_index"] = index
+    return index
+
+def link_index(graph):
+    """Return the link indexes, computing them for older caches
+    """
+    if "link_index" not in graph.graph:
+        add_link_index(graph)
+    return graph.graph["link_index"]
+
+def linked(graph, func, link_types=None):
+    """Return a neighbour function restricted to the link types
+
+    The func is graph.successors or graph.predecessors and is
+    returned unchanged if there are no link types to restrict to
+    """
+    if not link_types:
+        return func
+    if func == graph.predecessors:
+        direction = "predecessors"
+    else:
+        direction = "successors"
+    index = link_index(graph)
+    adjacencies = [index[kind][direction] for kind in link_types if kind in index]
+
+    def neighbours(node):
+        """Return the neighbours over matching links only
+        """
+        if len(adjacencies) == 1:
+            return adjacencies[0].get(node, [])
+        result = []
+        seen = set()
+        for adjacency in adjacencies:
+            for other in adjacency.get(node, ()):
+                if other not in seen:
+                    seen.add(other)
+                    result.append(other)
+        return result
+
+    return neighbours
+
+def simple_paths(graph, source, target, cutoff=5, link_types=None):
+    """Generate each path from source to target without repeated nodes
+
+    A depth first search limited to cutoff edges which only
+    follows the link types if there are any
+    """
+    callees = linked(graph, graph.successors, link_types)
+    path = [source]
+    stack = [iter(callees(source))]
+    while stack:
+        other = next(stack[-1], None)
+        if other is None:
+            stack.pop()
+            path.pop()
+        elif other == target:
+            yield path + [target]
+        elif other not in path and len(path) < cutoff:
+            path.append(other)
+            stack.append(iter(callees(other)))
+
+def nearest_sources(sources, func):
+    """Return dict of reachable nodes with the nearest source to them
+
+    Same single breadth first search as reachable so that
+    each node is attributed to exactly one source
+    """
+    origins = dict((node, node) for node in sources)
+    queue = deque(origins)
+    while queue:
+        node = queue.popleft()
+        for other in func(node):
+            if other not in origins:
+                origins[other] = origins[node]
+                queue.append(other)
+    return origins
+
+def nodes_of_type(graph, *types):
+    """Return a list of nodes having one of the types
+    """
+    return [node for node, node_data in graph.nodes_iter(data=True)
+            if node_data.get("type") in types]
+
+def group_by_type(graph, nodes):
+    """Return a dict of type: sorted node list
+    """
+    groups = {}
+    for node in nodes:
+        node_type = graph.node[node].get("type", "undefined")
+        groups.setdefault(node_type, []).append(node)
+    for members in groups.itervalues():
+        members.sort()
+    return groups
+
+
+## strongly connected components
+
+def add_condensation(graph):
+    """Compute and store the condensed DAG of components with the graph
+
+    Stored as a graph attribute so that it is saved in the cache
+    and available to later traversals without recomputation
+    """
+    import networkx as nx
+    if graph.number_of_nodes() == 0:
+        condensed = nx.DiGraph()
+        condensed.graph["mapping"] = {}
+    else:
+        condensed = nx.condensation(graph)
+    graph.graph["condensation"] = condensed
+    graph.graph["module_depths"] = component_depths(
+        condensed,
+        [node for node, node_data in graph.nodes_iter(data=True)
+         if node_data.get("type") == "module"])
+    return condensed
+
+def condensation(graph):
+    """Return the condensed DAG, computing it for older caches
+    """
+    if "condensation" not in graph.graph:
+        add_condensation(graph)
+    return graph.graph["condensation"]
+
+def component_depths(condensed, sources):
+    """Return dict of component: depth from the sources
+
+    Depth is the longest chain of components from any source
+    component, calculated in topological order over the DAG
+    """
+    import networkx as nx
+    mapping = condensed.graph["mapping"]
+    depths = dict.fromkeys((mapping[node] for node in sources), 0)
+    for component in nx.topological_sort(condensed):
+        if component not in depths:
+            continue
+        level = depths[component] + 1
+        for other in condensed.successors(component):
+            if depths.get(other, -1) < level:
+                depths[other] = level
+    return depths
+
+def components(graph):
+    """Return the node: component mapping of the condensed DAG
+
+    Compact graphs hold it in an array as 'components'
+    """
+    if "components" in graph.graph:
+        return graph.graph["components"]
+    return condensation(graph).graph["mapping"]
+
+def module_depth(graph, node):
+    """Return the depth of a node below the modules or None
+    """
+    component = components(graph).get(node)
+    return graph.graph["module_depths"].get(component)
+
+def cycles(graph):
+    """Return a list of member lists for each component with cycles
+
+    Each strongly connected component with more than one member
+    (or a node referring to itself) holds at least one cycle
+    """
+    groups = {}
+    for node, component in components(graph).iteritems():
+        groups.setdefault(component, []).append(node)
+    result = []
+    for component in sorted(groups):
+        members = groups[component]
+        if len(members) > 1:
+            result.append(sorted(members))
+        elif graph.has_edge(members[0], members[0]):
+            result.append(members)
+    result.sort(key=len, reverse=True)
+    return result
+
+def shortest_cycle(graph, members):
+    """Return the shortest cycle through the first member of a component
+
+    A breadth first search kept within the members, giving the
+    nodes from the first member round and back to it
+    """
+    start = members[0]
+    inside = set(members)
+    previous = {}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for child in sorted(set(graph.successors(node))):
+            if child == start:
+                path = [start]
+                while node != start:
+                    path.insert(1, node)
+                    node = previous[node]
+                return path + [start]
+            if child in inside and child not in previous:
+                previous[child] = node
+                queue.append(child)
+    return []
+
+def print_cycles(graph):
+    """Display each component with cycles, one of its cycles
+    and the types of its members
+    """
+    found = cycles(graph)
+    print()
+    print("There are {} groups of objects in cycles in the graph:".format(len(found)))
+    for index, members in enumerate(found):
+        types = sorted(set(graph.node[node].get("type", "undefined") for node in members))
+        depth = module_depth(graph, members[0])
+        print()
+        print("{:>3} {} members of type {} at depth {} from module".format(
+            index, len(members), ", ".join(types), "-" if depth is None else depth))
+        print("    cycle: {}".format(" -> ".join(
+            (graph.node[node] or {}).get("name", node)
+            for node in shortest_cycle(graph, members))))
+        for node in members:
+            pindent(colorized(graph.node[node] or {"name": node}), 1)
+
+
+## path pattern queries
+
+PATTERN_ARROW = re.compile(r"\s*-(?:\[([^\]]*)\]-)?>\s*")
+
+def add_type_index(graph):
+    """Compute and store a dict of type: node list with the graph
+    """
+    index = {}
+    for node, node_data in graph.nodes_iter(data=True):
+        index.setdefault(node_data.get("type"), []).append(node)
+    graph.graph["type_index"] = index
+    return index
+
+def type_index(graph):
+    """Return the type index, computing it for older caches
+    """
+    if "type_index" not in graph.graph:
+        add_type_index(graph)
+    return graph.graph["type_index"]
+
+def parse_pattern(pattern):
+    """Return lists of node types and link types from a pattern
+
+    'module -> formflow -[show form task]-> template' becomes
+    ["module", "formflow", "template"] and [[], ["show form task"]].
+    A type of '*' matches any node
+    """
+    parts = PATTERN_ARROW.split(pattern.strip())
+    node_types = parts[0::2]
+    link_types = [[x.strip() for x in (links or "").split(",") if x.strip()]
+                  for links in parts[1::2]]
+    if len(node_types) < 2 or not all(node_types):
+        raise ValueError("pattern needs two or more types joined by arrows")
+    return node_types, link_types
+
+def pattern_matches(graph, pattern):
+    """Generate each chain of nodes matching the pattern
+
+    The most selective node type is used as the anchor and the
+    chains are joined outwards from it in both directions using
+    the type index and link indexes rather than scanning the graph
+    """
+    node_types, link_types = parse_pattern(pattern)
+    index = type_index(graph)
+
+    def candidates(node_type):
+        """Return the nodes having the type
+        """
+        if node_type == "*":
+            return graph.nodes()
+        return index.get(node_type, [])
+
+    def is_type(node, node_type):
+        """Check the node has the required type
+        """
+        return node_type == "*" or graph.node[node].get("type") == node_type
+
+    def extend(node, position, step):
+        """Generate the partial chains from node in one direction
+        """
+        following = position + step
+        if following < 0 or following >= len(node_types):
+            yield []
+            return
+        if step > 0:
+            func = linked(graph, graph.successors, link_types[position])
+        else:
+            func = linked(graph, graph.predecessors, link_types[following])
+        for other in func(node):
+            if is_type(other, node_types[following]):
+                for chain in extend(other, following, step):
+                    yield [other] + chain
+
+    anchor = min(range(len(node_types)), key=lambda i: len(candidates(node_types[i])))
+    for node in candidates(node_types[anchor]):
+        lefts = [list(reversed(chain)) for chain in extend(node, anchor, -1)]
+        if not lefts:
+            continue
+        for right in extend(node, anchor, 1):
+            for left in lefts:
+                yield left + [node] + right
+
+def print_pattern(graph, pattern):
+    """Display chains matching the pattern as they are found
+    """
+    print()
+    count = 0
+    for count, chain in enumerate(pattern_matches(graph, pattern), 1):
+        names = (graph.node[node].get("name", node) for node in chain)
+        print("{:>3} {}".format(count, " -> ".join(names)))
+    print()
+    print("-> {} chains match '{}'".format(count, pattern))
+
+
+## impact analysis
+
+def file_object_type(file_name):
+    """Return the glow object settings for a source file
+
+    The file is matched against the settings path globs
+    so the same file types as create_graph are recognised
+    """
+    path = os.path.abspath(file_name).replace(os.sep, "/")
+    for attrs in glow_file_objects():
+        pattern = "*/{}".format(attrs["path"])
+        if fnmatch.fnmatch(path, pattern):
+            return attrs
+
+def source_key(file_name):
+    """Return the key of a source file in the sources of a graph
+
+    The path from the root of the Glow tree, which is the
+    working directory of both the build and the navigator
+    """
+    return os.path.relpath(os.path.abspath(file_name)).replace(os.sep, "/")
+
+def file_nodes(file_name, attrs, values=None):
+    """Return the list of graph nodes created from a source file
+
+    Uses the same naming as create_graph: conditions are named
+    by the file guid, entities by name (or file name), indexes
+    by their upper cased fields and tests by file name. Other
+    objects need their guid from the YAML, which is read from
+    the file unless its values are given
+    """
+    if values is None and attrs["type"] != "test" and os.path.exists(file_name):
+        values = load_yaml_file(file_name)
+    values = values or {}
+    nodes = []
+    if attrs["type"] == "condition":
+        try:
+            nodes.append(full_guid(base_name(file_name)))
+        except ValueError:
+            pass
+    elif attrs["type"] == "index":
+        for field in values.get(attrs["fields"]["mappings"]) or []:
+            if field.get("name"):
+                nodes.append(field["name"].upper())
+    elif attrs["type"] == "test":
+        nodes.append(base_name(file_name))
+    elif attrs["type"] in ("entity", "metadata"):
+        nodes.append(values.get(attrs["fields"]["name"]) or base_name(file_name))
+    elif values.get(attrs["fields"].get("guid")):
+        nodes.append(values[attrs["fields"]["guid"]].lower())
+    return nodes
+
+def changed_nodes(graph, file_names):
+    """Return the set of graph nodes defined by changed files
+
+    The nodes each file made in the graph are taken from the
+    sources the build recorded, so deleted files are found as
+    well, and from the file as it is now. Entity files also
+    define their property and command nodes so these are
+    found with a single pass over the graph
+    """
+    sources = graph.graph.get("sources", {})
+    nodes = set()
+    entities = set()
+    for file_name in file_names:
+        attrs = file_object_type(file_name)
+        if attrs is None:
+            continue
+        found = set(sources.get(source_key(file_name), ()))
+        found.update(file_nodes(file_name, attrs))
+        if attrs["type"] in ("entity", "metadata"):
+            entities.update(found)
+        nodes.update(node for node in found if graph.has_node(node))
+    if entities:
+        for node, node_data in graph.nodes_iter(data=True):
+            if (node_data.get("entity") in entities and
+                    node_data.get("type") in ("command", "property")):
+                nodes.add(node)
+    return nodes
+
+def impact_analysis(graph, file_names, link_types=None):
+    """Return the changed nodes and affected objects grouped by type
+
+    All callers of all changed nodes are found with one
+    reverse traversal so the cost is linear in graph size
+    """
+    changed = changed_nodes(graph, file_names)
+    callers = linked(graph, graph.predecessors, link_types)
+    affected = set(reachable(changed, callers))
+    affected.difference_update(changed)
+    return changed, group_by_type(graph, affected)
+
+def read_file_list(file_name):
+    """Return the paths listed in a file e.g. git diff --name-only
+    """
+    with open(file_name, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def print_impact(graph, file_names, link_types=None):
+    """Display the objects affected by changes to files
+    """
+    changed, groups = impact_analysis(graph, file_names, link_types)
+    deleted = [x for x in file_names if not os.path.exists(x)]
+    print()
+    print("These objects are defined by the {} changed files:".format(len(file_names)))
+    if deleted:
+        print("({} of the files are deleted, their objects are from the graph)".format(
+            len(deleted)))
+    print()
+    for node in sorted(changed):
+        pindent(colorized(graph.node[node] or {"name": node}), 1)
+    for node_type in sorted(groups):
+        print()
+        print("These {} {} objects are affected:".format(len(groups[node_type]), node_type))
+        print()
+        for node in groups[node_type]:
+            pindent(colorized(graph.node[node] or {"name": node}), 1)
+
+
+## business test coverage
+
+COVERAGE_TYPES = ("formflow", "template", "condition", "command")
+
+def business_test_coverage(graph, link_types=None):
+    """Return rows for objects that no business test can reach
+
+    One traversal from all the tests finds the covered objects
+    and one from all the modules attributes each uncovered
+    object to its nearest module
+    """
+    callees = linked(graph, graph.successors, link_types)
+    covered = reachable(nodes_of_type(graph, "test"), callees)
+    modules = nearest_sources(nodes_of_type(graph, "module"), callees)
+    rows = []
+    for node in nodes_of_type(graph, *COVERAGE_TYPES):
+        if node in covered:
+            continue
+        node_data = graph.node[node]
+        module = modules.get(node)
+        rows.append({
+            "node":   node,
+            "type":   node_data["type"],
+            "name":   node_data.get("name", ""),
+            "entity": node_data.get("entity", ""),
+            "module": module and graph.node[module].get("name", module) or ""
+            })
+    rows.sort(key=lambda row: (row["module"], row["type"], row["name"]))
+    return rows
+
+def coverage_counts(rows):
+    """Return dict of module: {type: count} for uncovered rows
+    """
+    counts = {}
+    for row in rows:
+        by_type = counts.setdefault(row["module"], {})
+        by_type[row["type"]] = by_type.get(row["type"], 0) + 1
+    return counts
+
+def export_rows(rows, fields, file_name, document):
+    """Save rows as CSV or the JSON document depending on file extension
+    """
+    if file_name.lower().endswith(".json"):
+        with open(file_name, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+    else:
+        with open(file_name, "wb") as f:
+            writer = csv.DictWriter(f, fields)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(dict((k, unicode(v).encode("utf-8"))
+                                     for k, v in row.iteritems()))
+
+def export_coverage(rows, file_name):
+    """Save coverage rows as CSV or JSON depending on file extension
+    """
+    export_rows(rows, ("module", "type", "name", "entity", "node"), file_name,
+                {"uncovered": rows, "counts": coverage_counts(rows)})
+
+def print_coverage(graph, file_name=None, link_types=None):
+    """Display objects not reached by business tests with module counts
+    """
+    rows = business_test_coverage(graph, link_types)
+    print()
+    print("These objects are not reached by any business test:")
+    print()
+    for row in rows:
+        pindent(colorized(graph.node[row["node"]]), 1)
+    print()
+    print("Uncovered objects by module:")
+    print()
+    for module, by_type in sorted(coverage_counts(rows).iteritems()):
+        counts = ", ".join("{}: {}".format(k, v) for k, v in sorted(by_type.iteritems()))
+        pindent("{} -> {}".format(module or "(no module)", counts), 1)
+    if file_name:
+        export_coverage(rows, file_name)
+        print()
+        print("-> Coverage report saved to {}".format(file_name))
+
+
+## undefined references
+
+ORPHAN_FIELDS = ("link_type", "node", "caller_type", "caller_name", "caller")
+
+def add_orphans(graph):
+    """Compute and store the references to undefined objects
+
+    Nodes without a type were only ever referenced by edges
+    so each row is one edge from a caller to such a node.
+    Stored with the graph so the report needs no rescan
+    """
+    rows = []
+    for node, node_data in graph.nodes_iter(data=True):
+        if "type" in node_data or node.startswith("AttachToI"):
+            continue
+        for caller, edges in graph.pred[node].iteritems():
+            if not caller:
+                continue
+            caller_data = graph.node[caller]
+            for edge in edges.itervalues():
+                rows.append({
+                    "node":        node,
+                    "link_type":   edge_kind(edge) or "",
+                    "caller":      caller,
+                    "caller_type": caller_data.get("type", ""),
+                    "caller_name": caller_data.get("name", "")
+                    })
+    rows.sort(key=lambda row: tuple(row[k] for k in ORPHAN_FIELDS))
+    graph.graph["orphans"] = rows
+    return rows
+
+def orphans(graph, types=None):
+    """Return the undefined reference rows, computing them for older caches
+
+    With types only rows whose link type or caller type
+    is one of them are returned
+    """
+    if "orphans" not in graph.graph:
+        add_orphans(graph)
+    rows = graph.graph["orphans"]
+    if types:
+        rows = [row for row in rows
+                if row["link_type"] in types or row["caller_type"] in types]
+    return rows
+
+def orphan_counts(rows):
+    """Return dict of link type: count of undefined objects
+    """
+    nodes = {}
+    for row in rows:
+        nodes.setdefault(row["link_type"], set()).add(row["node"])
+    return dict((k, len(v)) for k, v in nodes.iteritems())
+
+def export_orphans(rows, file_name):
+    """Save undefined reference rows as CSV or JSON depending on file extension
+    """
+    export_rows(rows, ORPHAN_FIELDS, file_name,
+                {"orphans": rows, "counts": orphan_counts(rows)})
+
+def new_orphans(graph, baseline_rows, types=None):
+    """Return the undefined reference rows that are not in the baseline
+
+    The baseline rows are taken from orphans before the baseline
+    graph is updated. Without baseline rows every row is new
+    """
+    known = set((row["node"], row["caller"], row["link_type"])
+                for row in baseline_rows or ())
+    return [row for row in orphans(graph, types)
+            if (row["node"], row["caller"], row["link_type"]) not in known]
+
+def print_orphans(graph, types=None, file_name=None, rows=None):
+    """Display the references to undefined objects with counts by link type
+
+    Rows default to all the undefined references in the graph
+    """
+    if rows is None:
+        rows = orphans(graph, types)
+    print()
+    print("These objects are referenced but not defined:")
+    node = None
+    for row in rows:
+        if row["node"] != node:
+            node = row["node"]
+            print()
+            pindent("{} ({})".format(node, row["link_type"]), 1)
+        pindent("-> from : {}".format(colorized(graph.node[row["caller"]])), 2)
+    print()
+    print("Undefined objects by link type:")
+    print()
+    for link_type, count in sorted(orphan_counts(rows).iteritems()):
+        pindent("{} -> {}".format(link_type, count), 1)
+    if file_name:
+        export_orphans(rows, file_name)
+        print()
+        print("-> Undefined references saved to {}".format(file_name))
+
+
+if __name__ == "__main__":
+    print()
+    print("This module is only a container for analysis functions")
+    print()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-builtin
+
+"""Glow Navigator Batch
+
+Evaluate many queries against one loaded graph and
+write the results as JSON Lines for scripts and CI
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+import json
+import re
+
+from . glow_analysis import edge_kind
+from . glow_navigator import get_node_data, searched_edges
+from . glow_utils import invalid_regex, serialize
+
+
+class BatchIndex(object):
+    """Serialized nodes shared by every query in a batch
+
+    The navigator serializes each node for every search.
+    In a batch this is done once, on the first regex query,
+    and each query regex is compiled once and run over the
+    stored text
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.entries = None
+
+    def load(self):
+        """Serialize each node (and its edges) for searching
+        """
+        session = self.session
+        graph = session.graph
+        self.entries = []
+        for node in graph:
+            node_data = get_node_data(graph, node)
+            if node_data.get("type") in session.ignore_types:
+                continue
+            texts = [serialize(node_data)]
+            if session.edge_match:
+                texts.extend(serialize(edge_data) for edge_data
+                             in searched_edges(graph, node, session.ignore_types))
+            self.entries.append((node, node_data, texts))
+
+    def select(self, query):
+        """Generate the (node, node data) matching a regex
+        """
+        if self.entries is None:
+            self.load()
+        regex = re.compile(r"{}".format(query), flags=re.IGNORECASE)
+        for node, node_data, texts in self.entries:
+            if any(regex.search(text) for text in texts):
+                yield node, node_data
+
+    def neighbours(self, node, func):
+        """Return the parent / child entries as dicts
+        """
+        return [{"level":      level,
+                 "node":       other,
+                 "type":       other_data.get("type"),
+                 "link_types": sorted(set(edge_kind(edge) for edge in edges))}
+                for level, other, other_data, edges, _
+                in self.session.entries(node, func)]
+
+
+def run_batch(session, queries, output, neighbours=False, exact=False):
+    """Write a JSON line for each node matched by each query
+
+    Queries are regex unless exact is set, when they are node ids
+    and the nodes are never serialized for searching. Blank lines
+    are skipped and invalid queries produce an error line
+    """
+    graph = session.graph
+    index = BatchIndex(session)
+    for line in queries:
+        query = line.rstrip("\r\n")
+        if not query.strip():
+            continue
+        if exact:
+            nodes = [(query, get_node_data(graph, query))] if graph.has_node(query) else []
+        elif invalid_regex(query):
+            output.write(json.dumps({"query": query, "error": "invalid regex"}) + "\n")
+            continue
+        else:
+            nodes = index.select(query)
+        for node, node_data in nodes:
+            result = {
+                "query":  query,
+                "node":   node,
+                "counts": node_data.get("counts"),
+                "data":   dict((k, v) for k, v in node_data.iteritems() if k != "counts")
+                }
+            if neighbours:
+                result["parents"] = index.neighbours(node, graph.predecessors)
+                result["children"] = index.neighbours(node, graph.successors)
+            output.write(json.dumps(result, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    print()
+    print("Run a batch with 'glow_navigator batch'")
+    print()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-builtin
+
+"""Glow Navigator Command Line
+
+Entry points for the navigator, servers and batch mode.
+Kept apart from glow_navigator so that importing the
+library does not pull in click
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+import os.path
+import sys
+
+# external libraries
+import click
+
+from . glow_config import print_banner
+from . glow_export import EXPORT_FORMATS
+from . glow_graph import BACKENDS, DEFAULT_BACKEND
+from . glow_navigator import (
+    SOCKET_FILE,
+    CacheLoader,
+    GlowSession,
+    create_graph,
+    interactive,
+    load_graph,
+    navigate,
+    update_graph)
+
+
+BACKEND_HELP = "Graph store to query, compact is read only using less memory"
+
+@click.group(invoke_without_command=True)
+@click.option("--backend", type=click.Choice(BACKENDS), default=DEFAULT_BACKEND,
+              help=BACKEND_HELP)
+@click.pass_context
+def main(ctx, backend):
+    """Explore the relationships between Glow objects
+
+    Without a command the interactive navigator is started.
+    The backend also applies to serve, http and batch
+    """
+    ctx.obj = {"backend": backend}
+    if ctx.invoked_subcommand is None:
+        navigate(backend)
+
+@main.command()
+@click.option("--socket", "socket_file", default=SOCKET_FILE,
+              help="Unix socket to listen on")
+@click.pass_context
+def serve(ctx, socket_file):
+    """Serve queries on one loaded graph to many clients
+
+    Requests are answered one at a time, so a slow search
+    makes the other clients wait until it finishes
+    """
+    from . glow_server import run_server
+    run_server(load_graph(ctx.obj["backend"]), socket_file)
+
+@main.command()
+@click.option("--host", default="127.0.0.1", help="Address to listen on")
+@click.option("--port", default=8080, help="Port to listen on")
+@click.pass_context
+def http(ctx, host, port):
+    """Serve a JSON API for querying the graph
+    """
+    from . glow_http import run_http
+    run_http(load_graph(ctx.obj["backend"]), host, port)
+
+@main.command()
+@click.option("--socket", "socket_file", default=SOCKET_FILE,
+              help="Unix socket of the running server")
+def client(socket_file):
+    """Navigate using the graph loaded by a running server
+    """
+    from . glow_server import run_client
+    interactive()
+    print_banner()
+    run_client(socket_file)
+
+@main.command()
+@click.argument("queries", type=click.File("r"), default="-")
+@click.option("--output", type=click.File("w"), default="-",
+              help="File for the JSON Lines results")
+@click.option("--depth", default=1, help="Levels of neighbours, 0 for all")
+@click.option("--ignore", default="", help="Space separated types to ignore")
+@click.option("--links", default="", help="Comma separated link types to follow")
+@click.option("--edges", is_flag=True, help="Also match against edges")
+@click.option("--neighbours", is_flag=True, help="Include parents and children")
+@click.option("--exact", is_flag=True, help="Queries are node ids not regex")
+@click.pass_context
+def batch(ctx, queries, output, depth, ignore, links, edges, neighbours, exact):
+    # pylint: disable=too-many-arguments
+    """Evaluate queries from a file or stdin as JSON Lines
+    """
+    from . glow_batch import run_batch
+    # keep progress and graph info off the results
+    stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        graph = load_graph(ctx.obj["backend"])
+    finally:
+        sys.stdout = stdout
+    session = GlowSession(
+        graph,
+        max_level=depth,
+        ignore_types=ignore.split(),
+        link_types=[x.strip() for x in links.split(",") if x.strip()],
+        edge_match=edges)
+    run_batch(session, queries, output, neighbours, exact)
+
+@main.command()
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False),
+              help="Graph cache of the build to compare with")
+@click.option("--types", default="", help="Comma separated link or caller types to check")
+@click.option("--output", default=None, help="Save new references to .csv or .json")
+def check(baseline, types, output):
+    """Fail if objects reference objects that are not defined
+
+    Updates the baseline graph with only the files changed
+    since it was built, or builds the graph in full when it
+    cannot be updated, without saving it, and exits with
+    status 1 when there are references to undefined objects
+    that the baseline does not already have
+    """
+    from . glow_analysis import new_orphans, orphans, print_orphans
+    type_list = [x.strip() for x in types.split(",") if x.strip()]
+    graph = CacheLoader(baseline).wait() if baseline else None
+    known = None
+    if graph is not None:
+        known = orphans(graph, type_list)
+        changed = update_graph(graph)
+        if changed is None:
+            print("-> The baseline cannot be updated, building the graph in full")
+            graph = None
+        else:
+            print("-> Updated the baseline with {} changed files".format(len(changed)))
+    if graph is None:
+        graph = create_graph(cache_file=None)
+    rows = new_orphans(graph, known, type_list)
+    if rows:
+        print_orphans(graph, file_name=output, rows=rows)
+        print()
+        print("-> {} new references to undefined objects".format(len(rows)))
+        sys.exit(1)
+    print("-> No new references to undefined objects")
+
+@main.command()
+@click.argument("output", type=click.File("wb"), default="-")
+@click.option("--format", "export_format", type=click.Choice(EXPORT_FORMATS),
+              help="Format, by default from the output extension or jsonl")
+@click.option("--around", default=None, help="Only export nodes near this node id")
+@click.option("--hops", default=1, help="Hops from the --around node, 0 for all")
+@click.option("--types", default="", help="Space separated node types to export")
+def export(output, export_format, around, hops, types):
+    """Stream the graph, or a slice of it, as GraphML, JSON Lines or DOT
+    """
+    from . glow_export import export_graph
+    if export_format is None:
+        extension = os.path.splitext(output.name)[-1].lower()
+        export_format = {".graphml": "graphml", ".xml": "graphml",
+                         ".dot": "dot", ".gv": "dot"}.get(extension, "jsonl")
+    # keep progress and graph info off the export
+    stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        graph = load_graph()
+    finally:
+        sys.stdout = stdout
+    if around is not None and not graph.has_node(around):
+        raise click.BadParameter("'{}' is not in the graph".format(around),
+                                 param_hint="--around")
+    export_graph(graph, output, export_format, around, hops, types.split())
+
+@main.command()
+@click.argument("old_cache", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new_cache", type=click.Path(exists=True, dir_okay=False))
+@click.option("--output", type=click.File("w"), default="-",
+              help="File for the JSON Lines differences")
+def diff(old_cache, new_cache, output):
+    """Compare the graph caches of two builds
+
+    Writes a JSON line per added, removed or changed object
+    and relationship and a summary by type to stderr
+    """
+    from . glow_diff import print_diff_summary, write_diff
+    # both caches load at the same time
+    old_loader, new_loader = CacheLoader(old_cache), CacheLoader(new_cache)
+    summary = write_diff(old_loader.wait(), new_loader.wait(), output)
+    print_diff_summary(summary, sys.stderr)
+
+@main.command()
+@click.option("--output", default=None, help="Also save the report as JSON")
+def memory(output):
+    """Report the memory held by the graph
+
+    Broken down by node type, edge link type and attribute key
+    with the savings from interning strings and sharing edge
+    attributes, and the peak resident memory of the process
+    """
+    from . glow_memory import memory_report, print_memory_report, save_memory_report
+    graph = load_graph()
+    report = memory_report(graph)
+    print_memory_report(report)
+    if output:
+        save_memory_report(report, output)
+
+
+if __name__ == "__main__":
+    main()
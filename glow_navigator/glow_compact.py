@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glow Navigator Compact Graph
+
+Read only copy of the graph for querying with integer node
+ids and compressed sparse row (CSR) adjacency held in arrays,
+a fraction of the memory of nested networkx dicts
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+from array import array
+from bisect import bisect_left
+from collections import Mapping
+import sys
+
+from . glow_analysis import condensation, link_index, orphans, type_index
+
+# 32 bit signed ids are plenty for nodes and edges
+ID_TYPE = "i"
+
+# derived data of the networkx graph held in arrays instead
+ARRAY_ATTRIBUTES = ("condensation", "link_index")
+
+
+class Adjacency(object):
+    """Neighbours of each node in CSR form
+
+    The neighbours of node i are targets[offsets[i]:offsets[i+1]]
+    sorted by id with parallel edges next to each other and
+    records holding the index of each edge's attributes
+    """
+
+    def __init__(self):
+        self.offsets = array(ID_TYPE, [0])
+        self.targets = array(ID_TYPE)
+        self.records = array(ID_TYPE)
+
+    def add_row(self, entries):
+        """Append the sorted (target, key order, record) entries of the next node
+        """
+        for target, _, record in entries:
+            self.targets.append(target)
+            self.records.append(record)
+        self.offsets.append(len(self.targets))
+
+    def row(self, node):
+        """Return the start and end of the entries of node
+        """
+        return self.offsets[node], self.offsets[node + 1]
+
+    def neighbours(self, node, ids):
+        """Return a list of the ids of the distinct neighbours of node
+        """
+        result = []
+        previous = None
+        for target in self.targets[self.offsets[node]:self.offsets[node + 1]]:
+            if target != previous:
+                previous = target
+                result.append(ids[target])
+        return result
+
+    def find(self, node, target, records):
+        """Return dict of key: record for the edges from node to target
+        """
+        targets = self.targets
+        end = self.offsets[node + 1]
+        position = bisect_left(targets, target, self.offsets[node], end)
+        result = {}
+        while position < end and targets[position] == target:
+            result[len(result)] = records[self.records[position]]
+            position += 1
+        return result
+
+    def degree(self, node):
+        """Return the number of edges of node
+        """
+        start, end = self.row(node)
+        return end - start
+
+
+class LinkRows(object):
+    """Node to neighbours view of one direction of a link index
+
+    Only nodes with neighbours over the link are held, their
+    ids sorted in nodes. The neighbours of nodes[i] are the ids
+    in targets[offsets[i]:offsets[i+1]] kept in the order of
+    the networkx index. Answers the lookups of linked
+    """
+    __slots__ = ("graph", "nodes", "offsets", "targets")
+
+    def __init__(self, graph, adjacency):
+        self.graph = graph
+        self.nodes = array(ID_TYPE, sorted(graph.index[node] for node in adjacency))
+        self.offsets = array(ID_TYPE, [0])
+        self.targets = array(ID_TYPE)
+        for number in self.nodes:
+            self.targets.extend(graph.index[x] for x in adjacency[graph.ids[number]])
+            self.offsets.append(len(self.targets))
+
+    def __sizeof__(self):
+        return (object.__sizeof__(self) + sys.getsizeof(self.nodes)
+                + sys.getsizeof(self.offsets) + sys.getsizeof(self.targets))
+
+    def position(self, node):
+        """Return the position of node in nodes or None
+        """
+        number = self.graph.index.get(node)
+        if number is None:
+            return None
+        position = bisect_left(self.nodes, number)
+        if position < len(self.nodes) and self.nodes[position] == number:
+            return position
+        return None
+
+    def __getitem__(self, node):
+        result = self.get(node)
+        if result is None:
+            raise KeyError(node)
+        return result
+
+    def __contains__(self, node):
+        return self.position(node) is not None
+
+    def __iter__(self):
+        ids = self.graph.ids
+        return (ids[number] for number in self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get(self, node, default=None):
+        """Return the neighbours of node or default if it has none
+        """
+        position = self.position(node)
+        if position is None:
+            return default
+        ids = self.graph.ids
+        return [ids[x] for x in self.targets[self.offsets[position]:self.offsets[position + 1]]]
+
+
+class NodeComponents(object):
+    """Node to strongly connected component view held in an array
+
+    Replaces the mapping of the networkx condensation
+    """
+    __slots__ = ("graph", "components")
+
+    def __init__(self, graph, mapping):
+        self.graph = graph
+        self.components = array(ID_TYPE, [mapping[node] for node in graph.ids])
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self.components)
+
+    def __getitem__(self, node):
+        return self.components[self.graph.index[node]]
+
+    def __contains__(self, node):
+        return node in self.graph.index
+
+    def __iter__(self):
+        return iter(self.graph.ids)
+
+    def __len__(self):
+        return len(self.graph.ids)
+
+    def get(self, node, default=None):
+        """Return the component of node or default
+        """
+        number = self.graph.index.get(node)
+        return default if number is None else self.components[number]
+
+    def iteritems(self):
+        """Generate (node, component) for each node
+        """
+        return iter(zip(self.graph.ids, self.components))
+
+
+class NodeData(Mapping):
+    """Node id to attributes view of a compact graph
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, node):
+        return self.graph.data[self.graph.index[node]]
+
+    def __iter__(self):
+        return iter(self.graph.ids)
+
+    def __len__(self):
+        return len(self.graph.ids)
+
+    def __contains__(self, node):
+        return node in self.graph.index
+
+
+class CompactGraph(object):
+    """Read only graph answering the queries of the navigator
+
+    Offers the parts of the networkx 1.x MultiDiGraph API that
+    the queries, reports and servers use. Node attributes stay
+    the dicts of the networkx graph, edge attributes are
+    shared records and edge keys are numbered from 0 for
+    each pair of nodes
+    """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, graph):
+        self.graph = dict((key, value) for key, value in graph.graph.iteritems()
+                          if key not in ARRAY_ATTRIBUTES)
+        self.ids = graph.nodes()
+        self.index = dict((node, number) for number, node in enumerate(self.ids))
+        self.data = [graph.node[node] for node in self.ids]
+        self.node = NodeData(self)
+        self.records = []
+        numbers = {}
+        self.succ = self.adjacency(graph.succ, numbers)
+        self.pred = self.adjacency(graph.pred, numbers)
+        self.graph["components"] = NodeComponents(
+            self, graph.graph["condensation"].graph["mapping"])
+        self.graph["link_index"] = dict(
+            (kind, dict((direction, LinkRows(self, adjacency))
+                        for direction, adjacency in kind_index.iteritems()))
+            for kind, kind_index in graph.graph["link_index"].iteritems())
+
+    def adjacency(self, neighbours, numbers):
+        """Return the CSR form of networkx succ or pred
+
+        Equal edge attributes share one record, found by
+        identity as the graph shares equal records already
+        """
+        index = self.index
+        result = Adjacency()
+        for node in self.ids:
+            entries = []
+            for other, keys in neighbours[node].iteritems():
+                for order, key in enumerate(sorted(keys)):
+                    edge_data = keys[key]
+                    number = numbers.get(id(edge_data))
+                    if number is None:
+                        number = numbers[id(edge_data)] = len(self.records)
+                        self.records.append(edge_data)
+                    entries.append((index[other], order, number))
+            entries.sort()
+            result.add_row(entries)
+        return result
+
+    @property
+    def name(self):
+        """Return the name of the graph
+        """
+        return self.graph.get("name", "")
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, node):
+        return node in self.index
+
+    @staticmethod
+    def is_directed():
+        """Edges are directed
+        """
+        return True
+
+    @staticmethod
+    def is_multigraph():
+        """Pairs of nodes may have parallel edges
+        """
+        return True
+
+    def has_node(self, node):
+        """Check the node is in the graph
+        """
+        return node in self.index
+
+    def has_edge(self, source, target):
+        """Check there is an edge from source to target
+        """
+        return self.get_edge_data(source, target) is not None
+
+    def number_of_nodes(self):
+        """Return the number of nodes
+        """
+        return len(self.ids)
+
+    def number_of_edges(self):
+        """Return the number of edges
+        """
+        return len(self.succ.targets)
+
+    def nodes(self, data=False):
+        """Return a list of the nodes
+        """
+        return list(self.nodes_iter(data))
+
+    def nodes_iter(self, data=False):
+        """Generate the nodes, with their attributes if data is True
+        """
+        if data:
+            return iter(zip(self.ids, self.data))
+        return iter(self.ids)
+
+    def successors(self, node):
+        """Return a list of the distinct targets of edges from node
+        """
+        return self.succ.neighbours(self.index[node], self.ids)
+
+    def predecessors(self, node):
+        """Return a list of the distinct sources of edges to node
+        """
+        return self.pred.neighbours(self.index[node], self.ids)
+
+    def get_edge_data(self, source, target, default=None):
+        """Return dict of key: attributes for the edges from source to target
+        """
+        try:
+            edges = self.succ.find(self.index[source], self.index[target], self.records)
+        except KeyError:
+            return default
+        return edges or default
+
+    def edges_iter(self, nbunch=None, data=False, keys=False):
+        """Generate the edges from the nodes in nbunch (default all)
+
+        Each is (source, target), with the key if keys and the
+        attributes if data is True
+        """
+        if nbunch is None:
+            sources = range(len(self.ids))
+        elif isinstance(nbunch, basestring):
+            sources = [self.index[nbunch]] if nbunch in self.index else []
+        else:
+            sources = [self.index[x] for x in nbunch if x in self.index]
+        succ = self.succ
+        for source in sources:
+            start, end = succ.row(source)
+            key = previous = None
+            for position in range(start, end):
+                target = succ.targets[position]
+                key = key + 1 if target == previous else 0
+                previous = target
+                edge = (self.ids[source], self.ids[target])
+                if keys:
+                    edge += (key,)
+                if data:
+                    edge += (self.records[succ.records[position]],)
+                yield edge
+
+    def edges(self, nbunch=None, data=False, keys=False):
+        """Return a list of the edges from the nodes in nbunch
+        """
+        return list(self.edges_iter(nbunch, data, keys))
+
+    def in_degree(self, node=None):
+        """Return the in degree of node, or a dict for all nodes
+        """
+        if node is not None:
+            return self.pred.degree(self.index[node])
+        return dict((x, self.pred.degree(n)) for n, x in enumerate(self.ids))
+
+    def out_degree(self, node=None):
+        """Return the out degree of node, or a dict for all nodes
+        """
+        if node is not None:
+            return self.succ.degree(self.index[node])
+        return dict((x, self.succ.degree(n)) for n, x in enumerate(self.ids))
+
+
+def compact_graph(graph):
+    """Return a compact read only copy of a networkx graph
+
+    The derived data is computed first as networkx is
+    needed for the condensation
+    """
+    condensation(graph)
+    link_index(graph)
+    type_index(graph)
+    orphans(graph)
+    return CompactGraph(graph)
+
+
+if __name__ == "__main__":
+    print()
+    print("This module is only a container for the compact graph")
+    print()
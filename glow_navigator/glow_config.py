@@ -11,10 +11,10 @@ Load settings and make available to callers
 # python2 and python3 portability
 from __future__ import print_function
 
+from collections import Mapping
 import os.path
-import yaml
 
-print("""
+BANNER = """
 
     Welcome to the Glow Navigator
     -----------------------------
@@ -53,12 +53,50 @@ To ignore particular types of entities when searching and expanding the graph
 use the '$$ignore=foo, bar' to ignore types 'foo' and 'bar'. Just provide an
 empty list to clear out the ignore list.
 
+To only follow particular kinds of relationship when expanding the graph, or
+in the impact and coverage reports, use '$$links=show form task, bound property'
+with a comma separated list of link types. Just provide an empty list to follow
+all links again.
+
 To include edges in matches, use the $$edges=True|False command. Default is
 False to not search for matches in the edges atttached to a node.
 
 To expand the level of detail in node printing use $$minimal=True|False. Default
 is True to keep the level of detail reasonable.
 
+To see which objects are affected by a change set use $$impact=foo, bar with
+a comma separated list of source files, or $$impact=@changes.txt to read the
+list from a file (e.g. the output of 'git diff --name-only'). Deleted files are
+found from the files the graph was built from.
+
+To list the formflows, templates, conditions and command rules that no business
+test reaches use $$coverage. Use $$coverage=foo.csv or $$coverage=foo.json to
+also save the report for other tools.
+
+To list the cycles between objects (e.g. formflows that jump to each other)
+use $$cycles. Objects that reach each other are grouped, and each group shows
+one of its shortest cycles, the types of its members and its depth below the
+modules.
+
+To list the objects that are referenced but not defined (e.g. a template using
+a missing condition) use $$orphans, or $$orphans=condition, template to only
+show those with matching link or caller types. Add a file name ending in .csv
+or .json, e.g. $$orphans=template, orphans.csv, to also save the report.
+
+To find chains of objects across types use a pattern such as
+'$$pattern=module -> formflow -> template -[bound property]-> property'
+where '-[foo, bar]->' only follows foo and bar links and '*' matches any type.
+
+To see where the time of a slow search or expansion goes use $$profile=True.
+Each command then shows its time split into serialization, regex matching,
+traversal, edge lookups, colorizing and output, with the nodes and edge lookups it
+touched. $$profile shows a summary of the recent commands, $$profile=foo.json
+saves it and $$profile=False stops profiling.
+
+To see what holds the memory of the graph use $$memory, or $$memory=foo.json
+to also save the report. Memory is broken down by node type, edge link type and
+attribute key, with what interning strings and sharing edge attributes would save.
+
 To regenerate the graph afresh use $$regen. By default, if a cached copy exists
 the graph will be reloaded from the cache. After being regenerated, it will be cached.
 
@@ -69,9 +107,44 @@ Special keys
   ctrl-c  terminate current output
   ctrl-d  exit glow navigator
 
-""")
+"""
+
+def print_banner():
+    """Display the welcome and help text
+    """
+    print(BANNER)
+
+
+class LazySettings(Mapping):
+    """Settings read from the YAML file on first use
+
+    Importing the package stays cheap for tools which
+    never need the settings
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.values = None
+
+    def load(self):
+        """Return the settings dict, reading it if required
+        """
+        if self.values is None:
+            import yaml
+            with open(self.file_name, "r") as f:
+                self.values = yaml.safe_load(f.read())
+        return self.values
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
 
 settings_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'glow_settings.yaml')
 
-with open(settings_file, "r") as f:
-    settings = yaml.safe_load(f.read())
+settings = LazySettings(settings_file)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-builtin
+
+"""Glow Navigator Diff
+
+Compare the graphs of two builds, for example two product
+releases, and report the objects and relationships that
+were added, removed or changed
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+import hashlib
+import json
+
+from . glow_analysis import edge_kind
+
+
+def fingerprint(data):
+    """Return a digest of node or edge data
+
+    Counts are added while navigating so are left out
+    """
+    content = dict((k, v) for k, v in data.iteritems() if k != "counts")
+    return hashlib.md5(json.dumps(content, sort_keys=True)).digest()
+
+def edge_fingerprints(graph, node):
+    """Return dict of (target, kind): [fingerprint] for the edges from node
+    """
+    edges = {}
+    if graph.has_node(node):
+        for _, target, edge_data in graph.edges_iter(node, data=True):
+            key = (target, edge_kind(edge_data))
+            edges.setdefault(key, []).append(fingerprint(edge_data))
+    return edges
+
+def changed_keys(old_data, new_data):
+    """Return the sorted attribute names whose values differ
+    """
+    keys = (set(old_data) | set(new_data)) - set(["counts"])
+    return sorted(k for k in keys if old_data.get(k) != new_data.get(k))
+
+def diff_edges(old, new, node):
+    """Generate the edge changes from node
+
+    Parallel edges of the same kind are matched by their
+    fingerprints and left over pairs are reported as changed
+    """
+    old_edges = edge_fingerprints(old, node)
+    new_edges = edge_fingerprints(new, node)
+    for key in set(old_edges) | set(new_edges):
+        target, kind = key
+        removed = list(old_edges.get(key, []))
+        added = []
+        for digest in new_edges.get(key, []):
+            if digest in removed:
+                removed.remove(digest)
+            else:
+                added.append(digest)
+        changed = min(len(added), len(removed))
+        record = {"source": node, "target": target, "link_type": kind or ""}
+        for change, count in (("changed", changed),
+                              ("added", len(added) - changed),
+                              ("removed", len(removed) - changed)):
+            for _ in range(count):
+                yield dict(record, change=change)
+
+def graph_diff(old, new):
+    """Generate a record for each node and edge that differs
+
+    Each node is visited once in each graph and edges are
+    compared per source node so the cost is linear in the
+    size of the graphs and only one node's edges are held
+    """
+    for node, new_data in new.nodes_iter(data=True):
+        if not old.has_node(node):
+            yield {"change": "added", "node": node, "type": new_data.get("type", "")}
+        elif fingerprint(old.node[node]) != fingerprint(new_data):
+            yield {"change": "changed", "node": node, "type": new_data.get("type", ""),
+                   "keys": changed_keys(old.node[node], new_data)}
+        for record in diff_edges(old, new, node):
+            yield record
+    for node, old_data in old.nodes_iter(data=True):
+        if not new.has_node(node):
+            yield {"change": "removed", "node": node, "type": old_data.get("type", "")}
+            for record in diff_edges(old, new, node):
+                yield record
+
+def diff_summary(records):
+    """Return the counts of changes by node type and edge link type
+    """
+    summary = {"nodes": {}, "edges": {}}
+    for record in records:
+        if "node" in record:
+            group = summary["nodes"].setdefault(record["type"], {})
+        else:
+            group = summary["edges"].setdefault(record["link_type"], {})
+        group[record["change"]] = group.get(record["change"], 0) + 1
+    return summary
+
+def write_diff(old, new, output):
+    """Write a JSON line for each difference then a summary line
+
+    Returns the summary
+    """
+    def records():
+        """Write each record as it is found
+        """
+        for record in graph_diff(old, new):
+            output.write(json.dumps(record, sort_keys=True) + "\n")
+            yield record
+
+    summary = diff_summary(records())
+    output.write(json.dumps({"summary": summary}, sort_keys=True) + "\n")
+    return summary
+
+def print_diff_summary(summary, file=None):
+    """Display the counts of changes grouped by type
+    """
+    for kind, heading in (("nodes", "Objects by type"), ("edges", "Relationships by link type")):
+        print(file=file)
+        print("{}:".format(heading), file=file)
+        print(file=file)
+        if not summary[kind]:
+            print("  no differences", file=file)
+        for name, counts in sorted(summary[kind].iteritems()):
+            print("  {:<30} {}".format(name or "(none)", ", ".join(
+                "{} {}".format(counts[change], change)
+                for change in ("added", "removed", "changed") if change in counts)),
+                  file=file)
+
+
+if __name__ == "__main__":
+    print()
+    print("Compare two builds with 'glow_navigator diff'")
+    print()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-builtin
+
+"""Glow Navigator Export
+
+Write the graph, or a slice of it, for other tools as
+GraphML, JSON Lines or DOT. Nodes and edges are written
+one at a time so no document is built in memory
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+import json
+from xml.sax.saxutils import escape, quoteattr
+
+EXPORT_FORMATS = ("graphml", "jsonl", "dot")
+
+
+## selecting the slice
+
+def neighbourhood(graph, node, hops=1):
+    """Return the set of nodes within hops of node in either direction
+
+    Zero hops follows every path from the node
+    """
+    seen = set([node])
+    frontier = [node]
+    level = 0
+    while frontier and (hops == 0 or level < hops):
+        level += 1
+        found = []
+        for other in frontier:
+            for neighbour in graph.predecessors(other) + graph.successors(other):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    found.append(neighbour)
+        frontier = found
+    return seen
+
+def export_nodes(graph, around=None, hops=1, types=None):
+    """Return the nodes to export
+
+    Around a node only those within hops are included and
+    with types only nodes of those types. Without either
+    the graph itself is returned so nothing is copied
+    """
+    if around is None and not types:
+        return graph
+    nodes = neighbourhood(graph, around, hops) if around is not None else graph
+    if types:
+        nodes = set(node for node in nodes if graph.node[node].get("type") in types)
+    return nodes
+
+def export_edges(graph, nodes):
+    """Generate the (source, target, key, edge data) between nodes
+    """
+    for source in nodes:
+        for _, target, key, edge_data in graph.edges_iter(source, keys=True, data=True):
+            if target in nodes:
+                yield source, target, key, edge_data
+
+def export_attributes(data):
+    """Return the attributes as text or numbers
+
+    Counts are added while navigating so are left out and
+    lists or dicts are written as JSON
+    """
+    return dict((k, v if isinstance(v, (basestring, int, float)) else json.dumps(v))
+                for k, v in data.iteritems() if k != "counts")
+
+
+## formats
+
+def write_jsonl(graph, nodes, output):
+    """Write a JSON line for each node and then each edge
+    """
+    for node in nodes:
+        output.write(json.dumps({"node": node,
+                                 "data": export_attributes(graph.node[node])},
+                                sort_keys=True) + "\n")
+    for source, target, key, edge_data in export_edges(graph, nodes):
+        output.write(json.dumps({"source": source,
+                                 "target": target,
+                                 "key":    key,
+                                 "data":   export_attributes(edge_data)},
+                                sort_keys=True) + "\n")
+
+def write_graphml(graph, nodes, output):
+    """Write GraphML with every attribute as a string key
+
+    The attribute names are collected in a first pass as
+    GraphML declares its keys before the graph
+    """
+    def text(value):
+        """Return a value as escaped utf-8 text
+        """
+        return escape(unicode(value)).encode("utf-8")
+
+    def attr(value):
+        """Return a value as a quoted utf-8 XML attribute
+        """
+        return quoteattr(unicode(value)).encode("utf-8")
+
+    def data_elements(data, prefix):
+        """Return the data elements for the attributes
+        """
+        return "".join('<data key="{}{}">{}</data>'.format(prefix, text(k), text(v))
+                       for k, v in sorted(export_attributes(data).iteritems()))
+
+    node_keys, edge_keys = set(), set()
+    for node in nodes:
+        node_keys.update(k for k in graph.node[node] if k != "counts")
+    for _, _, _, edge_data in export_edges(graph, nodes):
+        edge_keys.update(edge_data)
+
+    output.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    output.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+    for prefix, domain, keys in (("n_", "node", node_keys), ("e_", "edge", edge_keys)):
+        for key in sorted(keys):
+            output.write('<key id="{0}{1}" for="{2}" attr.name="{1}" attr.type="string"/>\n'
+                         .format(prefix, text(key), domain))
+    output.write('<graph id="Glow" edgedefault="directed">\n')
+    for node in nodes:
+        output.write('<node id={}>{}</node>\n'.format(
+            attr(node), data_elements(graph.node[node], "n_")))
+    for source, target, key, edge_data in export_edges(graph, nodes):
+        output.write('<edge id={} source={} target={}>{}</edge>\n'.format(
+            attr(u"{}|{}|{}".format(source, target, key)),
+            attr(source),
+            attr(target),
+            data_elements(edge_data, "e_")))
+    output.write('</graph>\n</graphml>\n')
+
+def write_dot(graph, nodes, output):
+    """Write DOT labelling nodes by name and edges by link type
+    """
+    def quoted(value):
+        """Return a value as a quoted utf-8 DOT id
+        """
+        text = unicode(value).replace("\\", "\\\\").replace('"', '\\"')
+        return u'"{}"'.format(text).encode("utf-8")
+
+    output.write('digraph "Glow" {\n')
+    for node in nodes:
+        node_data = graph.node[node]
+        output.write('  {} [label={}, type={}];\n'.format(
+            quoted(node),
+            quoted(node_data.get("name", node)),
+            quoted(node_data.get("type", ""))))
+    for source, target, _, edge_data in export_edges(graph, nodes):
+        output.write('  {} -> {} [label={}];\n'.format(
+            quoted(source),
+            quoted(target),
+            quoted(edge_data.get("link_type") or edge_data.get("type", ""))))
+    output.write('}\n')
+
+def export_graph(graph, output, format, around=None, hops=1, types=None):
+    # pylint: disable=too-many-arguments
+    """Write the selected slice of the graph in the format
+    """
+    writer = {"graphml": write_graphml, "jsonl": write_jsonl, "dot": write_dot}[format]
+    writer(graph, export_nodes(graph, around, hops, types), output)
+
+
+if __name__ == "__main__":
+    print()
+    print("Export the graph with 'glow_navigator export'")
+    print()
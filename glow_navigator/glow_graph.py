@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glow Navigator Graph
+
+Thin access layer between the navigator and the graph
+store. Whichever backend holds the graph it offers the
+networkx 1.x MultiDiGraph calls in GRAPH_API that the
+builders, queries and reports are written against:
+
+    networkx    networkx 1.11 as is, or networkx 2.x (to 2.2,
+                the last for Python 2) through an adapter
+    compact     read only glow_compact.CompactGraph with
+                integer ids and CSR adjacency in arrays
+
+Graphs are always built with networkx and can then be
+converted to another backend for querying. Under networkx
+2.x graph_class gives glow_networkx.MultiDiGraph
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+BACKENDS = ("networkx", "compact")
+DEFAULT_BACKEND = "networkx"
+
+# calls every backend answers the same way
+GRAPH_API = (
+    "__contains__",
+    "__iter__",
+    "__len__",
+    "edges",
+    "edges_iter",
+    "get_edge_data",
+    "graph",
+    "has_edge",
+    "has_node",
+    "in_degree",
+    "is_directed",
+    "is_multigraph",
+    "name",
+    "node",
+    "nodes",
+    "nodes_iter",
+    "number_of_edges",
+    "number_of_nodes",
+    "out_degree",
+    "predecessors",
+    "successors")
+
+# further calls of the networkx backends used while building,
+# sharing attributes and caching, succ and pred being the dicts
+BUILD_API = ("add_edge", "add_node", "pred", "succ")
+
+
+def networkx_version():
+    """Return the installed networkx version as a tuple of ints
+    """
+    import networkx as nx
+    return tuple(int(x) for x in nx.__version__.split(".")[:2] if x.isdigit())
+
+def graph_class():
+    """Return the mutable graph class for the installed networkx
+    """
+    if networkx_version() < (2,):
+        import networkx as nx
+        return nx.MultiDiGraph
+    from . glow_networkx import MultiDiGraph
+    return MultiDiGraph
+
+def new_graph(**attrs):
+    """Return an empty mutable graph with the graph attributes
+    """
+    return graph_class()(**attrs)
+
+def convert_graph(graph, backend=DEFAULT_BACKEND):
+    """Return the graph held by the backend
+
+    The derived data is computed before converting so the
+    new backend does not need the networkx algorithms
+    """
+    if backend not in BACKENDS:
+        raise ValueError("unknown graph backend '{}', use one of {}".format(
+            backend, ", ".join(BACKENDS)))
+    if backend == "compact":
+        from . glow_compact import compact_graph
+        return compact_graph(graph)
+    return graph
+
+def backend_name(graph):
+    """Return the name of the backend holding the graph
+    """
+    from . glow_compact import CompactGraph
+    return "compact" if isinstance(graph, CompactGraph) else "networkx"
+
+def graph_info(graph):
+    """Return text describing the size of the graph
+
+    The summary of networkx 1.x info which later
+    networkx no longer has
+    """
+    nodes = graph.number_of_nodes()
+    edges = graph.number_of_edges()
+    lines = [
+        "Name: {}".format(graph.name),
+        "Type: {}".format(type(graph).__name__),
+        "Backend: {}".format(backend_name(graph)),
+        "Number of nodes: {}".format(nodes),
+        "Number of edges: {}".format(edges)]
+    if nodes:
+        lines.append("Average in degree: {:>8.4f}".format(edges / float(nodes)))
+        lines.append("Average out degree: {:>7.4f}".format(edges / float(nodes)))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print()
+    print("This module is only a container for the graph access layer")
+    print()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-builtin
+
+"""Glow Navigator HTTP API
+
+Serve JSON answers to queries on one loaded graph
+for other tools. Each connection is answered on its own
+thread and responses carry an ETag based on the graph
+generation
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+import hashlib
+import json
+import re
+from SocketServer import ThreadingMixIn
+import threading
+from urlparse import parse_qs, urlparse
+import uuid
+
+from . glow_server import handle_request
+
+CACHE_SIZE = 256
+
+
+def parse_request(path):
+    """Return a request dict for handle_request from a URL path
+
+    /select?q=regex&ignore=foo,bar&edges=true
+    /node?id=node&depth=n&links=foo,bar
+    /parents?id=node&depth=n and /children?id=node&depth=n
+    /paths?source=node&target=node&cutoff=n&limit=n
+    """
+    url = urlparse(path)
+    params = dict((k, v[-1]) for k, v in parse_qs(url.query).iteritems())
+
+    def as_list(name):
+        """Return comma separated parameter as a list
+        """
+        return [x.strip() for x in params.get(name, "").split(",") if x.strip()]
+
+    options = {
+        "ignore_types": as_list("ignore"),
+        "link_types":   as_list("links"),
+        "edge_match":   params.get("edges", "false").lower() == "true"
+        }
+    if "depth" in params:
+        options["max_level"] = int(params["depth"])
+    request = {"command": url.path.strip("/"), "options": options}
+    if "q" in params:
+        request["query"] = params["q"]
+    if "id" in params:
+        request["node"] = params["id"]
+    for name in ("source", "target", "cutoff", "limit"):
+        if name in params:
+            request[name] = params[name]
+    return request
+
+
+class QueryHTTPServer(ThreadingMixIn, HTTPServer):
+    """Answer each connection on its own thread
+
+    Successful answers are cached by request path for the
+    graph generation, so bad requests never fill the cache
+    """
+    daemon_threads = True
+
+    def __init__(self, address, graph):
+        HTTPServer.__init__(self, address, QueryRequestHandler)
+        self.graph = graph
+        self.generation = graph.graph.get("generation") or uuid.uuid4().hex
+        self.cache = {}
+        self.lock = threading.Lock()
+
+    def etag(self, path):
+        """Return the ETag for a request path on this graph
+        """
+        digest = hashlib.md5(path.encode("utf-8")).hexdigest()
+        return '"{}-{}"'.format(self.generation, digest)
+
+    def answer(self, path):
+        """Return the HTTP status and JSON body for a request path
+
+        400 for requests that are invalid, including invalid
+        regex, and 500 for any other error
+        """
+        with self.lock:
+            if path in self.cache:
+                return self.cache[path]
+        try:
+            response = handle_request(self.graph, parse_request(path))
+        except re.error as err_msg:
+            response = {"error": "invalid regex: {}".format(err_msg)}
+        except (TypeError, ValueError) as err_msg:
+            response = {"error": "{}".format(err_msg)}
+        except Exception as err_msg:    # pylint: disable=broad-except
+            return 500, json.dumps({"error": "{}".format(err_msg)})
+        if "error" in response:
+            return 400, json.dumps(response)
+        result = (200, json.dumps(response))
+        with self.lock:
+            if len(self.cache) >= CACHE_SIZE:
+                self.cache.clear()
+            self.cache[path] = result
+        return result
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """Answer GET requests with JSON
+    """
+
+    def do_GET(self):
+        # pylint: disable=invalid-name
+        """Answer a query unless the client already has it
+        """
+        etag = self.server.etag(self.path)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        status, body = self.server.answer(self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # pylint: disable=redefined-builtin
+        """Keep the console quiet
+        """
+        pass
+
+
+def run_http(graph, host, port):
+    """Serve the HTTP API until interrupted
+    """
+    server = QueryHTTPServer((host, port), graph)
+    print("Serving JSON API on http://{}:{}/ (ctrl-c to stop)".format(host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    print()
+    print("Start the API with 'glow_navigator http'")
+    print()
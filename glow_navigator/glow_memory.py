@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glow Navigator Memory
+
+Account for the memory held by the graph by node type,
+edge link type and attribute key, with the duplicated
+strings and edge attributes that sharing would save
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+import json
+import sys
+
+from . glow_analysis import edge_kind
+
+CONTAINERS = (dict, list, tuple, set, frozenset)
+TOP_ENTRIES = 15
+
+
+def deep_size(obj, seen):
+    """Return the bytes of obj and everything it holds
+
+    Objects already in seen are shared so are not counted again
+    """
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.iterkeys())
+            stack.extend(item.itervalues())
+        elif isinstance(item, CONTAINERS):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(item.__dict__)
+    return size
+
+def dict_size(data, seen, keys):
+    """Return the bytes of an attribute dict, adding each value to keys
+    """
+    if id(data) in seen:
+        return 0
+    seen.add(id(data))
+    size = sys.getsizeof(data)
+    for key, value in data.iteritems():
+        value_size = deep_size(key, seen) + deep_size(value, seen)
+        keys[key] = keys.get(key, 0) + value_size
+        size += value_size
+    return size
+
+def add_usage(usage, name, size):
+    """Add one object of size bytes to the usage of name
+    """
+    entry = usage.setdefault(name, {"count": 0, "bytes": 0})
+    entry["count"] += 1
+    entry["bytes"] += size
+
+def iter_strings(obj):
+    """Generate the strings held by an attribute dict or its values
+    """
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, basestring):
+            yield item
+        elif isinstance(item, dict):
+            stack.extend(item.iterkeys())
+            stack.extend(item.itervalues())
+        elif isinstance(item, CONTAINERS):
+            stack.extend(item)
+
+def string_duplication(graph):
+    """Return the totals and top duplicated strings of the attributes
+
+    Equal strings held as separate objects could be interned
+    """
+    seen = set()
+    values = {}
+    attrs = [graph.node[node] for node in graph.nodes_iter()]
+    attrs.extend(edge_data for _, _, edge_data in graph.edges_iter(data=True))
+    for data in attrs:
+        for text in iter_strings(data):
+            if id(text) not in seen:
+                seen.add(id(text))
+                values[text] = values.get(text, 0) + 1
+    total = sum(sys.getsizeof(text) * count for text, count in values.iteritems())
+    unique = sum(sys.getsizeof(text) for text in values)
+    top = sorted(((sys.getsizeof(text) * (count - 1), count, text)
+                  for text, count in values.iteritems() if count > 1), reverse=True)
+    return {
+        "objects": sum(values.itervalues()),
+        "distinct": len(values),
+        "bytes": total,
+        "savings": total - unique,
+        "top": [{"value": text, "copies": count, "savings": savings}
+                for savings, count, text in top[:TOP_ENTRIES]]
+        }
+
+def edge_duplication(graph):
+    """Return the edge attribute dicts that repeat an equal dict
+
+    Each duplicate could be a shared record instead
+    """
+    seen = set()
+    records = set()
+    duplicates = savings = 0
+    for _, _, edge_data in graph.edges_iter(data=True):
+        if id(edge_data) in seen:
+            continue
+        seen.add(id(edge_data))
+        record = repr(sorted(edge_data.iteritems()))
+        if record in records:
+            duplicates += 1
+            savings += sys.getsizeof(edge_data)
+        records.add(record)
+    return {
+        "dicts": len(seen),
+        "distinct": len(records),
+        "duplicates": duplicates,
+        "savings": savings
+        }
+
+def memory_report(graph):
+    """Return the bytes held by the graph broken down
+
+    Nodes by type, edges by link type, attributes by key,
+    the adjacency structure and the derived indexes, plus
+    the savings from interning strings and sharing edges
+    """
+    seen = set()
+    keys = {}
+    nodes = {}
+    for node, node_data in graph.nodes_iter(data=True):
+        size = deep_size(node, seen) + dict_size(node_data, seen, keys)
+        add_usage(nodes, node_data.get("type") or "undefined", size)
+    edges = {}
+    for _, _, edge_data in graph.edges_iter(data=True):
+        add_usage(edges, edge_kind(edge_data) or "unknown", dict_size(edge_data, seen, keys))
+    derived = {}
+    for key, value in graph.graph.iteritems():
+        derived[key] = deep_size(value, seen)
+    # what is left is the adjacency and node lookups of the graph
+    structure = deep_size(graph, seen)
+    sections = (sum(x["bytes"] for x in nodes.itervalues())
+                + sum(x["bytes"] for x in edges.itervalues())
+                + structure + sum(derived.itervalues()))
+    return {
+        "bytes": sections,
+        "nodes": nodes,
+        "edges": edges,
+        "keys": keys,
+        "structure": structure,
+        "derived": derived,
+        "strings": string_duplication(graph),
+        "edge_dicts": edge_duplication(graph),
+        "peak_rss": peak_rss()
+        }
+
+def peak_rss():
+    """Return the peak resident bytes of the process, None without resource
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def save_memory_report(report, file_name):
+    """Save the memory report as JSON
+    """
+    with open(file_name, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+def mb(size):
+    """Return bytes as MB text
+    """
+    return "{:.2f}".format(size / 1048576.0)
+
+def print_usage(title, usage):
+    """Display the largest entries of a usage table
+    """
+    print()
+    print("{:<40} {:>10} {:>10}".format(title, "Count", "MB"))
+    top = sorted(usage.iteritems(), key=lambda x: -x[1]["bytes"])[:TOP_ENTRIES]
+    for name, entry in top:
+        print("{:<40} {:>10} {:>10}".format(name, entry["count"], mb(entry["bytes"])))
+
+def print_memory_report(report):
+    """Display the memory report
+    """
+    print()
+    print("Graph holds {} MB".format(mb(report["bytes"])))
+    if report["peak_rss"]:
+        print("Process peak resident {} MB".format(mb(report["peak_rss"])))
+    print_usage("Node type", report["nodes"])
+    print_usage("Edge link type", report["edges"])
+    print()
+    print("{:<40} {:>21}".format("Attribute key", "MB"))
+    for key, size in sorted(report["keys"].iteritems(), key=lambda x: -x[1])[:TOP_ENTRIES]:
+        print("{:<40} {:>21}".format(key, mb(size)))
+    print()
+    print("{:<40} {:>21}".format("Adjacency", mb(report["structure"])))
+    for key, size in sorted(report["derived"].iteritems()):
+        print("{:<40} {:>21}".format("graph['{}']".format(key), mb(size)))
+    strings = report["strings"]
+    print()
+    print("{} strings, {} distinct, {} MB: interning would save {} MB".format(
+        strings["objects"], strings["distinct"], mb(strings["bytes"]), mb(strings["savings"])))
+    for entry in strings["top"]:
+        print("  {:>8} copies {:>8} MB  {}".format(
+            entry["copies"], mb(entry["savings"]), entry["value"][:60]))
+    edge_dicts = report["edge_dicts"]
+    print()
+    print("{} edge attribute dicts, {} distinct: sharing would save {} MB".format(
+        edge_dicts["dicts"], edge_dicts["distinct"], mb(edge_dicts["savings"])))
+
+
+if __name__ == "__main__":
+    print()
+    print("This module is only a container for memory accounting functions")
+    print()
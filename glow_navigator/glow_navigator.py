@@ -13,49 +13,72 @@ from __future__ import print_function
 from builtins import input
 
 # standard libraries
+from contextlib import contextmanager
 import copy
 import glob
+import heapq
+import json
 import os.path
 import re
-try:
-    import readline                 # pylint: disable=unused-import
-except ImportError:
-    import pyreadline as readline   # pylint: disable=unused-import
 import sys
-reload(sys)
-sys.setdefaultencoding("utf-8")
+import threading
 import time
-import xml.etree.ElementTree as ET
-
-# external libraries
-import click
-import networkx as nx
-from colorama import init
-
-from . glow_config import settings
+import uuid
+
+# heavy libraries (networkx, click, colorama, readline, xml)
+# are imported where first used so importing is cheap and
+# free of side effects, see glow_cli for the entry points
+
+from . glow_analysis import (
+    add_condensation,
+    add_link_index,
+    add_orphans,
+    add_type_index,
+    edge_kind,
+    file_nodes,
+    file_object_type,
+    linked,
+    print_coverage,
+    print_cycles,
+    print_orphans,
+    print_pattern,
+    print_impact,
+    read_file_list,
+    source_key)
+from . glow_config import print_banner, settings
+from . glow_graph import DEFAULT_BACKEND, convert_graph, graph_info, new_graph
 from . glow_utils import (
+    FrozenRecord,
     base_name,
     colorized,
+    file_digest,
     full_guid,
     glow_file_object,
     glow_file_objects,
     invalid_regex,
     load_yaml_file,
-    load_object_from_file,
-    save_object_to_file,
+    load_objects_from_file,
+    save_objects_to_file,
     match,
-    pindent)
-
-COMMAND_LOOKUP = {}
-FORMSTEP_LOOKUP = {}
-FORMFLOW_LOOKUP = {}
-MODULE_LOOKUP = {}
-MAX_LEVEL = 1
-IGNORE_TYPES = []
-EDGE_MATCH = False
-MINIMAL_DISPLAY = True
+    pindent,
+    shared_dict,
+    shared_string)
+
 CACHE_FILE = os.path.abspath("glow_graph.pickle")
-GLOW_GRAPH = None
+CACHE_CHUNK = 1000
+BUILD_REPORT_FILE = os.path.abspath("glow_build.json")
+BUILD_COUNTERS = ("files", "bytes", "parse_seconds", "xml_seconds",
+                  "fallbacks", "fallback_seconds")
+SLOWEST_FILES = 10
+# object types every other object refers to, see update_graph
+UPDATE_REBUILD_TYPES = ("entity", "metadata", "index")
+SOCKET_FILE = os.path.abspath("glow_navigator.sock")
+SESSION_SETTINGS = ("$$max_level=", "$$ignore=", "$$links=", "$$edges=", "$$minimal=")
+# elements of the embedded XML the builders read
+WORKFLOW_ACTIVITIES = ("ShowFormActivity", "JumpToActivity", "ConditionalIfActivity",
+                       "ConditionalWhileActivity", "NativeTransitionInfo",
+                       "PlayAudioActivity", "RunCommandActivity")
+TEMPLATE_ELEMENTS = ("control", "form", "placeholder")
 
 
 class GlowObject(object):
@@ -65,32 +88,42 @@ class GlowObject(object):
     Represents various objects available in Glow.
     A field mapping provides a friendly and object
     neutral way to access various values passed
-    in from the YAML definition
+    in from the YAML definition.
+
+    Each object type has a subclass made once by
+    glow_object_class with a property per field and
+    no instance dict, see glow_object.
+    GlowObject(mapping, values) still gives the object
+    of that subclass
     """
-    def __init__(self, mapping, values):
-        self.type = mapping["type"]
-        self.fields = mapping["fields"]
-        self.values = values
+    __slots__ = ("values",)
+    type = None
+    fields = {}
+    map_fields = ()
+
+    def __new__(cls, *args):
+        if cls is GlowObject and len(args) == 2:
+            cls = glow_object_class(args[0])
+        return super(GlowObject, cls).__new__(cls)
+
+    def __init__(self, *args):
+        # the values follow the mapping when called on GlowObject
+        self.values = args[-1]
 
     def __getattr__(self, attr):
         """Provide value lookup as attributes
 
-        Allows value dict items to be accessed as
-        properties e.g. {"foo": "bar"} can be
-        accessed as my_obj.foo.
-
-        Also uses the friendly mapping such that
-        if "foo" is mapped to "baz" then we can
-        call my_obj.baz to obtain "bar"
+        Fields have properties on the class so this is only
+        called for other names, which are looked up in the
+        values as they are e.g. {"foo": "bar"} can be
+        accessed as my_obj.foo. Special names are not values
         """
-        field = attr
-        if attr in self.fields:
-            field = self.fields[attr]
-        if field in self.values:
-            result = self.values[field]
-            if attr == "guid":
-                result = result.lower()
-            return result
+        if attr == "values" or attr.startswith("__"):
+            raise AttributeError(attr)
+        result = self.values.get(attr)
+        if attr == "guid" and result is not None:
+            result = result.lower()
+        return result
 
     def map(self):
         """Return a dict of values mapped to fields
@@ -98,18 +131,83 @@ class GlowObject(object):
         Returns a limited subset of values: those that
         have keys mapped in the fields dictionary
         """
-        noisy_attributes = (
-            "data", "guid", "tasks",
-            "dependencies", "properties"
-        )
-        mapping = {k : self.values[v]
-                   for k, v in self.fields.iteritems()
-                   if v in self.values}
+        values = self.values
+        mapping = {k: values[v] for k, v in self.map_fields if v in values}
         mapping["type"] = self.type
-        for attr in noisy_attributes:
-            mapping.pop(attr, None)
         return mapping
 
+    def release(self, attr):
+        """Remove the value of a field and return it
+
+        Large payloads such as XML are released this way
+        so they are freed as soon as they are parsed
+        """
+        return self.values.pop(self.fields.get(attr, attr), None)
+
+
+# attributes of every GlowObject that fields cannot replace
+GLOW_OBJECT_ATTRIBUTES = ("fields", "map", "map_fields", "type", "values")
+GLOW_OBJECT_CLASSES = {}
+NOISY_ATTRIBUTES = ("data", "guid", "tasks", "dependencies", "properties")
+
+def field_property(field, lower=False):
+    """Return a property for the value of field, lowercased if lower
+
+    Missing values are None and setting the property
+    sets the value
+    """
+    if lower:
+        def get_value(self):
+            """Return the lowercased value
+            """
+            value = self.values.get(field)
+            return value if value is None else value.lower()
+    else:
+        def get_value(self):
+            """Return the value
+            """
+            return self.values.get(field)
+
+    def set_value(self, value):
+        """Set the value
+        """
+        self.values[field] = value
+
+    return property(get_value, set_value)
+
+def glow_object_class(mapping):
+    """Return the GlowObject class for the mapping of an object type
+
+    Classes are made once for each mapping with a property
+    per field so attribute access needs no lookup of the
+    field or check for the guid
+    """
+    fields = mapping["fields"]
+    cls = GLOW_OBJECT_CLASSES.get(id(fields))
+    if cls is not None and cls.fields is fields and cls.type == mapping["type"]:
+        return cls
+    attrs = {
+        "__slots__":  (),
+        "type":       mapping["type"],
+        "fields":     fields,
+        "map_fields": tuple((k, v) for k, v in fields.iteritems()
+                            if k not in NOISY_ATTRIBUTES)
+        }
+    for attr, field in fields.iteritems():
+        if attr not in GLOW_OBJECT_ATTRIBUTES:
+            attrs[attr] = field_property(field, attr == "guid")
+    name = "Glow{}".format("".join(x.title() for x in mapping["type"].split("_")))
+    cls = GLOW_OBJECT_CLASSES[id(fields)] = type(str(name), (GlowObject,), attrs)
+    return cls
+
+def glow_object(mapping, values):
+    """Return the GlowObject for the values of an object type
+
+    In loops over one type get the class from glow_object_class
+    once and call it with the values instead
+    """
+    return glow_object_class(mapping)(values)
+
 
 class BusinessTestParser(object):
     """Glow Business Test parser for locating object references
@@ -138,12 +236,99 @@ class BusinessTestParser(object):
         return {"name": self.name, "type": "test"}
 
 
+class XMLStream(object):
+    """File like reader of the XML embedded in an object
+
+    Encodes the XML a chunk at a time as it is read so
+    no encoded copy of the whole XML is made
+    """
+
+    def __init__(self, xml):
+        self.xml = xml
+        self.offset = 0
+
+    def read(self, size=-1):
+        """Return the next size characters encoded as UTF-8
+        """
+        if size < 0:
+            size = len(self.xml) - self.offset
+        chunk = self.xml[self.offset:self.offset + size]
+        self.offset += len(chunk)
+        return chunk.encode(encoding='utf-8')
+
+
 class XMLParser(object):
     """Glow Template XML parser
+
+    Given tags the XML is streamed and only the elements
+    matching them are kept, otherwise the whole tree is
     """
 
-    def __init__(self, xml):
-        self.tree = ET.fromstring(xml.encode(encoding='utf-8'))
+    # elements whose data are made from their children,
+    # and grandchildren for a Grid, read as they end
+    NESTED_TAGS = {"control": 1, "form": 1, "placeholder": 1, "Grid": 2}
+
+    def __init__(self, xml=None, tags=None):
+        import xml.etree.ElementTree as ET
+        self.tree = None
+        self.elements = None
+        if tags is not None:
+            self.elements = list(self.scan(xml, tags))
+        elif xml is not None:
+            self.tree = ET.fromstring(xml.encode(encoding='utf-8'))
+
+    def scan(self, xml, tags):
+        """Generator for (tag, attributes, data) of elements matching tags
+
+        The XML is streamed with iterparse rather than held
+        in a tree. Elements are given in document order as
+        they start, except that elements of NESTED_TAGS are
+        read as they end and hold back the elements inside
+        them until then. Once an element ends its children
+        are dropped, and it is dropped from its parent too
+        unless the data of an open element is made from it,
+        so only the open elements and those are in memory
+        """
+        import xml.etree.ElementTree as ET
+        parents = []
+        pending = []
+        held = []
+        for event, node in ET.iterparse(XMLStream(xml), events=("start", "end")):
+            tag = self.remove_xmlns(node.tag)
+            if event == "start":
+                if tag in tags and tag in self.NESTED_TAGS:
+                    entry = [tag, node.attrib, None]
+                    held.append((len(parents), len(parents) + self.NESTED_TAGS[tag], entry))
+                    pending.append(entry)
+                elif tag in tags:
+                    pending.append([tag, node.attrib, self._data(node, tag)])
+                parents.append(node)
+            else:
+                parents.pop()
+                depth = len(parents)
+                if held and held[-1][0] == depth:
+                    held.pop()[2][2] = self._data(node, tag)
+                needed = max(levels for _, levels, _ in held) if held else -1
+                if depth >= needed:
+                    del node[:]
+                    if depth > needed and parents:
+                        parents[-1].remove(node)
+            if not held:
+                for entry in pending:
+                    yield tuple(entry)
+                pending = []
+
+    def nodes(self, tag):
+        """Generator for (attributes, node or data) of elements matching tag
+        """
+        if self.elements is not None:
+            for found_tag, attrib, data in self.elements:
+                if found_tag == tag:
+                    yield attrib, data
+        else:
+            for node in self.tree.iter():
+                if self.remove_xmlns(node.tag) == tag:
+                    yield node.attrib, node
 
     def iterfind(self, tag, code=None):
         """Generator for elements matching tag with code
@@ -151,17 +336,19 @@ class XMLParser(object):
         Find nodes with tag of type code and return an
         appropriate data structure (varies by tag)
         """
-        for node in self.tree.iter():
-            if self.remove_xmlns(node.tag) == tag:
-                if code is None or ("code" in node.attrib and node.attrib["code"] == code):
+        for attrib, node in self.nodes(tag):
+            if code is None or ("code" in attrib and attrib["code"] == code):
+                if self.tree is not None:
                     yield self._data(node, tag)
+                else:
+                    # a copy as callers change the data
+                    yield node if node is None else dict(node)
 
     def iteritems(self, tag):
         """Generator for obtaining attributes of elements matching tag
         """
-        for node in self.tree.iter():
-            if self.remove_xmlns(node.tag) == tag:
-                yield node.attrib
+        for attrib, _ in self.nodes(tag):
+            yield attrib
 
     def properties_by_name(self, name):
         """Return a dict of property dicts from all elements
@@ -426,69 +613,411 @@ class XMLParser(object):
         """
         return re.sub(r"\{.*\}", "", text)
 
+class GraphBuild(object):
+    """Glow Graph build state
+
+    Objects refer to each other by name as well as by
+    guid so lookups are collected as objects are added.
+    Each build has its own so builds can run side by side.
+    Phases record files and bytes read, parsing time,
+    property searches and the rest as graph insertion.
+    The digest of each file read and the names it added
+    to the lookups are kept for updates
+    """
+
+    def __init__(self):
+        self.commands = {}
+        self.formsteps = {}
+        self.formflows = {}
+        self.modules = {}
+        self.digests = {}
+        self.names = {}
+        self.source = None
+        self.phases = []
+        self.slowest = []
+        self.counters = None
+
+    @contextmanager
+    def phase(self, name, items=0):
+        """Time a phase of the build
+        """
+        start_time = time.time()
+        self.counters = dict.fromkeys(BUILD_COUNTERS, 0)
+        self.counters["phase"] = name
+        yield
+        record = self.counters
+        self.counters = None
+        record["items"] = items
+        record["seconds"] = time.time() - start_time
+        record["insert_seconds"] = max(0, record["seconds"] - record["parse_seconds"]
+                                       - record["xml_seconds"] - record["fallback_seconds"])
+        self.phases.append(record)
+
+    def count(self, key, amount=1):
+        """Add to a counter of the current phase
+        """
+        if self.counters is not None:
+            self.counters[key] += amount
+
+    @contextmanager
+    def timed(self, key):
+        """Add the time taken to a counter of the current phase
+        """
+        start_time = time.time()
+        yield
+        self.count(key, time.time() - start_time)
+
+    @contextmanager
+    def source_file(self, file_name):
+        """Count a file read in the current phase and keep the slowest
+
+        Names added to the lookups while reading belong to the file
+        """
+        start_time = time.time()
+        self.count("files")
+        self.count("bytes", os.path.getsize(file_name))
+        self.source = source_key(file_name)
+        self.digests[self.source] = file_digest(file_name)
+        self.names[self.source] = []
+        yield
+        self.source = None
+        entry = (time.time() - start_time, file_name,
+                 self.counters["phase"] if self.counters else "")
+        if len(self.slowest) < SLOWEST_FILES:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def report(self):
+        """Return the phases and slowest files as a dict
+        """
+        return {
+            "seconds": sum(phase["seconds"] for phase in self.phases),
+            "phases":  self.phases,
+            "slowest": [{"file": file_name, "phase": phase, "seconds": seconds}
+                        for seconds, file_name, phase in sorted(self.slowest, reverse=True)]
+            }
+
+    @contextmanager
+    def progress(self, items, label):
+        """Show progress through the items of a timed phase
+        """
+        import click
+        items = list(items)
+        with self.phase(label.strip(), len(items)):
+            with click.progressbar(items, label=label, show_eta=False) as progress_bar:
+                yield progress_bar
+
+    def load_yaml(self, file_name):
+        """Return YAML from file
+        """
+        with self.timed("parse_seconds"):
+            return load_yaml_file(file_name)
+
+    def parse_xml(self, xml, tags=None):
+        """Return a parser for the XML embedded in an object
+
+        Given tags only the matching elements are kept
+        """
+        with self.timed("xml_seconds"):
+            return XMLParser(xml, tags)
+
+    def lookups(self):
+        """Return the lookups to keep with the graph
+        """
+        return {
+            "commands":  self.commands,
+            "formsteps": self.formsteps,
+            "formflows": self.formflows,
+            "modules":   self.modules,
+            "names":     self.names
+            }
+
+    def restore(self, lookups):
+        """Continue from the lookups of an earlier build
+        """
+        lookups = copy.deepcopy(lookups)
+        self.commands = lookups["commands"]
+        self.formsteps = lookups["formsteps"]
+        self.formflows = lookups["formflows"]
+        self.modules = lookups["modules"]
+        self.names = lookups["names"]
+
+    def add_name(self, lookup, name, node):
+        """Add a name to a lookup for the source being read
+        """
+        getattr(self, lookup)[name] = node
+        if self.source is not None:
+            self.names[self.source].append((lookup, name, node))
+
+    def resolve(self, keys):
+        """Set the lookups again from the names the sources added
+
+        Given the source keys in the order a build reads them
+        a name added by several sources refers to the node
+        of the last, as it does after the build
+        """
+        self.formsteps, self.formflows, self.modules = {}, {}, {}
+        for key in keys:
+            for lookup, name, node in self.names.get(key, ()):
+                getattr(self, lookup)[name] = node
+
+    def add_command(self, command, entity):
+        """Add discovered command to lookup
+        """
+        self.commands.setdefault(command, []).append(entity)
+
+    def command_entity(self, command, entity):
+        """Get the best command node name
+        """
+        result = entity
+        if command in self.commands:
+            if not entity in self.commands[command]:
+                result = self.commands[command][0]
+        return result
+
+
+class GlowSession(object):
+    # pylint: disable=too-many-arguments
+    """Glow Navigator session
+
+    Carries the query settings of one user or client so that
+    many sessions can share one read only graph, each with
+    their own settings, without locks or copies
+    """
+
+    def __init__(self, graph=None, max_level=1, ignore_types=None,
+                 link_types=None, edge_match=False, minimal_display=True):
+        self.graph = graph
+        self.max_level = max_level
+        self.ignore_types = ignore_types or []
+        self.link_types = link_types or []
+        self.edge_match = edge_match
+        self.minimal_display = minimal_display
+        self.profile = None
+        self.profiling = False
+
+    def options(self):
+        """Return the query settings as a dict
+        """
+        return {
+            "max_level":    self.max_level,
+            "ignore_types": self.ignore_types,
+            "link_types":   self.link_types,
+            "edge_match":   self.edge_match
+            }
+
+    def select(self, query):
+        """Obtain list of nodes that match provided pattern
+        """
+        return select_nodes(self.graph, query, self.ignore_types, self.edge_match)
+
+    def entries(self, target, func):
+        """Generate the parent / child entries from target
+        """
+        return tree_entries(self.graph, target, func, self.max_level,
+                            self.ignore_types, self.link_types)
+
+    @contextmanager
+    def profiled(self, query):
+        """Profile the command while $$profile is on
+        """
+        if self.profiling and not query.startswith("$$profile"):
+            with self.profile.command(query):
+                yield
+        else:
+            yield
+
+    def print_selected_node(self, index, nodes):
+        """Display selected node details
+        """
+        node, node_data = nodes[index]
+        print_node_detail(
+            node_data,
+            self.counted_entries(node, self.graph.predecessors),
+            self.counted_entries(node, self.graph.successors),
+            self.minimal_display)
+
+    def counted_entries(self, target, func):
+        """Generate the entries from target with counts for display
+        """
+        for level, node, node_data, edges, repeated in self.entries(target, func):
+            if node_data:
+                node_data = get_node_data(self.graph, node)
+            yield level, node, node_data, edges, repeated
+
+    def special_command(self, query):
+        """Provide for special commands to change settings
+
+        -> '$$max_level=n' to set graph expansion depth
+        -> '$$ignore=foo bar' to ignore foo and bar types
+        -> '$$edges=True' to include edges in the match
+        -> '$$links=foo, bar' to only follow foo and bar links
+        -> '$$minimal=False' to expand attributes printed
+        -> '$$regen' to regenerate the graph
+        -> '$$impact=foo, bar' to show objects affected by changed files
+        -> '$$coverage=foo.csv' to report objects not reached by tests
+        -> '$$cycles' to report cycles between objects
+        -> '$$orphans=foo, bar.csv' to report references to undefined objects
+        -> '$$pattern=foo -> bar' to find chains of foo calling bar
+        -> '$$profile=True' to time commands, '$$profile' for the summary
+        -> '$$memory=foo.json' to report the memory held by the graph
+        """
+        if query.startswith("$$max_level="):
+            try:
+                level = int(query.rsplit("=")[-1])
+            except ValueError:
+                print("\n-> Error: Invalid value for max level!\n")
+            else:
+                self.max_level = level
+                print("\n-> MAX_LEVEL updated to {}\n".format(level))
+            return True
+        elif query.startswith("$$ignore="):
+            self.ignore_types = query.rsplit("=")[-1].split()
+            print("\n-> IGNORE_TYPES updated to {}\n".format(self.ignore_types))
+            return True
+        elif query.startswith("$$links="):
+            value = query.split("=", 1)[-1]
+            self.link_types = [x.strip() for x in value.split(",") if x.strip()]
+            print("\n-> LINK_TYPES updated to {}\n".format(self.link_types))
+            return True
+        elif query.startswith("$$edges="):
+            value = query.rsplit("=")[-1].lower()
+            self.edge_match = {"true": True, "false": False}.get(value, False)
+            print("\n-> EDGE_MATCH updated to {}\n".format(self.edge_match))
+            return True
+        elif query.startswith("$$minimal="):
+            value = query.rsplit("=")[-1].lower()
+            self.minimal_display = {"true": True, "false": False}.get(value, True)
+            print("\n-> MINIMAL_DISPLAY updated to {}\n".format(self.minimal_display))
+            return True
+        elif query.startswith("$$regen"):
+            print()
+            self.graph = create_graph()
+            print_graph_info(self.graph)
+            return True
+        elif query.startswith("$$impact="):
+            value = query.split("=", 1)[-1].strip()
+            if value.startswith("@"):
+                file_names = read_file_list(value[1:])
+            else:
+                file_names = [x.strip() for x in value.split(",") if x.strip()]
+            print_impact(self.graph, file_names, self.link_types)
+            return True
+        elif query.startswith("$$coverage"):
+            file_name = query.split("=", 1)[-1].strip() if "=" in query else None
+            print_coverage(self.graph, file_name, self.link_types)
+            return True
+        elif query.startswith("$$cycles"):
+            print_cycles(self.graph)
+            return True
+        elif query.startswith("$$orphans"):
+            value = query.split("=", 1)[-1] if "=" in query else ""
+            values = [x.strip() for x in value.split(",") if x.strip()]
+            file_names = [x for x in values if x.lower().endswith((".csv", ".json"))]
+            types = [x for x in values if x not in file_names]
+            print_orphans(self.graph, types, file_names[-1] if file_names else None)
+            return True
+        elif query.startswith("$$pattern="):
+            try:
+                print_pattern(self.graph, query.split("=", 1)[-1])
+            except ValueError as err_msg:
+                print("\n-> Error: Invalid pattern, {}!\n".format(err_msg))
+            return True
+        elif query.startswith("$$memory"):
+            from . glow_memory import memory_report, print_memory_report, save_memory_report
+            report = memory_report(self.graph)
+            print_memory_report(report)
+            if "=" in query and query.split("=", 1)[-1].strip():
+                save_memory_report(report, query.split("=", 1)[-1].strip())
+            return True
+        elif query.startswith("$$profile"):
+            from . glow_profile import QueryProfile, print_profile_summary
+            value = query.split("=", 1)[-1].strip() if "=" in query else ""
+            if self.profile is None:
+                self.profile = QueryProfile()
+            if value.lower() in ("true", "false"):
+                self.profiling = value.lower() == "true"
+                print("\n-> PROFILE updated to {}\n".format(self.profiling))
+            elif value:
+                self.profile.save(value)
+                print("\n-> Profile saved to {}\n".format(value))
+            else:
+                print_profile_summary(self.profile)
+            return True
+
+
 def print_graph_info(graph):
     """Output stats about the graph
     """
-    print(nx.info(graph))
+    print(graph_info(graph))
     if graph.number_of_nodes() == 0:
         print("Nothing was added to the graph - run again in the Glow source root\n")
         sys.exit()
-    missing_nodes(graph)
 
-def create_graph():
+def print_build_report(report):
+    """Output the time spent in each phase of the build
+    """
+    row = "{:<25} {:>7} {:>7} {:>8} {:>8} {:>9} {:>9} {:>9} {:>8}"
+    print(row.format("Phase", "Files", "MB", "Parse s", "XML s", "Insert s",
+                     "Searches", "Search s", "Total s"))
+    for phase in report["phases"]:
+        print(row.format(
+            phase["phase"], phase["files"], "{:.1f}".format(phase["bytes"] / 1048576.0),
+            "{:.2f}".format(phase["parse_seconds"]), "{:.2f}".format(phase["xml_seconds"]),
+            "{:.2f}".format(phase["insert_seconds"]), phase["fallbacks"],
+            "{:.2f}".format(phase["fallback_seconds"]), "{:.2f}".format(phase["seconds"])))
+    if report["slowest"]:
+        print("\nSlowest files:")
+        for entry in report["slowest"]:
+            print("{:>8.3f}s  {}".format(entry["seconds"], os.path.relpath(entry["file"])))
+    print()
+
+def save_build_report(report, file_name):
+    """Save the build report as JSON
+    """
+    with open(file_name, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+def create_graph(cache_file=CACHE_FILE, build=None):
     """Create directed graph of objects
 
     Each Glow object is added as a node
     to the graph and references are added
-    as edges from caller to callee
+    as edges from caller to callee. The
+    digest of each file and the build lookups
+    are kept with the graph so it can be
+    updated later, see update_graph. The build
+    report is shown and saved alongside the cache
     """
-    def process_glow_object():
-        """Handle the type of object that we are parsing
-        """
-        if glow_object.type == "entity":
-            add_entity_to_graph(graph, glow_object, file_name)
-        elif glow_object.type == "index":
-            add_index_to_graph(graph, glow_object, file_name)
-        elif glow_object.type == "metadata":
-            add_metadata_to_graph(graph, glow_object, file_name)
-        elif glow_object.type == "condition":
-            add_condition_to_graph(graph, glow_object, file_name)
-        elif glow_object.type == "formflow":
-            add_formflow_to_graph(graph, glow_object)
-        elif glow_object.type in  ("image", "sound"):
-            graph.add_node(glow_object.guid, glow_object.map())
-        elif glow_object.type == "module":
-            add_module_to_graph(graph, glow_object)
-        elif glow_object.type == "template":
-            add_template_to_graph(graph, glow_object)
-
     start_time = time.time()
-    graph = nx.MultiDiGraph(name="Glow")
+    graph = new_graph(name="Glow", generation=uuid.uuid4().hex)
+    # the nodes made from each file, for impact analysis
+    sources = graph.graph["sources"] = {}
+    if build is None:
+        build = GraphBuild()
 
     base_list = ["entity", "metadata"]
     load_list = ["index", "image", "sound"]
     omit_list = base_list + load_list + ["test"]
 
+    def add_files(attrs, label_text):
+        """Add each file of an object type to the graph
+        """
+        with build.progress(glob.glob(os.path.abspath(attrs["path"])),
+                            "{0:25}".format(label_text)) as progress_bar:
+            for file_name in progress_bar:
+                with build.source_file(file_name):
+                    nodes = add_file_to_graph(graph, attrs, file_name, build)
+                if nodes is not None:
+                    sources[source_key(file_name)] = nodes
+
     # add entity related stuff first so the command dict is available
     for attrs in (glow_file_object(x) for x in base_list):
-        abs_path = os.path.abspath(attrs["path"])
-        label_text = "{0:25}".format("Loading {} list".format(attrs["type"]))
-        with click.progressbar(
-            glob.glob(abs_path),
-            label=label_text,
-            show_eta=False) as progress_bar:
-            for file_name in progress_bar:
-                values = load_yaml_file(file_name)
-                if not values:
-                    continue
-                glow_object = GlowObject(attrs, values)
-                process_glow_object()
+        add_files(attrs, "Loading {} list".format(attrs["type"]))
 
     # add interdependent links if we can intuit them
-    with click.progressbar(
-        graph.nodes_iter(),
-        label="{0:25}".format("Adding dependencies"),
-        show_eta=False) as progress_bar:
+    with build.progress(graph.nodes_iter(), "{0:25}".format("Adding dependencies")) as progress_bar:
         dep_dict = {
             "type":      "link",
             "link_type": "property dependency"
@@ -496,87 +1025,191 @@ def create_graph():
         for node in progress_bar:
             attrs = graph.node[node]
             if 'dependency' in attrs:
-                add_property_edge_if_exists(graph, node, attrs['dependency'], dep_dict)
+                add_property_edge_if_exists(graph, node, attrs['dependency'], dep_dict, build)
 
     # load remaining reference objects
     for attrs in (glow_file_object(x) for x in load_list):
-        abs_path = os.path.abspath(attrs["path"])
-        label_text = "{0:25}".format("Loading {} list".format(attrs["type"]))
-        with click.progressbar(
-            glob.glob(abs_path),
-            label=label_text,
-            show_eta=False) as progress_bar:
-            for file_name in progress_bar:
-                values = load_yaml_file(file_name)
-                if not values:
-                    continue
-                glow_object = GlowObject(attrs, values)
-                process_glow_object()
+        add_files(attrs, "Loading {} list".format(attrs["type"]))
 
     # analyse the remaining items
     for attrs in glow_file_objects(omit=omit_list):
-        abs_path = os.path.abspath(attrs["path"])
-        label_text = "{0:25}".format("Analysing {}s".format(attrs["type"]))
-        with click.progressbar(
-            glob.glob(abs_path),
-            label=label_text,
-            show_eta=False) as progress_bar:
-            for file_name in progress_bar:
-                values = load_yaml_file(file_name)
-                if not values:
-                    continue
-                glow_object = GlowObject(attrs, values)
-                process_glow_object()
+        add_files(attrs, "Analysing {}s".format(attrs["type"]))
 
-    # finally add test which are not yaml and need their own parsing strategy
-    # also now in their own special folder which has to be computed from current
+    # finally add tests which are not yaml and need their own parsing strategy
     attrs = settings["test"]
-    abs_path = os.path.abspath(attrs["path"]).replace("Platform Builder", "BusinessTests")
-    label_text = "{0:25}".format("Analysing {}s".format(attrs["type"]))
-    with click.progressbar(
-        glob.glob(abs_path),
-        label=label_text,
-        show_eta=False) as progress_bar:
-        for file_name in progress_bar:
-            test = BusinessTestParser(file_name, attrs["matchers"])
-            if not test.matches("ignore"):
-                graph.add_node(test.name, test.map())
-                for module in test.matches("module"):
-                    graph.add_edge(
-                        test.name,
-                        MODULE_LOOKUP.get(module, module),
-                        attr_dict={
-                            "type":      "link",
-                            "link_type": "business test",
-                            "ref_type":  "module",
-                            "name":      module
-                        })
-                for template in test.matches("template"):
-                    graph.add_edge(
-                        test.name,
-                        FORMSTEP_LOOKUP.get(template, template),
-                        attr_dict={
-                            "type":      "link",
-                            "link_type": "business test",
-                            "ref_type":  "template",
-                            "name":      template
-                        })
-                for formflow in test.matches("formflow"):
-                    graph.add_edge(
-                        test.name,
-                        FORMFLOW_LOOKUP.get(formflow, formflow),
-                        attr_dict={
-                            "type":      "link",
-                            "link_type": "business test",
-                            "ref_type":  "formflow",
-                            "name":      formflow
-                        })
+    add_files(attrs, "Analysing {}s".format(attrs["type"]))
+
+    graph.graph["digests"] = build.digests
+    graph.graph["lookups"] = build.lookups()
+    with build.phase("Sharing attributes", graph.number_of_edges()):
+        share_attributes(graph)
+    with build.phase("Indexing", graph.number_of_nodes()):
+        add_condensation(graph)
+        add_link_index(graph)
+        add_type_index(graph)
+        orphans = add_orphans(graph)
     end_time = time.time()
     elapsed_time = round(end_time - start_time)
     print("\nGraph completed in {} seconds\n".format(elapsed_time))
-    save_object_to_file(graph, CACHE_FILE)
+    print_build_report(build.report())
+    if cache_file:
+        save_graph(graph, cache_file)
+        save_build_report(build.report(), BUILD_REPORT_FILE)
+    if orphans:
+        print("{} references to undefined objects, use $$orphans to list them\n".format(
+            len(orphans)))
     return graph
 
+def add_file_to_graph(graph, attrs, file_name, build):
+    """Read a source file and add its object to the graph
+
+    Returns the nodes made from the file for the sources
+    of the graph, or None if the file holds no object
+    """
+    if attrs["type"] == "test":
+        with build.timed("parse_seconds"):
+            test = BusinessTestParser(file_name, attrs["matchers"])
+        if test.matches("ignore"):
+            return None
+        add_test_to_graph(graph, test, build)
+        return [test.name]
+    values = build.load_yaml(file_name)
+    if not values:
+        return None
+    obj = glow_object_class(attrs)(values)
+    add_object_to_graph(graph, obj, file_name, build)
+    return file_nodes(file_name, attrs, obj.values)
+
+def add_object_to_graph(graph, obj, file_name, build):
+    """Handle the type of object that we are parsing
+    """
+    if obj.type == "entity":
+        add_entity_to_graph(graph, obj, file_name, build)
+    elif obj.type == "index":
+        add_index_to_graph(graph, obj, file_name, build)
+    elif obj.type == "metadata":
+        add_metadata_to_graph(graph, obj, file_name)
+    elif obj.type == "condition":
+        add_condition_to_graph(graph, obj, file_name, build)
+    elif obj.type == "formflow":
+        add_formflow_to_graph(graph, obj, build)
+    elif obj.type in  ("image", "sound"):
+        graph.add_node(obj.guid, obj.map())
+    elif obj.type == "module":
+        add_module_to_graph(graph, obj, build)
+    elif obj.type == "template":
+        add_template_to_graph(graph, obj, build)
+
+def source_files():
+    """Return the source key and name of each file
+
+    Files of each type are in the order the build reads them
+    """
+    return [(source_key(file_name), file_name)
+            for attrs in glow_file_objects()
+            for file_name in glob.glob(os.path.abspath(attrs["path"]))]
+
+def changed_sources(graph):
+    """Return the source keys of files added, changed or deleted since the build
+
+    Files are compared with the digests kept with the graph
+    """
+    digests = graph.graph["digests"]
+    current = dict(source_files())
+    changed = set(key for key in digests if key not in current)
+    changed.update(key for key, file_name in current.iteritems()
+                   if digests.get(key) != file_digest(file_name))
+    return sorted(changed)
+
+def remove_source(graph, nodes):
+    """Remove the objects a source file made from the graph
+
+    The edges from the nodes are removed along with nodes
+    only they referred to, such as captions and undefined
+    objects. Nodes other objects refer to are kept without
+    attributes so they are undefined until added again
+    """
+    for node in nodes:
+        if not graph.has_node(node):
+            continue
+        children = set(graph.successors(node))
+        graph.remove_edges_from(list(graph.out_edges(node, keys=True)))
+        for child in children:
+            if (child != node and not graph.pred[child] and
+                    graph.node[child].get("type") in (None, "caption")):
+                graph.remove_node(child)
+        if graph.pred[node]:
+            graph.node[node] = {}
+        else:
+            graph.remove_node(node)
+
+def update_graph(graph, build=None):
+    """Bring a built graph up to date with the source files
+
+    Only files added, changed or deleted since the build
+    are read: the objects each made are removed and the
+    file is added again. The lookups are then set from
+    the names each source added. Tests refer to other
+    objects by name so are added again too if any names
+    changed.
+    Entities, metadata and indexes define the properties
+    and commands every other object refers to, so if one
+    of them changed, or the graph has no digests, None is
+    returned and the graph needs a full build. Otherwise
+    the changed source keys are returned. The derived
+    data is recomputed when next used
+    """
+    if "digests" not in graph.graph or "names" not in graph.graph.get("lookups", {}):
+        return None
+    changed = changed_sources(graph)
+    types = dict((key, file_object_type(key)) for key in changed)
+    if any(attrs is None or attrs["type"] in UPDATE_REBUILD_TYPES
+           for attrs in types.itervalues()):
+        return None
+    if build is None:
+        build = GraphBuild()
+    build.restore(graph.graph["lookups"])
+    sources = graph.graph["sources"]
+    digests = graph.graph["digests"]
+
+    def readd(keys, label_text):
+        """Remove the objects of each source and add its file again
+        """
+        with build.progress(keys, "{0:25}".format(label_text)) as progress_bar:
+            for key in progress_bar:
+                remove_source(graph, sources.pop(key, ()))
+                digests.pop(key, None)
+                build.names.pop(key, None)
+                if not os.path.exists(key):
+                    continue
+                with build.source_file(key):
+                    nodes = add_file_to_graph(graph, types[key], key, build)
+                if nodes is not None:
+                    sources[key] = nodes
+
+    names = copy.deepcopy((build.formsteps, build.formflows, build.modules))
+    readd([key for key in changed if types[key]["type"] != "test"], "Updating objects")
+    build.resolve(key for key, _ in source_files())
+    tests = [key for key in changed if types[key]["type"] == "test"]
+    if names != (build.formsteps, build.formflows, build.modules):
+        # names in tests may now refer to other objects
+        test_path = os.path.abspath(settings["test"]["path"])
+        for file_name in glob.glob(test_path):
+            key = source_key(file_name)
+            if key not in types:
+                types[key] = settings["test"]
+                tests.append(key)
+    readd(tests, "Updating tests")
+
+    digests.update(build.digests)
+    graph.graph["lookups"] = build.lookups()
+    graph.graph["generation"] = uuid.uuid4().hex
+    for key in ("condensation", "module_depths", "link_index", "type_index"):
+        graph.graph.pop(key, None)
+    with build.phase("Indexing", graph.number_of_nodes()):
+        add_orphans(graph)
+    return changed
+
 def fix_entity_name(entity, file_name):
     """Correct for missing entity name
     """
@@ -656,7 +1289,7 @@ def add_metadata_to_graph(graph, metadata, file_name):
                 if "condition" in pc_dict:
                     graph.add_edge(prop_name, pc_dict["condition"].lower(), attr_dict=pl_dict)
 
-def add_formflow_to_graph(graph, formflow):
+def add_formflow_to_graph(graph, formflow, build):
     """Add a formflow object and its edges to the graph
 
     Also iterates through tasks (formflow steps) and
@@ -664,7 +1297,7 @@ def add_formflow_to_graph(graph, formflow):
     as well as any referenced conditions
     """
     graph.add_node(formflow.guid, formflow.map())
-    FORMFLOW_LOOKUP[formflow.name] = formflow.guid
+    build.add_name("formflows", formflow.name, formflow.guid)
 
     if formflow.image:
         i_dict = {
@@ -684,15 +1317,16 @@ def add_formflow_to_graph(graph, formflow):
             graph.add_edge(formflow.guid, c_dict["condition"], attr_dict=c_dict)
 
     if formflow.tasks:
+        task_class = glow_object_class(settings["task"])
         for task in formflow.tasks:
-            go_task = GlowObject(settings["task"], task)
-            add_task_edge_to_graph(graph, formflow, go_task)
+            go_task = task_class(task)
+            add_task_edge_to_graph(graph, formflow, go_task, build)
 
     if formflow.data:
-        xml_parser = XMLParser(formflow.data)
+        xml_parser = build.parse_xml(formflow.release("data"), WORKFLOW_ACTIVITIES)
         for template in xml_parser.iterfind("ShowFormActivity"):
             template_id = template["template"].lower()
-            FORMSTEP_LOOKUP[template["name"]] = template_id
+            build.add_name("formsteps", template["name"], template_id)
             graph.add_edge(formflow.guid, template_id, attr_dict=template)
         for ff in xml_parser.iterfind("JumpToActivity"):
             graph.add_edge(formflow.guid, ff["formflow"].lower(), attr_dict=ff)
@@ -704,38 +1338,39 @@ def add_formflow_to_graph(graph, formflow):
             graph.add_edge(formflow.guid, sound["sound"].lower(), attr_dict=sound)
         for command in xml_parser.iterfind("RunCommandActivity"):
             command_name = command["command"]
-            entity = get_command_entity(command_name, formflow.entity)
+            entity = build.command_entity(command_name, formflow.entity)
             command_full_name = "{}-{}".format(command_name, entity)
             graph.add_edge(formflow.guid, command_full_name, attr_dict=command)
 
-def add_task_edge_to_graph(graph, formflow, task):
+def add_task_edge_to_graph(graph, formflow, task, build):
     """Add an edge to the graph from a task object
     """
     if task.task == "FRM" and task.template:
         graph.add_edge(formflow.guid, task.template.lower(), attr_dict=task.map())
-        FORMSTEP_LOOKUP[task.name] = task.template.lower()
+        build.add_name("formsteps", task.name, task.template.lower())
     elif task.task == "JMP" and task.formflow:
         graph.add_edge(formflow.guid, task.formflow.lower(), attr_dict=task.map())
     elif task.task == "RUN" and task.command:
-        entity = get_command_entity(task.command, formflow.entity)
+        entity = build.command_entity(task.command, formflow.entity)
         command = "{}-{}".format(task.command, entity)
         graph.add_edge(formflow.guid, command, attr_dict=task.map())
 
-def add_condition_to_graph(graph, condition, file_name):
+def add_condition_to_graph(graph, condition, file_name, build):
     """Add a condition object to the graph
     """
     guid = full_guid(base_name(file_name))
     graph.add_node(guid, condition.map())
     if condition.expression:
-        xml_parser = XMLParser(condition.expression)
+        xml_parser = build.parse_xml(condition.release("expression"),
+                                     ("simpleConditionExpression",))
         properties = {}
         for prop in xml_parser.iterfind("simpleConditionExpression"):
             reference = "{}-{}".format(prop["property"], condition.entity)
             properties[reference] = prop
         for prop, attrs in properties.iteritems():
-            add_property_edge_if_exists(graph, guid, prop, attrs)
+            add_property_edge_if_exists(graph, guid, prop, attrs, build)
 
-def add_index_to_graph(graph, entity, file_name):
+def add_index_to_graph(graph, entity, file_name, build):
     """Add an entity index object to the graph
     """
     topics = {
@@ -763,9 +1398,9 @@ def add_index_to_graph(graph, entity, file_name):
             graph.add_node(index_name, {"type": "index", "name": index["name"]})
             if "property" in index:
                 prop_ref = "{}-{}".format(index["property"], entity_name)
-                add_property_edge_if_exists(graph, index_name, prop_ref, i_dict)
+                add_property_edge_if_exists(graph, index_name, prop_ref, i_dict, build)
 
-def add_module_to_graph(graph, module):
+def add_module_to_graph(graph, module, build):
     """Add a module object and its edges to the graph
     """
     graph.add_node(module.guid, module.map())
@@ -777,7 +1412,7 @@ def add_module_to_graph(graph, module):
             "template":   module.template
         }
         graph.add_edge(module.guid, module.template.lower(), attr_dict=mt_dict)
-        MODULE_LOOKUP[module.code] = module.guid
+        build.add_name("modules", module.code, module.guid)
 
     if module.formflows:
         mf_dict = {
@@ -788,7 +1423,45 @@ def add_module_to_graph(graph, module):
         for formflow in module.formflows:
             graph.add_edge(module.guid, formflow, attr_dict=mf_dict)
 
-def add_template_to_graph(graph, template):
+def add_test_to_graph(graph, test, build):
+    """Add a business test and its edges to the graph
+
+    Tests refer to modules, templates and formflows
+    by name so these are looked up in the build
+    """
+    graph.add_node(test.name, test.map())
+    for module in test.matches("module"):
+        graph.add_edge(
+            test.name,
+            build.modules.get(module, module),
+            attr_dict={
+                "type":      "link",
+                "link_type": "business test",
+                "ref_type":  "module",
+                "name":      module
+            })
+    for template in test.matches("template"):
+        graph.add_edge(
+            test.name,
+            build.formsteps.get(template, template),
+            attr_dict={
+                "type":      "link",
+                "link_type": "business test",
+                "ref_type":  "template",
+                "name":      template
+            })
+    for formflow in test.matches("formflow"):
+        graph.add_edge(
+            test.name,
+            build.formflows.get(formflow, formflow),
+            attr_dict={
+                "type":      "link",
+                "link_type": "business test",
+                "ref_type":  "formflow",
+                "name":      formflow
+            })
+
+def add_template_to_graph(graph, template, build):
     """Add a template object and its edges to the graph
 
     Iterates through any tiles on the template and
@@ -822,14 +1495,14 @@ def add_template_to_graph(graph, template):
             if "formflow" in tile:
                 graph.add_edge(template.guid, tile["formflow"].lower(), attr_dict=tile)
             if "command" in tile:
-                entity = get_command_entity(tile["command"], tile["entity"])
+                entity = build.command_entity(tile["command"], tile["entity"])
                 command = "{}-{}".format(tile["command"], entity)
                 graph.add_edge(template.guid, command, attr_dict=tile)
             if "image" in tile:
                 graph.add_edge(template.guid, tile["image"].lower(), attr_dict=tile)
             if "property" in tile:
                 reference = "{}-{}".format(tile["property"], template.entity)
-                add_property_edge_if_exists(graph, template.guid, reference, tile)
+                add_property_edge_if_exists(graph, template.guid, reference, tile, build)
 
     def analyse_captions():
         """Find all the caption over-rides on the form
@@ -849,8 +1522,8 @@ def add_template_to_graph(graph, template):
             graph.add_edge(template.guid, cap_ref, attr_dict=cap_link)
             if prop:
                 prop_ref = "{}-{}".format(prop, template.entity)
-                add_property_edge_if_exists(graph, template.guid, prop_ref, cap_link)
-                add_property_edge_if_exists(graph, cap_ref, prop_ref, cap_link)
+                add_property_edge_if_exists(graph, template.guid, prop_ref, cap_link, build)
+                add_property_edge_if_exists(graph, cap_ref, prop_ref, cap_link, build)
 
     def analyse_components():
         """Find all the component references to other templates
@@ -871,7 +1544,7 @@ def add_template_to_graph(graph, template):
                 "type":      "link",
                 "link_type": "bound property"
             })
-            add_property_edge_if_exists(graph, template.guid, reference, prop_dict)
+            add_property_edge_if_exists(graph, template.guid, reference, prop_dict, build)
 
         prop_dict = {
             "type":      "link",
@@ -879,7 +1552,7 @@ def add_template_to_graph(graph, template):
         }
         for prop in xml_parser.control_properties("binding"):
             reference = "{}-{}".format(prop, template.entity)
-            add_property_edge_if_exists(graph, template.guid, reference, prop_dict)
+            add_property_edge_if_exists(graph, template.guid, reference, prop_dict, build)
 
         cd_dict = {
             "type":      "link",
@@ -892,7 +1565,7 @@ def add_template_to_graph(graph, template):
                 graph.add_edge(template.guid, index_name, attr_dict=cd_dict)
             else:
                 reference = "{}-{}".format(prop, template.entity)
-                add_property_edge_if_exists(graph, template.guid, reference, cd_dict)
+                add_property_edge_if_exists(graph, template.guid, reference, cd_dict, build)
 
     def analyse_formflows():
         """Find references to formflows from various controls
@@ -906,11 +1579,11 @@ def add_template_to_graph(graph, template):
 
 
     # main template processing
-    FORMSTEP_LOOKUP[template.name] = template.guid
+    build.add_name("formsteps", template.name, template.guid)
     graph.add_node(template.guid, template.map())
 
     if template.data:
-        xml_parser = XMLParser(template.data)
+        xml_parser = build.parse_xml(template.release("data"), TEMPLATE_ELEMENTS)
         analyse_images()
         analyse_tiles()
         analyse_captions()
@@ -919,11 +1592,12 @@ def add_template_to_graph(graph, template):
         analyse_formflows()
 
 
-def add_property_edge_if_exists(graph, parent, prop, attrs):
+def add_property_edge_if_exists(graph, parent, prop, attrs, build=None):
     """Conditionally add reference to property if exists
 
     Also deconstruct property name when checking so that
-    'entity.collection.prop' checks against 'prop'
+    'entity.collection.prop' checks against 'prop', which
+    searches the whole graph and is counted by the build
     """
     base_prop = prop.rsplit(".")[-1]
     name_prop = base_prop.rsplit("-")[0]
@@ -937,7 +1611,11 @@ def add_property_edge_if_exists(graph, parent, prop, attrs):
         graph.add_edge(parent, base_prop, attr_dict=attrs)
     else:
         query = r"name: {}\b".format(name_prop)
+        start_time = time.time()
         nodes = select_nodes(graph, query)
+        if build is not None:
+            build.count("fallbacks")
+            build.count("fallback_seconds", time.time() - start_time)
         if len(nodes) == 1:
             graph.add_edge(parent, nodes[0][0], attr_dict=attrs)
         elif len(nodes) > 1:
@@ -964,12 +1642,12 @@ def add_property_edge_if_exists(graph, parent, prop, attrs):
                     return
 
 
-def add_entity_to_graph(graph, entity, file_name):
+def add_entity_to_graph(graph, entity, file_name, build):
     """Add entity level information to the graph
 
     - adds Command Rules based on 'name' as 'guid'
       is not used by referrers.
-    - creates COMMAND_LOOKUP to handle entity
+    - adds to the build command lookup to handle entity
       command inheritance
     - adds calculated properties
     - looks for conditions referenced in rules
@@ -1013,19 +1691,21 @@ def add_entity_to_graph(graph, entity, file_name):
             if not rules:
                 continue
             reference = "{}-{}".format(name, entity.name)
-            p_dict = {
+            graph.add_node(reference, {
                 "name":   name,
                 "entity": entity.name,
                 "type":   "property"
-            }
-            graph.add_node(reference, p_dict)
+            })
+            # the rules change the attributes the graph holds
+            p_dict = graph.node[reference]
             for rule in rules:
                 r_dict = XMLParser.build_dict(rule, topics)
                 r_dict["name"] = name
                 r_dict["entity"] = entity.name
                 rule_type = r_dict["rule_type"]
                 if rule_type == "CMD":
-                    add_to_command_lookup(name, entity.name)
+                    p_dict["type"] = "command"
+                    build.add_command(name, entity.name)
                 elif "rule_set" in r_dict:
                     for rule_set in r_dict["rule_set"]:
                         rs_dict = XMLParser.build_dict(rule_set, topics)
@@ -1033,89 +1713,68 @@ def add_entity_to_graph(graph, entity, file_name):
                 else:
                     rule_details(r_dict)
 
-def add_to_command_lookup(command, entity):
-    """Add discovered command to lookup
-    """
-    commands = COMMAND_LOOKUP
-    if command in commands:
-        commands[command].append(entity)
-    else:
-        commands[command] = [entity]
-
-def get_command_entity(command, entity):
-    """Get the best command node name
-    """
-    result = entity
-    commands = COMMAND_LOOKUP
-    if command in commands:
-        if not entity in commands[command]:
-            result = commands[command][0]
-    return result
-
-def missing_nodes(graph):
-    """Return data on nodes without data
-
-    Indicates those nodes referenced in edges but which
-    had were not added from files so represent orphan
-    references from within other objects
-    """
-    print()
-    print("These nodes have no data:")
-    for node in graph:
-        if ("type" not in graph.node[node]
-            and not node.startswith("AttachToI")
-            and graph.in_degree(node) > 0):
-            print()
-            print(node)
-            for caller in graph.predecessors(node):
-                if caller:
-                    edge = graph.get_edge_data(caller, node)
-                    print()
-                    print("-> from : {}".format(graph.node[caller]))
-                    print("    via : {}".format(edge))
-
-def print_children(graph, parent):
+def print_children(graph, parent, **options):
     """Display all the successor nodes from parent
     """
-    walk_tree(graph, parent, func=graph.successors)
+    walk_tree(graph, parent, func=graph.successors, **options)
 
-def print_parents(graph, child):
+def print_parents(graph, child, **options):
     """Display all the predecessor nodes from child
     """
-    walk_tree(graph, child, func=graph.predecessors)
+    walk_tree(graph, child, func=graph.predecessors, **options)
 
-def walk_tree(graph, target, seen=None, level=1, func=None):
+def walk_tree(graph, target, seen=None, level=1, func=None, **options):
     """Display all the parent / child nodes from target
     """
+    for entry in tree_entries(graph, target, func, seen=seen, level=level, **options):
+        print_entry(*entry)
+
+def tree_entries(graph, target, func, max_level=1, ignore_types=(),
+                 link_types=(), seen=None, level=1):
+    # pylint: disable=too-many-arguments
+    """Generate the parent / child nodes from target
+
+    Each entry is (level, node, node data, edges, seen before)
+    """
     if seen is None:
         seen = []
     seen.append(target)
-    for node in func(target):
+    for node in linked(graph, func, link_types)(target):
         node_data = graph.node[node]
         if ("type" in node_data and
-                node_data["type"] in IGNORE_TYPES):
+                node_data["type"] in ignore_types):
             continue
 
-        print()
         if func == graph.predecessors:
             edge_data = graph.get_edge_data(node, target)
         else:
             edge_data = graph.get_edge_data(target, node)
-        if node_data:
-            if node in seen:
-                pindent(colorized(node_data, "white"), level)
-            else:
-                pindent(colorized(node_data), level)
-            for _, edge in edge_data.iteritems():
-                pindent(colorized(edge), level)
-
-            if not node in seen and (MAX_LEVEL == 0 or MAX_LEVEL > level):
-                walk_tree(graph, node, seen, level+1, func)
+        edges = [edge for _, edge in edge_data.iteritems()
+                 if not link_types or edge_kind(edge) in link_types]
+        repeated = node in seen
+        yield level, node, node_data, edges, repeated
+
+        if node_data and not repeated and (max_level == 0 or max_level > level):
+            for entry in tree_entries(graph, node, func, max_level, ignore_types,
+                                      link_types, seen, level+1):
+                yield entry
+
+def print_entry(level, node, node_data, edges, repeated):
+    """Display a parent / child node and its edges
+    """
+    print()
+    if node_data:
+        if repeated:
+            pindent(colorized(node_data, "white"), level)
         else:
-            pindent("{} is an undefined reference!".format(node), level)
+            pindent(colorized(node_data), level)
+        for edge in edges:
+            pindent(colorized(edge), level)
+    else:
+        pindent("{} is an undefined reference!".format(node), level)
 
 
-def select_nodes(graph, query):
+def select_nodes(graph, query, ignore_types=(), edge_match=False):
     """Obtain list of nodes that match provided pattern
 
     Also match if any of the edges also match
@@ -1124,79 +1783,40 @@ def select_nodes(graph, query):
     for node in graph:
         try:
             node_data = get_node_data(graph, node)
-            if node_data.get("type") in IGNORE_TYPES:
+            if node_data.get("type") in ignore_types:
                 continue
             elif match(query, node_data):
                 nodes.append((node, node_data))
-                continue
-            if EDGE_MATCH:
-                for edge in graph.edges_iter(node, data=True):
-                    _, _, edge_data = edge
-                    if edge_data.get("type") in IGNORE_TYPES:
-                        continue
-                    elif match(query, edge_data):
-                        nodes.append((node, node_data))
-                    break
+            elif edge_match and any(match(query, edge_data) for edge_data
+                                    in searched_edges(graph, node, ignore_types)):
+                nodes.append((node, node_data))
         except Exception as err_msg:
             print("\n\n-> Error: '{}' matching {} in {}".format(err_msg, query, node))
     return nodes
 
+def searched_edges(graph, node, ignore_types=()):
+    """Generate the attributes of the edges from node searched with EDGE_MATCH
+
+    Every edge not of an ignored type is searched, the node
+    matches if any of them does
+    """
+    for _, _, edge_data in graph.edges_iter(node, data=True):
+        if edge_data.get("type") not in ignore_types:
+            yield edge_data
+
 def get_node_data(graph, node):
     """Retrieve data stored with node and add counts
 
-    Adds 'counts: p<c' for parents and children
+    Returns a copy with 'counts: p<c' for parents and
+    children, the graph is shared so is never changed
     """
     node_data = graph.node[node]
     if node_data:
         parents = len(graph.predecessors(node))
         children = len(graph.successors(node))
-        node_data["counts"] = "{}<{}".format(parents, children)
+        node_data = dict(node_data, counts="{}<{}".format(parents, children))
     return node_data
 
-def special_command(query):
-    # pylint: disable=global-statement
-    """Provide for special commands to change settings
-
-    -> '$$max_level=n' to set graph expansion depth
-    -> '$$ignore=foo bar' to ignore foo and bar types
-    -> '$$edges=True' to include edges in the match
-    -> '$$minimal=False' to expand attributes printed
-    -> '$$regen' to regenerate the graph
-    """
-    if query.startswith("$$max_level="):
-        global MAX_LEVEL
-        try:
-            level = int(query.rsplit("=")[-1])
-        except ValueError:
-            print("\n-> Error: Invalid value for max level!\n")
-        else:
-            MAX_LEVEL = level
-            print("\n-> MAX_LEVEL updated to {}\n".format(level))
-        return True
-    elif query.startswith("$$ignore="):
-        global IGNORE_TYPES
-        IGNORE_TYPES = query.rsplit("=")[-1].split()
-        print("\n-> IGNORE_TYPES updated to {}\n".format(IGNORE_TYPES))
-        return True
-    elif query.startswith("$$edges="):
-        global EDGE_MATCH
-        value = query.rsplit("=")[-1].lower()
-        EDGE_MATCH = {"true": True, "false": False}.get(value, False)
-        print("\n-> EDGE_MATCH updated to {}\n".format(EDGE_MATCH))
-        return True
-    elif query.startswith("$$minimal="):
-        global MINIMAL_DISPLAY
-        value = query.rsplit("=")[-1].lower()
-        MINIMAL_DISPLAY = {"true": True, "false": False}.get(value, True)
-        print("\n-> MINIMAL_DISPLAY updated to {}\n".format(MINIMAL_DISPLAY))
-        return True
-    elif query.startswith("$$regen"):
-        global GLOW_GRAPH
-        print()
-        GLOW_GRAPH = create_graph()
-        print_graph_info(GLOW_GRAPH)
-        return True
-
 def print_nodes(nodes):
     """Print a sorted list of selected ndoes
     """
@@ -1206,35 +1826,225 @@ def print_nodes(nodes):
         for index, (_, node_data) in enumerate(nodes):
             print("{:>3} {}".format(index, colorized(node_data)))
 
-def print_selected_node(graph, index, nodes):
-    """Display selected node details
+def print_node_preview(node_data, minimal=True):
+    """Display node details while the graph is loading
+    """
+    print()
+    print("-" * 120)
+    print()
+    pindent(colorized(node_data, display=minimal), 0)
+    print()
+    print("Parents and children are shown once the graph has loaded")
+
+def print_node_detail(node_data, parents, children, minimal=True):
+    """Display node details with its parent and child entries
     """
-    node, node_data = nodes[index]
     print()
     print("-" * 120)
     print()
-    pindent(colorized(node_data, display=MINIMAL_DISPLAY), 0)
+    pindent(colorized(node_data, display=minimal), 0)
     print()
     print("These are the parents (predecessors):")
-    print_parents(graph, node)
+    for entry in parents:
+        print_entry(*entry)
     print()
     print("These are the children (successors):")
-    print_children(graph, node)
+    for entry in children:
+        print_entry(*entry)
 
-def main():
-    """Provide navigation of the selected Glow objects
+def share_attributes(graph):
+    """Share equal edge attributes and repeated strings
+
+    Each edge gets the one read only record for its
+    attributes and equal keys, values and node ids are
+    the same string, so memory and the cache hold each
+    once. Returns the number of edges and records
+    """
+    strings = {}
+    for node, node_data in graph.node.iteritems():
+        shared_string(strings, node)
+        shared = shared_dict(strings, node_data)
+        node_data.clear()
+        node_data.update(shared)
+    records = {}
+    edges = 0
+    for adjacency in (graph.succ, graph.pred):
+        shared = {}
+        for node, neighbours in adjacency.iteritems():
+            shared[shared_string(strings, node)] = dict(
+                (shared_string(strings, other), keys) for other, keys in neighbours.iteritems())
+        adjacency.clear()
+        adjacency.update(shared)
+    # key dicts are shared by succ and pred so one pass covers both
+    for neighbours in graph.succ.itervalues():
+        for keys in neighbours.itervalues():
+            for key, edge_data in keys.iteritems():
+                record = repr(sorted(edge_data.iteritems()))
+                if record not in records:
+                    records[record] = FrozenRecord(shared_dict(strings, edge_data))
+                keys[key] = records[record]
+                edges += 1
+    return edges, len(records)
+
+def save_graph(graph, file_name):
+    """Save the graph in parts for loading in the background
+
+    Node attributes come first so nodes can be looked up
+    while the edges, in chunks of CACHE_CHUNK nodes, and
+    the derived data in graph.graph are still loading
+    """
+    def parts():
+        """Generate the parts of the cache in order
+        """
+        yield graph.node
+        nodes = graph.nodes()
+        for start in range(0, len(nodes), CACHE_CHUNK):
+            yield [(node, graph.succ[node]) for node in nodes[start:start + CACHE_CHUNK]]
+        yield graph.graph
+
+    save_objects_to_file(parts(), file_name)
+
+
+class CacheLoader(object):
+    """Load a cached graph on a background thread
+
+    Node attributes are in nodes as soon as the first part
+    of the cache is read so exact ids can be shown while
+    the edges are still loading. Loading in chunks lets
+    the prompt run in between. The derived data is the
+    last part so a cache without it was cut short
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.nodes = {}
+        self.graph = None
+        self.error = None
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+        thread = threading.Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+
+    def run(self):
+        """Read the parts of the cache and assemble the graph
+        """
+        try:
+            parts = load_objects_from_file(self.file_name)
+            nodes = next(parts, None)
+            if nodes is None:
+                self.error = ValueError("{} is empty".format(self.file_name))
+                return
+            if not isinstance(nodes, dict):
+                # caches saved whole by earlier versions
+                self.graph = nodes
+                return
+            self.nodes = nodes
+            graph = new_graph()
+            for node, node_data in nodes.iteritems():
+                graph.add_node(node, node_data)
+            complete = False
+            for part in parts:
+                if self.cancelled.is_set():
+                    self.error = ValueError("loading {} was cancelled".format(self.file_name))
+                    return
+                if isinstance(part, dict):
+                    graph.graph.update(part)
+                    complete = True
+                    continue
+                # predecessors share the successor key dicts
+                for node, children in part:
+                    graph.succ[node] = children
+                    for child, edges in children.iteritems():
+                        graph.pred[child][node] = edges
+            if not complete:
+                self.error = ValueError("{} is incomplete".format(self.file_name))
+                return
+            self.graph = graph
+        except Exception as err_msg:    # pylint: disable=broad-except
+            self.error = err_msg
+        finally:
+            self.done.set()
+
+    def cancel(self):
+        """Stop loading at the next part and wait for the thread
+        """
+        self.cancelled.set()
+        while not self.done.wait(0.1):
+            pass
+
+    def wait(self):
+        """Return the graph once it has loaded
+
+        The graph and nodes are handed over rather than kept
+        so the caller alone decides how long they are held,
+        e.g. while converting to a compact graph or after $$regen
+        """
+        # wait in steps so ctrl-c is not blocked
+        while not self.done.wait(0.1):
+            pass
+        if self.error is not None:
+            raise self.error
+        graph, self.graph, self.nodes = self.graph, None, {}
+        return graph
+
+def loaded_graph(loader):
+    """Return the graph of a cache loader or create it afresh
+
+    A cache that cannot be loaded, e.g. one cut short, is
+    replaced by a new build rather than failing every query
+    """
+    try:
+        graph = loader.wait()
+    except Exception as err_msg:    # pylint: disable=broad-except
+        print("\n-> Error: cannot load cache {}: {}, building the graph\n".format(
+            loader.file_name, err_msg))
+        return create_graph()
+    print("Graph loaded from cache: {} \n".format(loader.file_name))
+    return graph
+
+def load_graph(backend=DEFAULT_BACKEND):
+    """Return the graph from the cache or create it afresh
+
+    The graph is converted to the backend, see glow_graph
     """
-    global GLOW_GRAPH
+    if os.path.exists(CACHE_FILE):
+        graph = loaded_graph(CacheLoader(CACHE_FILE))
+    else:
+        graph = create_graph()
+    graph = convert_graph(graph, backend)
+    print_graph_info(graph)
+    return graph
+
+def interactive():
+    """Prepare the terminal for an interactive session
 
-    # ensure colors works on Windows, no effect on Linux
+    Line editing for input, utf-8 output and colours
+    that also work on Windows (no effect on Linux)
+    """
+    try:
+        import readline                 # pylint: disable=unused-import
+    except ImportError:
+        import pyreadline as readline   # pylint: disable=unused-import
+    from colorama import init
+    reload(sys)
+    sys.setdefaultencoding("utf-8")     # pylint: disable=no-member
     init()
 
+def navigate(backend=DEFAULT_BACKEND):
+    """Provide navigation of the selected Glow objects
+
+    The graph is queried through the backend, see glow_graph
+    """
+    interactive()
+
+    print_banner()
     if os.path.exists(CACHE_FILE):
-        GLOW_GRAPH = load_object_from_file(CACHE_FILE)
-        print("Graph loaded from cache: {} \n".format(CACHE_FILE))
+        print("Loading graph from cache: {} \n".format(CACHE_FILE))
+        loader = CacheLoader(CACHE_FILE)
+        session = GlowSession()
     else:
-        GLOW_GRAPH = create_graph()
-    print_graph_info(GLOW_GRAPH)
+        session = GlowSession(load_graph(backend))
 
     query = None
     nodes = []
@@ -1245,20 +2055,37 @@ def main():
             if nodes:
                 question += " or number of current node"
             query = input("{}: ".format(question))
-            if special_command(query):
-                continue
-            elif nodes and query.isdigit() and int(query) in range(len(nodes)):
-                print_selected_node(GLOW_GRAPH, int(query), nodes)
-            elif invalid_regex(query):
+            if session.graph is None and query.startswith("$$regen"):
+                # stop reading the cache the new graph replaces
+                loader.cancel()
+            if session.graph is None and not query.startswith(
+                    SESSION_SETTINGS + ("$$regen", "$$profile")):
+                if not loader.done.is_set() and loader.nodes.get(query):
+                    print_node_preview(loader.nodes[query], session.minimal_display)
+                    continue
+                if not loader.done.is_set():
+                    print()
+                    print("-> Waiting for the graph to finish loading")
+                session.graph = convert_graph(loaded_graph(loader), backend)
                 print()
-                print("--> '{}' is an invalid regex!".format(query))
-                continue
-            else:
-                nodes = select_nodes(GLOW_GRAPH, query)
-                if len(nodes) == 1:
-                    print_selected_node(GLOW_GRAPH, 0, nodes)
+                print_graph_info(session.graph)
+            with session.profiled(query):
+                if session.special_command(query):
+                    if query.startswith("$$regen"):
+                        session.graph = convert_graph(session.graph, backend)
+                    continue
+                elif nodes and query.isdigit() and int(query) in range(len(nodes)):
+                    session.print_selected_node(int(query), nodes)
+                elif invalid_regex(query):
+                    print()
+                    print("--> '{}' is an invalid regex!".format(query))
+                    continue
                 else:
-                    print_nodes(nodes)
+                    nodes = session.select(query)
+                    if len(nodes) == 1:
+                        session.print_selected_node(0, nodes)
+                    else:
+                        print_nodes(nodes)
         except KeyboardInterrupt:
             continue
         except EOFError:
@@ -1274,4 +2101,4 @@ def main():
             print()
 
 if __name__ == "__main__":
-    main()
+    navigate()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glow Navigator networkx 2.x Graph
+
+MultiDiGraph of networkx 2.x offering the networkx 1.x
+calls the navigator is written against. Only imported
+through glow_graph when such a networkx is installed as
+it imports networkx on import. The tests run against
+networkx 2.2 as well as 1.11
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# external libraries
+import networkx as nx
+from networkx.classes.reportviews import (
+    InMultiDegreeView,
+    OutMultiDegreeView,
+    OutMultiEdgeView)
+
+
+class MultiDiGraph(nx.MultiDiGraph):
+    """networkx 1.x MultiDiGraph calls on networkx 2.x
+
+    Node and neighbour lookups are the plain dicts, node and
+    edge attributes can be given as a dict, neighbours, nodes
+    and edges are lists and degrees of all nodes are a dict.
+    Everything else is the MultiDiGraph of the installed
+    networkx so its algorithms take it as is. The views are
+    made afresh as networkx 2.x caches them on the graph
+    """
+    # pylint: disable=arguments-differ,invalid-overridden-method
+
+    @property
+    def node(self):
+        """Return dict of node: attributes
+        """
+        return self._node
+
+    @property
+    def succ(self):
+        """Return dict of node: target: key: attributes
+        """
+        return self._succ
+
+    @property
+    def pred(self):
+        """Return dict of node: source: key: attributes
+        """
+        return self._pred
+
+    def add_node(self, node, attr_dict=None, **attr):
+        """Add a node or update its attributes
+
+        As in networkx 1.x a new node keeps attr_dict itself
+        so later changes to the dict are seen by the graph
+        """
+        if attr_dict is None:
+            attr_dict = attr
+        else:
+            attr_dict.update(attr)
+        if node in self._succ:
+            self._node[node].update(attr_dict)
+        else:
+            super(MultiDiGraph, self).add_node(node)
+            self._node[node] = attr_dict
+
+    def add_edge(self, source, target, key=None, attr_dict=None, **attr):
+        """Add an edge with a copy of the attributes and return its key
+        """
+        if attr_dict:
+            attr = dict(attr_dict, **attr)
+        return super(MultiDiGraph, self).add_edge(source, target, key, **attr)
+
+    def nodes_iter(self, data=False):
+        """Generate the nodes, with their attributes if data is True
+        """
+        if data:
+            return iter(self._node.items())
+        return iter(self._node)
+
+    def nodes(self, data=False):
+        """Return a list of the nodes
+        """
+        return list(self.nodes_iter(data))
+
+    def edges_iter(self, nbunch=None, data=False, keys=False):
+        """Generate the edges from the nodes in nbunch (default all)
+        """
+        return iter(OutMultiEdgeView(self)(nbunch, data=data, keys=keys))
+
+    def edges(self, nbunch=None, data=False, keys=False):
+        """Return a list of the edges from the nodes in nbunch
+        """
+        return list(self.edges_iter(nbunch, data, keys))
+
+    def successors(self, node):
+        """Return a list of the distinct targets of edges from node
+        """
+        return list(self._succ[node])
+
+    def predecessors(self, node):
+        """Return a list of the distinct sources of edges to node
+        """
+        return list(self._pred[node])
+
+    def in_degree(self, node=None):
+        """Return the in degree of node, or a dict for all nodes
+        """
+        degrees = InMultiDegreeView(self)
+        if node is not None:
+            return degrees(node)
+        return dict(degrees())
+
+    def out_degree(self, node=None):
+        """Return the out degree of node, or a dict for all nodes
+        """
+        degrees = OutMultiDegreeView(self)
+        if node is not None:
+            return degrees(node)
+        return dict(degrees())
+
+
+if __name__ == "__main__":
+    print()
+    print("This module is only a container for the networkx 2.x graph")
+    print()
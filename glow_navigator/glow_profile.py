@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glow Navigator Profile
+
+Time interactive commands broken down into serialization,
+regex matching, traversal, edge lookups, colorizing and
+terminal output, with a rolling summary of the session
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+
+# standard libraries
+from collections import deque
+from contextlib import contextmanager
+import cProfile
+import json
+import os.path
+import pstats
+import time
+
+PROFILE_CATEGORIES = ("serialize", "regex", "traversal", "get_edge_data",
+                      "colorize", "output", "other")
+PROFILE_HISTORY = 100
+
+# navigator functions charged with their own time and the time
+# of the functions they call that have no category of their own
+CATEGORY_FUNCTIONS = {
+    ("glow_utils.py", "serialize"):         "serialize",
+    ("glow_utils.py", "match"):             "regex",
+    ("glow_utils.py", "colorized"):         "colorize",
+    ("glow_navigator.py", "tree_entries"):  "traversal",
+    ("glow_navigator.py", "get_node_data"): "traversal"}
+
+
+def function_category(func):
+    """Return the category of a function in the profiler stats or None
+    """
+    file_name, _, name = func
+    if name == "get_edge_data":
+        return "get_edge_data"
+    if file_name == "~":
+        # built in functions such as print and file.write
+        return "output" if "print" in name or "'write'" in name else None
+    return CATEGORY_FUNCTIONS.get((os.path.basename(file_name), name))
+
+def profile_categories(stats):
+    """Return the seconds charged to each category
+
+    The own time of a function without a category is shared
+    out between the categories of its callers in proportion
+    to the time spent in it from each of them
+    """
+    shares = {}
+    def caller_shares(func, path):
+        """Return category: fraction for the time spent in func
+        """
+        if func in shares:
+            return shares[func]
+        category = function_category(func)
+        callers = stats[func][4]
+        if category:
+            result = {category: 1.0}
+        elif func in path or not callers:
+            result = {"other": 1.0}
+        else:
+            result = {}
+            weights = dict((caller, timing[3] or timing[0]) for caller, timing
+                           in callers.iteritems())
+            total = float(sum(weights.itervalues()))
+            for caller, weight in weights.iteritems():
+                for category, share in caller_shares(caller, path | set([func])).iteritems():
+                    result[category] = result.get(category, 0.0) + share * weight / total
+        shares[func] = result
+        return result
+
+    categories = dict.fromkeys(PROFILE_CATEGORIES, 0.0)
+    for func, (_, _, own_time, _, callers) in stats.iteritems():
+        category = function_category(func)
+        if category or not callers:
+            categories[category or "other"] += own_time
+            continue
+        for caller, timing in callers.iteritems():
+            for category, share in caller_shares(caller, set([func])).iteritems():
+                categories[category] += timing[2] * share
+    return categories
+
+def call_count(stats, name):
+    """Return the number of calls of the functions called name
+    """
+    return sum(timing[1] for func, timing in stats.iteritems() if func[2] == name)
+
+
+class QueryProfile(object):
+    """Profile of the commands of an interactive session
+
+    Each command runs under cProfile, which only sees the
+    thread running the command, and its stats are reduced
+    to the time of each category. Time is exclusive, so
+    serializing within a match is not regex
+    """
+
+    def __init__(self, history=PROFILE_HISTORY):
+        self.commands = deque(maxlen=history)
+
+    @contextmanager
+    def command(self, query):
+        """Profile a command and show its breakdown
+        """
+        profiler = cProfile.Profile()
+        start_time = time.time()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            seconds = time.time() - start_time
+            stats = pstats.Stats(profiler).stats
+            current = {
+                "command":    query,
+                "seconds":    seconds,
+                "categories": profile_categories(stats),
+                "nodes":      call_count(stats, "get_node_data"),
+                "edges":      call_count(stats, "get_edge_data")
+                }
+            self.commands.append(current)
+            print_profile(current)
+
+    def summary(self):
+        """Return the totals and slowest of the recent commands
+        """
+        categories = dict.fromkeys(PROFILE_CATEGORIES, 0.0)
+        for command in self.commands:
+            for category, seconds in command["categories"].iteritems():
+                categories[category] += seconds
+        return {
+            "commands":   len(self.commands),
+            "seconds":    sum(command["seconds"] for command in self.commands),
+            "categories": categories,
+            "nodes":      sum(command["nodes"] for command in self.commands),
+            "edges":      sum(command["edges"] for command in self.commands),
+            "slowest":    sorted(self.commands, key=lambda x: -x["seconds"])[:5]
+            }
+
+    def save(self, file_name):
+        """Save the summary and recent commands as JSON
+        """
+        with open(file_name, "w") as f:
+            json.dump({"summary": self.summary(), "commands": list(self.commands)},
+                      f, indent=2, sort_keys=True)
+
+
+def breakdown(profile):
+    """Return the time of each category as text, largest first
+    """
+    seconds = profile["seconds"] or 1
+    parts = sorted(profile["categories"].iteritems(), key=lambda x: -x[1])
+    return ", ".join("{} {:.3f}s ({:.0%})".format(category, spent, spent / seconds)
+                     for category, spent in parts if spent)
+
+def print_profile(profile):
+    """Display the breakdown of a command
+    """
+    print()
+    print("-> Profile: {:.3f}s, {} nodes, {} edge lookups".format(
+        profile["seconds"], profile["nodes"], profile["edges"]))
+    print("   {}".format(breakdown(profile)))
+
+def print_profile_summary(profile):
+    """Display the summary of the recent commands
+    """
+    summary = profile.summary()
+    print()
+    print("-> Profile of the last {} commands: {:.3f}s, {} nodes, {} edge lookups".format(
+        summary["commands"], summary["seconds"], summary["nodes"], summary["edges"]))
+    if summary["commands"]:
+        print("   {}".format(breakdown(summary)))
+        print()
+        print("   Slowest commands:")
+        for command in summary["slowest"]:
+            print("   {:>8.3f}s  {}".format(command["seconds"], command["command"]))
+
+
+if __name__ == "__main__":
+    print()
+    print("This module is only a container for profiling functions")
+    print()
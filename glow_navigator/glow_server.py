@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-builtin
+
+"""Glow Navigator Server
+
+Hold one loaded graph and answer queries from many
+clients over a local Unix socket. Requests and responses
+are single lines of JSON handled by one event loop.
+Each request is answered on the loop in turn, so a slow
+search, such as a costly regex, holds up every other
+client until it finishes
+"""
+
+# python2 and python3 portability
+from __future__ import print_function
+from builtins import input
+
+# standard libraries
+import asynchat
+import asyncore
+from itertools import islice
+import json
+import os
+import socket
+import sys
+
+from . glow_analysis import simple_paths
+from . glow_navigator import (
+    SESSION_SETTINGS,
+    GlowSession,
+    get_node_data,
+    invalid_regex,
+    print_node_detail,
+    print_nodes)
+
+
+## requests
+
+def handle_request(graph, request):
+    """Return the response dict for a request dict
+
+    Settings travel with each request and are held in a
+    session per request so clients do not share settings
+    """
+    options = dict((str(k), v) for k, v in request.get("options", {}).iteritems()
+                   if v is not None)
+    session = GlowSession(graph, **options)
+    command = request.get("command")
+    if command == "select":
+        if invalid_regex(request.get("query")):
+            return {"error": "'{}' is an invalid regex!".format(request.get("query"))}
+        return {"nodes": session.select(request["query"])}
+    elif command == "node":
+        node = request.get("node")
+        if not graph.has_node(node):
+            return {"error": "'{}' is not in the graph!".format(node)}
+        return {
+            "node":     get_node_data(graph, node),
+            "parents":  list(session.counted_entries(node, graph.predecessors)),
+            "children": list(session.counted_entries(node, graph.successors))
+            }
+    elif command in ("parents", "children"):
+        node = request.get("node")
+        if not graph.has_node(node):
+            return {"error": "'{}' is not in the graph!".format(node)}
+        func = graph.predecessors if command == "parents" else graph.successors
+        return {command: list(session.counted_entries(node, func))}
+    elif command == "paths":
+        source, target = request.get("source"), request.get("target")
+        for node in (source, target):
+            if not graph.has_node(node):
+                return {"error": "'{}' is not in the graph!".format(node)}
+        paths = simple_paths(graph, source, target,
+                             int(request.get("cutoff", 5)), session.link_types)
+        return {"paths": list(islice(paths, int(request.get("limit", 100))))}
+    elif command == "info":
+        return {
+            "nodes": graph.number_of_nodes(),
+            "edges": graph.number_of_edges()
+            }
+    return {"error": "'{}' is an unknown command!".format(command)}
+
+
+## server
+
+class QueryChannel(asynchat.async_chat):
+    """One client connection reading a JSON request per line
+    """
+
+    def __init__(self, sock, graph):
+        asynchat.async_chat.__init__(self, sock=sock)
+        self.graph = graph
+        self.buffer = []
+        self.set_terminator(b"\n")
+
+    def collect_incoming_data(self, data):
+        """Buffer the partial request
+        """
+        self.buffer.append(data)
+
+    def found_terminator(self):
+        """Answer the completed request
+        """
+        line = b"".join(self.buffer)
+        self.buffer = []
+        try:
+            response = handle_request(self.graph, json.loads(line))
+        except Exception as err_msg:    # pylint: disable=broad-except
+            response = {"error": "{}".format(err_msg)}
+        self.push(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class QueryServer(asyncore.dispatcher):
+    """Accept client connections on a Unix socket
+    """
+
+    def __init__(self, graph, socket_file):
+        asyncore.dispatcher.__init__(self)
+        self.graph = graph
+        self.create_socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.bind(socket_file)
+        self.listen(32)
+
+    def handle_accept(self):
+        """Start a channel for each new client
+        """
+        pair = self.accept()
+        if pair is not None:
+            QueryChannel(pair[0], self.graph)
+
+
+def run_server(graph, socket_file):
+    """Serve queries on the graph until interrupted
+    """
+    if os.path.exists(socket_file):
+        os.remove(socket_file)
+    QueryServer(graph, socket_file)
+    print("Serving queries on {} (ctrl-c to stop)".format(socket_file))
+    try:
+        asyncore.loop()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        asyncore.close_all()
+        if os.path.exists(socket_file):
+            os.remove(socket_file)
+
+
+## client
+
+class QueryClient(object):
+    """Send requests to a running server
+    """
+
+    def __init__(self, socket_file, session):
+        self.session = session
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_file)
+        self.reader = self.sock.makefile("rb")
+
+    def request(self, command, **kwargs):
+        """Return the server response to a command
+        """
+        kwargs["command"] = command
+        kwargs["options"] = self.session.options()
+        self.sock.sendall(json.dumps(kwargs).encode("utf-8") + b"\n")
+        line = self.reader.readline()
+        if not line:
+            raise EOFError
+        return json.loads(line)
+
+    def close(self):
+        """Disconnect from the server
+        """
+        self.reader.close()
+        self.sock.close()
+
+
+def connect(socket_file, session):
+    """Return a client of the server, exiting if it is not running
+    """
+    try:
+        return QueryClient(socket_file, session)
+    except socket.error as err_msg:
+        print("-> Error: No server on {} ({})".format(socket_file, err_msg))
+        sys.exit(1)
+
+def run_client(socket_file):
+    """Provide navigation using a running server
+    """
+    session = GlowSession()
+    server = connect(socket_file, session)
+
+    info = server.request("info")
+    print("Connected to {}: {} nodes and {} edges".format(
+        socket_file, info["nodes"], info["edges"]))
+
+    nodes = []
+    while True:
+        try:
+            print()
+            question = "Enter regex for selecting nodes"
+            if nodes:
+                question += " or number of current node"
+            query = input("{}: ".format(question))
+            if query.startswith(SESSION_SETTINGS):
+                session.special_command(query)
+                continue
+            elif query.startswith("$$"):
+                print()
+                print("--> '{}' is not available in the client".format(query))
+                continue
+            elif nodes and query.isdigit() and int(query) in range(len(nodes)):
+                response = server.request("node", node=nodes[int(query)][0])
+            else:
+                response = server.request("select", query=query)
+                if "nodes" in response:
+                    nodes = response["nodes"]
+                    if len(nodes) == 1:
+                        response = server.request("node", node=nodes[0][0])
+                    else:
+                        print_nodes(nodes)
+            if "error" in response:
+                print()
+                print("--> {}".format(response["error"]))
+            elif "node" in response:
+                print_node_detail(response["node"], response["parents"],
+                                  response["children"], session.minimal_display)
+        except KeyboardInterrupt:
+            # discard any response still in flight
+            server.close()
+            server = connect(socket_file, session)
+            continue
+        except EOFError:
+            server.close()
+            print()
+            print("Thanks for using the Glow Navigator")
+            print()
+            print()
+            sys.exit()
+
+
+if __name__ == "__main__":
+    print()
+    print("Start the server with 'glow_navigator serve'")
+    print()
@@ -11,14 +11,18 @@ Various utility functions used throught the project
 from __future__ import print_function
 
 # standard libraries
+from contextlib import contextmanager
+import hashlib
 import os.path
-import pickle
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 import re
 import uuid
 
 # external libraries
 from termcolor import colored
-import yaml
 
 from . glow_config import settings
 
@@ -48,21 +52,76 @@ def load_object_from_file(file_name):
     with open(file_name, "rb") as f:
         return pickle.load(f)
 
+@contextmanager
+def replaced_file(file_name):
+    """Provide a new file that replaces file_name once written
+
+    The file is written beside it and renamed into place so
+    readers of the old file are not cut short and a failed
+    write leaves the old file as it was
+    """
+    temp_name = "{}.{}.tmp".format(file_name, os.getpid())
+    try:
+        with open(temp_name, "wb") as f:
+            yield f
+        if os.name == "nt" and os.path.exists(file_name):
+            # rename does not replace files on Windows
+            os.remove(file_name)
+        os.rename(temp_name, file_name)
+    finally:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+
 def save_object_to_file(obj, file_name):
     """Marshal object and save to file
     """
-    with open(file_name, "wb") as f:
+    with replaced_file(file_name) as f:
         pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
 
+def load_objects_from_file(file_name):
+    """Generate the unmarshaled objects in order
+
+    The objects share one memo so later objects refer
+    to those already loaded rather than copies
+    """
+    with open(file_name, "rb") as f:
+        unpickler = pickle.Unpickler(f)
+        while True:
+            try:
+                yield unpickler.load()
+            except EOFError:
+                return
+
+def save_objects_to_file(objects, file_name):
+    """Marshal objects in order and save to file
+    """
+    with replaced_file(file_name) as f:
+        pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+        for obj in objects:
+            pickler.dump(obj)
+
 def load_yaml_file(file_name):
     """Return YAML from required file
+
+    Uses the libyaml parser when it is available
     """
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     try:
         with open(file_name, "r") as f:
-            return yaml.safe_load(f.read())
+            return yaml.load(f.read(), Loader=loader)
     except yaml.scanner.ScannerError as err_msg:
         print("\n\n-> Error: '{}' in {}".format(err_msg, file_name))
 
+def file_digest(file_name):
+    """Return the SHA-1 hex digest of the contents of a file
+    """
+    digest = hashlib.sha1()
+    with open(file_name, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 def raw_guid(guid):
     """Remove hyphens from string guid
     """
@@ -100,6 +159,45 @@ def glow_file_objects(*args, **kwargs):
             if "path" in v and k in candidates)
 
 
+## Shared records
+
+class FrozenRecord(dict):
+    """Read only attribute dict shared by equal edges
+
+    Pickles as a FrozenRecord built from its items, so the
+    class is needed to load it. The pickle memo saves a
+    record shared by many edges once and loads it once.
+    Caches from before records were shared hold plain
+    dicts, which load and query the same but are not
+    shared until the graph is built again
+    """
+    __slots__ = ()
+
+    def read_only(self, *args, **kwargs):
+        """Refuse changes to a shared record
+        """
+        raise TypeError("shared attribute records are read only")
+
+    __setitem__ = __delitem__ = read_only
+    clear = pop = popitem = setdefault = update = read_only
+
+    def __reduce__(self):
+        return (FrozenRecord, (dict(self),))
+
+def shared_string(strings, value):
+    """Return the shared copy of an equal string from strings
+    """
+    if isinstance(value, basestring):
+        return strings.setdefault((type(value), value), value)
+    return value
+
+def shared_dict(strings, data):
+    """Return a dict of data with shared keys and string values
+    """
+    return dict((shared_string(strings, k), shared_string(strings, v))
+                for k, v in data.iteritems())
+
+
 ## Printing in color and indenting for readibility
 
 def pindent(text, level):
@@ -64,7 +64,7 @@ setup(
 
     # You can just specify the packages manually here if your project is
     # simple. Or you can use find_packages().
-    packages=find_packages(exclude=['contrib', 'docs', 'tests']),
+    packages=find_packages(exclude=['benchmarks', 'contrib', 'docs', 'tests']),
 
     # Alternatively, if you want to distribute just a my_module.py, uncomment
     # this:
@@ -78,7 +78,7 @@ setup(
         'click',
         'colorama',
         'future',
-        'networkx==1.11',
+        'networkx>=1.11,<2.3',
         'pyreadline',
         'pyyaml',
         'termcolor'
@@ -109,7 +109,7 @@ setup(
     # pip to create the appropriate form of executable for the target platform.
     entry_points={
         'console_scripts': [
-            'glow_navigator = glow_navigator.glow_navigator:main',
+            'glow_navigator = glow_navigator.glow_cli:main',
         ]
     }
 )
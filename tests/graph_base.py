@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Unit Test Graph
+
+Small graph shared by the unit tests of the queries,
+reports, server, profiling and memory accounting
+
+    module -> formflow -> template
+"""
+
+import unittest
+
+from glow_navigator.glow_graph import new_graph
+
+
+def small_graph(name="Test"):
+    """Return the module, formflow and template graph
+    """
+    graph = new_graph(name=name)
+    graph.add_node("mod", {"name": "Module", "type": "module"})
+    graph.add_node("ff", {"name": "Formflow", "type": "formflow"})
+    graph.add_node("tpl", {"name": "Template", "type": "template"})
+    graph.add_edge("mod", "ff", attr_dict={"type": "link", "link_type": "module"})
+    graph.add_edge("ff", "tpl", attr_dict={"type": "link", "link_type": "show form task"})
+    return graph
+
+def add_tiles(graph, *names):
+    """Add a tile edge from the formflow to the template for each name
+    """
+    for name in names:
+        graph.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": name})
+
+
+class GraphBase(unittest.TestCase):
+    """Set up and tear down for the small graph
+    """
+    def setUp(self):
+        self.graph = small_graph()
+
+    def tearDown(self):
+        self.graph = None
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Benchmark Helper Unit Tests
+"""
+
+import unittest
+
+from ddt import ddt, data, unpack
+
+from benchmarks import common
+from benchmarks.common import peak_rss_mb, regressions
+
+
+@ddt
+class CommonTestCase(unittest.TestCase):
+    """Unit tests for the helpers shared by the benchmark suites
+    """
+    def setUp(self):
+        self.peak_rss = common.peak_rss
+
+    def tearDown(self):
+        common.peak_rss = self.peak_rss
+
+    @data((None, None), (3 * 1048576, 3.0))
+    @unpack
+    def test_peak_rss_mb(self, peak, result):
+        """Peak memory is None where the platform does not report it
+        """
+        common.peak_rss = lambda: peak
+        self.assertEqual(peak_rss_mb(), result)
+
+    @data(({"peak_rss_mb": None}, {"peak_rss_mb": 10.0}, []),
+          ({"peak_rss_mb": 10.0}, {"peak_rss_mb": None}, []),
+          ({"peak_rss_mb": 10.0}, {"peak_rss_mb": 12.0},
+           [("build", "peak_rss_mb", 10.0, 12.0)]))
+    @unpack
+    def test_regressions(self, before, after, found):
+        """Values missing from either run are not compared
+        """
+        self.assertEqual(regressions({"build": before}, {"build": after},
+                                     ["peak_rss_mb"], 10), found)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Query Benchmark Unit Tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ddt import ddt, data, unpack
+
+from benchmarks.bench_query import GRAPH_FILE, load_tree_graph, measure_queries, percentile
+from benchmarks.synthetic import generate_tree
+from glow_navigator.glow_graph import convert_graph
+
+
+@ddt
+class QueryBenchmarkTestCase(unittest.TestCase):
+    """Unit tests for timing the query workloads
+    """
+    @data((50, 5), (95, 10), (99, 10), (1, 1), (0, 1))
+    @unpack
+    def test_percentile(self, percent, expected):
+        """Nearest rank percentiles
+        """
+        self.assertEqual(percentile(range(1, 11), percent), expected)
+
+    def test_measure(self):
+        """Every workload is timed and the graph is cached in the tree
+        """
+        folder = tempfile.mkdtemp()
+        try:
+            generate_tree(folder, 100)
+            graph = load_tree_graph(folder)
+            self.assertTrue(os.path.isfile(os.path.join(folder, GRAPH_FILE)))
+            edges = graph.number_of_edges()
+            results = measure_queries(graph, 3)
+            self.assertEqual(graph.number_of_edges(), edges)
+            self.assertEqual(len(results), 8)
+            for result in results.values():
+                self.assertEqual(result["runs"], 3)
+                self.assertLessEqual(result["p50"], result["p95"])
+                self.assertLessEqual(result["p95"], result["p99"])
+            self.assertEqual(load_tree_graph(folder).number_of_edges(), edges)
+            self.assertEqual(len(measure_queries(convert_graph(graph, "compact"), 3)), 8)
+        finally:
+            shutil.rmtree(folder)
+
+if __name__ == "__main__":
+    unittest.main()
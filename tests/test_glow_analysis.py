@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Analysis Unit Tests
+"""
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from ddt import ddt, data, unpack
+
+from glow_navigator.glow_analysis import (
+    changed_nodes,
+    condensation,
+    coverage_counts,
+    cycles,
+    file_nodes,
+    file_object_type,
+    impact_analysis,
+    link_index,
+    linked,
+    module_depth,
+    nearest_sources,
+    new_orphans,
+    orphan_counts,
+    orphans,
+    export_orphans,
+    parse_pattern,
+    shortest_cycle,
+    pattern_matches,
+    reachable,
+    simple_paths,
+    business_test_coverage)
+from glow_navigator.glow_config import settings
+from glow_navigator.glow_navigator import GraphBuild, add_entity_to_graph, glow_object
+from graph_base import GraphBase
+
+
+class AnalysisBase(GraphBase):
+    """Set up the small graph with a condition, entity and test
+
+    module -> formflow -> template -> property <- condition
+    test -> formflow
+    """
+    def setUp(self):
+        super(AnalysisBase, self).setUp()
+        self.graph.add_node("cnd", {"name": "Condition", "type": "condition"})
+        self.graph.add_node("Job", {"name": "Job", "type": "entity"})
+        self.graph.add_node("Status-Job", {"name": "Status", "type": "property",
+                                           "entity": "Job"})
+        self.graph.add_node("tst", {"name": "tst", "type": "test"})
+        self.graph.add_edge("tpl", "Status-Job", attr_dict={"type": "link",
+                                                            "link_type": "bound property"})
+        self.graph.add_edge("cnd", "Status-Job", attr_dict={"type": "link",
+                                                            "link_type": "property dependency"})
+        self.graph.add_edge("tst", "ff", attr_dict={"type": "link",
+                                                    "link_type": "business test"})
+
+@ddt
+class ReachableTestCase(AnalysisBase):
+    """Unit tests for multi-source traversal
+    """
+    @data((["tpl"], {"tpl": 0, "ff": 1, "mod": 2, "tst": 2}),
+          (["tpl", "cnd"], {"tpl": 0, "cnd": 0, "ff": 1, "mod": 2, "tst": 2}),
+          ([], {}))
+    @unpack
+    def test_reverse_reachable(self, sources, result):
+        """Finds all callers of the sources with their depth
+        """
+        self.assertEqual(reachable(sources, self.graph.predecessors), result)
+
+    def test_forward_reachable(self):
+        """Finds all callees of the sources
+        """
+        result = reachable(["mod"], self.graph.successors)
+        self.assertEqual(sorted(result), ["Status-Job", "ff", "mod", "tpl"])
+
+@ddt
+class ImpactTestCase(AnalysisBase):
+    """Unit tests for change set impact analysis
+    """
+    @data(("/src/DotNet/Infrastructure/Conditions/Configuration/Conditions/a.yaml", "condition"),
+          ("/src/DotNet/Infrastructure/Rules/Configuration/Entities/Job.yaml", "entity"),
+          ("/src/DotNet/SystemData/SystemData/BPM/BPMForm/a.yaml", "template"),
+          ("/src/src/BusinessTests/Features/Files/a.feature", "test"),
+          ("/src/README.md", None))
+    @unpack
+    def test_file_object_type(self, file_name, result):
+        """Recognises the type of object defined in a file
+        """
+        attrs = file_object_type(file_name)
+        self.assertEqual(attrs and attrs["type"], result)
+
+    @data(("condition", "a/484a99c56e16468a924be177947f390e.yaml",
+           ["484a99c5-6e16-468a-924b-e177947f390e"]),
+          ("condition", "a/not-a-guid.yaml", []),
+          ("entity", "a/Job.yaml", ["Job"]),
+          ("test", "a/My Test.feature", ["My Test"]),
+          ("template", "tests/test_data/test_template.yaml", ["tic-tac-toe"]),
+          ("template", "tests/test_data/missing.yaml", []))
+    @unpack
+    def test_file_nodes(self, object_type, file_name, result):
+        """Names the nodes created from a file
+        """
+        self.assertEqual(file_nodes(file_name, settings[object_type]), result)
+
+    def test_index_nodes(self):
+        """Index files make a node for each indexed field
+        """
+        values = {"entityType": "Job", "indexFields": [{"name": "JobNumber"}, {"name": "Ref"}]}
+        self.assertEqual(file_nodes("a/Job.yaml", settings["index"], values),
+                         ["JOBNUMBER", "REF"])
+
+    def test_deleted_file(self):
+        """Deleted files are found from the sources of the graph
+        """
+        file_name = "DotNet/SystemData/SystemData/BPM/BPMForm/Deleted.yaml"
+        self.graph.graph["sources"] = {file_name: ["tpl"]}
+        changed, groups = impact_analysis(self.graph, [file_name])
+        self.assertEqual(changed, set(["tpl"]))
+        self.assertEqual(groups, {"formflow": ["ff"], "module": ["mod"], "test": ["tst"]})
+
+    def test_entity_changes(self):
+        """Changed entity files include their properties
+        """
+        file_names = ["/src/DotNet/Infrastructure/Rules/Configuration/Entities/Job.yaml"]
+        self.assertEqual(changed_nodes(self.graph, file_names), set(["Job", "Status-Job"]))
+
+    def test_impact_analysis(self):
+        """Affected objects are grouped by type
+        """
+        file_names = ["/src/DotNet/Infrastructure/Rules/Configuration/Entities/Job.yaml"]
+        changed, groups = impact_analysis(self.graph, file_names)
+        self.assertEqual(changed, set(["Job", "Status-Job"]))
+        self.assertEqual(groups, {"condition": ["cnd"],
+                                  "formflow": ["ff"],
+                                  "module": ["mod"],
+                                  "template": ["tpl"],
+                                  "test": ["tst"]})
+
+@ddt
+class LinkIndexTestCase(AnalysisBase):
+    """Unit tests for link type filtered traversal
+    """
+    def setUp(self):
+        super(LinkIndexTestCase, self).setUp()
+        self.graph.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": "Tile"})
+
+    def test_link_index(self):
+        """Edges are indexed by link type or type
+        """
+        index = link_index(self.graph)
+        self.assertEqual(index["show form task"]["successors"], {"ff": ["tpl"]})
+        self.assertEqual(index["tile"]["predecessors"], {"tpl": ["ff"]})
+
+    @data(([], ["Status-Job", "ff", "mod", "tpl"]),
+          (["module"], ["ff", "mod"]),
+          (["module", "tile"], ["ff", "mod", "tpl"]),
+          (["foo"], ["mod"]))
+    @unpack
+    def test_filtered_reachable(self, link_types, result):
+        """Traversal only follows matching links
+        """
+        callees = linked(self.graph, self.graph.successors, link_types)
+        self.assertEqual(sorted(reachable(["mod"], callees)), result)
+
+    @data(("mod", "Status-Job", 5, None, [["mod", "ff", "tpl", "Status-Job"]]),
+          ("mod", "Status-Job", 2, None, []),
+          ("ff", "tpl", 5, None, [["ff", "tpl"]]),
+          ("ff", "tpl", 5, ["tile"], [["ff", "tpl"]]),
+          ("tpl", "mod", 5, None, []))
+    @unpack
+    def test_simple_paths(self, source, target, cutoff, link_types, result):
+        """Finds paths between nodes following matching links
+        """
+        paths = list(simple_paths(self.graph, source, target, cutoff, link_types))
+        self.assertEqual(paths, result)
+
+    def test_filtered_impact(self):
+        """Impact analysis follows matching links
+        """
+        file_names = ["/src/DotNet/Infrastructure/Rules/Configuration/Entities/Job.yaml"]
+        _, groups = impact_analysis(self.graph, file_names, ["bound property"])
+        self.assertEqual(groups, {"template": ["tpl"]})
+
+@ddt
+class PatternTestCase(AnalysisBase):
+    """Unit tests for path pattern queries
+    """
+    @data(("module -> formflow", ["module", "formflow"], [[]]),
+          ("a -[b, c]-> d->e", ["a", "d", "e"], [["b", "c"], []]))
+    @unpack
+    def test_parse_pattern(self, pattern, node_types, link_types):
+        """Patterns are split into node types and link types
+        """
+        self.assertEqual(parse_pattern(pattern), (node_types, link_types))
+
+    @data("module", "module ->", "-> module")
+    def test_invalid_pattern(self, pattern):
+        """Incomplete patterns are rejected
+        """
+        self.assertRaises(ValueError, parse_pattern, pattern)
+
+    @data(("module -> formflow -> template", [["mod", "ff", "tpl"]]),
+          ("* -> formflow", [["mod", "ff"], ["tst", "ff"]]),
+          ("template -[bound property]-> property", [["tpl", "Status-Job"]]),
+          ("template -[module]-> property", []),
+          ("test -> formflow -> * -> property", [["tst", "ff", "tpl", "Status-Job"]]))
+    @unpack
+    def test_pattern_matches(self, pattern, result):
+        """Chains matching the pattern are found
+        """
+        self.assertEqual(sorted(pattern_matches(self.graph, pattern)), result)
+
+class CoverageTestCase(AnalysisBase):
+    """Unit tests for business test coverage
+    """
+    def setUp(self):
+        super(CoverageTestCase, self).setUp()
+        self.graph.add_node("tpl2", {"name": "Other", "type": "template"})
+        self.graph.add_edge("mod", "tpl2", attr_dict={"type": "link", "link_type": "module"})
+
+    def test_nearest_sources(self):
+        """Each node is attributed to one source
+        """
+        result = nearest_sources(["mod", "cnd"], self.graph.successors)
+        self.assertEqual(result["tpl2"], "mod")
+        self.assertEqual(result["cnd"], "cnd")
+        self.assertNotIn("tst", result)
+
+    def test_uncovered_objects(self):
+        """Objects not reached by tests are listed with their module
+        """
+        rows = business_test_coverage(self.graph)
+        self.assertEqual([(r["node"], r["module"]) for r in rows],
+                         [("cnd", ""), ("tpl2", "Module")])
+        self.assertEqual(coverage_counts(rows),
+                         {"": {"condition": 1}, "Module": {"template": 1}})
+
+    def test_command_rules(self):
+        """Properties with a command rule are commands and are counted
+        """
+        # a tile calling the command adds its node before the entity
+        self.graph.add_edge("tpl2", "Close-Job", attr_dict={"type": "tile"})
+        entity = glow_object(settings["entity"], {"name": "Job", "properties": {
+            "Close": [{"ruleType": "CMD", "methodName": "Close"}],
+            "Status": [{"ruleType": "VAL", "methodName": "Check", "conditionIds": ["C1"]}]}})
+        add_entity_to_graph(self.graph, entity, "Job.yaml", GraphBuild())
+        self.assertEqual(self.graph.node["Close-Job"]["type"], "command")
+        self.assertEqual(self.graph.node["Status-Job"]["validation_rule"], "Check")
+        rows = business_test_coverage(self.graph)
+        self.assertIn(("Close-Job", "command", "Module"),
+                      [(r["node"], r["type"], r["module"]) for r in rows])
+        self.assertEqual(coverage_counts(rows)["Module"], {"command": 1, "template": 1})
+
+class CycleTestCase(AnalysisBase):
+    """Unit tests for strongly connected components
+    """
+    def setUp(self):
+        super(CycleTestCase, self).setUp()
+        self.graph.add_node("ff2", {"name": "Jump", "type": "formflow"})
+        self.graph.add_edge("ff", "ff2", attr_dict={"type": "link",
+                                                    "link_type": "jump to formflow task"})
+        self.graph.add_edge("ff2", "ff", attr_dict={"type": "link",
+                                                    "link_type": "jump to formflow task"})
+        self.graph.add_edge("tpl", "tpl", attr_dict={"type": "link",
+                                                     "link_type": "component template"})
+
+    def test_cycles(self):
+        """Finds jump cycles and self references
+        """
+        self.assertEqual(cycles(self.graph), [["ff", "ff2"], ["tpl"]])
+
+    def test_shortest_cycle(self):
+        """One shortest cycle is given for each component
+        """
+        self.assertEqual(shortest_cycle(self.graph, ["ff", "ff2"]), ["ff", "ff2", "ff"])
+        self.assertEqual(shortest_cycle(self.graph, ["tpl"]), ["tpl", "tpl"])
+        self.graph.add_edge("ff2", "mod", attr_dict={"type": "link"})
+        self.graph.add_edge("mod", "ff2", attr_dict={"type": "link"})
+        self.assertEqual(cycles(self.graph)[0], ["ff", "ff2", "mod"])
+        self.assertEqual(shortest_cycle(self.graph, ["mod", "ff", "ff2"]),
+                         ["mod", "ff2", "mod"])
+
+    def test_condensation_is_cached(self):
+        """The condensed DAG is stored with the graph
+        """
+        condensed = condensation(self.graph)
+        self.assertIs(condensation(self.graph), condensed)
+        self.assertEqual(condensed.number_of_nodes(), 7)
+
+    def test_module_depth(self):
+        """Depth is measured in components below the modules
+        """
+        self.assertEqual(module_depth(self.graph, "ff2"), 1)
+        self.assertEqual(module_depth(self.graph, "Status-Job"), 3)
+        self.assertEqual(module_depth(self.graph, "cnd"), None)
+
+@ddt
+class OrphanTestCase(AnalysisBase):
+    """Unit tests for references to undefined objects
+    """
+    def setUp(self):
+        super(OrphanTestCase, self).setUp()
+        self.graph.add_edge("tpl", "img", attr_dict={"type": "link", "link_type": "image"})
+        self.graph.add_edge("ff", "img", attr_dict={"type": "link", "link_type": "image"})
+        self.graph.add_edge("tpl", "cnd2", attr_dict={"type": "link",
+                                                      "link_type": "condition"})
+        self.graph.add_edge("mod", "AttachToIJob", attr_dict={"type": "link"})
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        super(OrphanTestCase, self).tearDown()
+        shutil.rmtree(self.folder)
+
+    def test_orphans(self):
+        """Each reference to an undefined object is a row
+        """
+        rows = orphans(self.graph)
+        self.assertEqual([(r["link_type"], r["node"], r["caller"]) for r in rows],
+                         [("condition", "cnd2", "tpl"),
+                          ("image", "img", "ff"),
+                          ("image", "img", "tpl")])
+        self.assertEqual(orphan_counts(rows), {"condition": 1, "image": 1})
+
+    def test_orphans_are_cached(self):
+        """The rows are stored with the graph
+        """
+        self.assertIs(orphans(self.graph), self.graph.graph["orphans"])
+
+    @data((["image"], ["ff", "tpl"]),
+          (["formflow"], ["ff"]),
+          (["template", "condition"], ["tpl", "tpl"]),
+          (["foo"], []))
+    @unpack
+    def test_filtered_orphans(self, types, callers):
+        """Rows are filtered by link type or caller type
+        """
+        self.assertEqual([r["caller"] for r in orphans(self.graph, types)], callers)
+
+    def test_new_orphans(self):
+        """Only references missing from the baseline are new
+        """
+        baseline = self.graph.copy()
+        baseline.remove_edge("ff", "img")
+        rows = orphans(baseline)
+        self.assertEqual([r["caller"] for r in new_orphans(self.graph, rows)], ["ff"])
+        self.assertEqual(len(new_orphans(self.graph, None)), 3)
+        self.assertEqual(new_orphans(self.graph, rows, ["condition"]), [])
+
+    def test_export_orphans(self):
+        """Rows are saved as CSV or JSON
+        """
+        rows = orphans(self.graph)
+        csv_file = os.path.join(self.folder, "orphans.csv")
+        export_orphans(rows, csv_file)
+        with open(csv_file, "rb") as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 3)
+        json_file = os.path.join(self.folder, "orphans.json")
+        export_orphans(rows, json_file)
+        with open(json_file) as f:
+            self.assertEqual(json.load(f)["counts"], {"condition": 1, "image": 1})
+
+if __name__ == "__main__":
+    unittest.main()
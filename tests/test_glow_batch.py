@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Batch Unit Tests
+"""
+
+import json
+from StringIO import StringIO
+import unittest
+from ddt import ddt, data, unpack
+
+from glow_navigator.glow_batch import BatchIndex, run_batch
+from glow_navigator.glow_navigator import GlowSession
+from graph_base import GraphBase, add_tiles
+
+
+@ddt
+class BatchTestCase(GraphBase):
+    """Unit tests for batch queries
+    """
+    def batch(self, queries, session=None, **kwargs):
+        """Return the parsed JSON lines for the queries
+        """
+        output = StringIO()
+        run_batch(session or GlowSession(self.graph), queries, output, **kwargs)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    @data((["form\n"], ["ff"]),
+          (["form\n", "\n", "type: (module|template)\n"], ["ff", "mod", "tpl"]),
+          (["nothing\n"], []))
+    @unpack
+    def test_select(self, queries, result):
+        """Writes a line per matching node per query
+        """
+        self.assertEqual(sorted(r["node"] for r in self.batch(queries)), result)
+
+    def test_result(self):
+        """Lines hold the node, its attributes and counts
+        """
+        result = self.batch(["Formflow"])[0]
+        self.assertEqual(result, {"query": "Formflow", "node": "ff", "counts": "1<1",
+                                  "data": {"name": "Formflow", "type": "formflow"}})
+
+    @data("show form", "Other", "module", "tile", "missing")
+    def test_same_edges_as_interactive(self, query):
+        """Batch and interactive searches over edges find the same nodes
+        """
+        add_tiles(self.graph, "Tile", "Other")
+        session = GlowSession(self.graph, edge_match=True, ignore_types=["template"])
+        interactive = sorted(node for node, _ in session.select(query))
+        self.assertEqual(sorted(r["node"] for r in self.batch([query], session)), interactive)
+        self.assertEqual("ff" in interactive, query in ("show form", "Other", "tile"))
+
+    def test_invalid_regex(self):
+        """Invalid queries are reported on their own line
+        """
+        self.assertEqual(self.batch(["(bad"]), [{"query": "(bad", "error": "invalid regex"}])
+
+    @data((["ff", "foo"], ["ff"]),
+          (["form"], []))
+    @unpack
+    def test_exact(self, queries, result):
+        """Exact queries are node ids
+        """
+        self.assertEqual([r["node"] for r in self.batch(queries, exact=True)], result)
+
+    def test_lazy_index(self):
+        """Nodes are serialized on the first regex query only
+        """
+        index = BatchIndex(GlowSession(self.graph))
+        self.assertEqual(index.neighbours("mod", self.graph.successors)[0]["node"], "ff")
+        self.assertIsNone(index.entries)
+        self.assertEqual([node for node, _ in index.select("form")], ["ff"])
+        self.assertEqual(len(index.entries), 3)
+
+    def test_session_settings(self):
+        """Session settings apply to the whole batch
+        """
+        session = GlowSession(self.graph, max_level=0, ignore_types=["template"])
+        results = self.batch(["o", "l"], session, neighbours=True)
+        self.assertEqual(sorted(r["node"] for r in results), ["ff", "ff", "mod", "mod"])
+        module = [r for r in results if r["node"] == "mod"][0]
+        self.assertEqual(module["children"], [{"level": 1, "node": "ff", "type": "formflow",
+                                               "link_types": ["module"]}])
+
+    def test_edge_match(self):
+        """Edges are searched when edge matching is set
+        """
+        session = GlowSession(self.graph, edge_match=True)
+        self.assertEqual([r["node"] for r in self.batch(["show form"], session)], ["ff"])
+
+if __name__ == "__main__":
+    unittest.main()
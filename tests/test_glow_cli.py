@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Command Line Unit Tests
+"""
+
+import json
+import unittest
+from click.testing import CliRunner
+from ddt import ddt, data, unpack
+
+from glow_navigator import glow_cli, glow_http, glow_server
+from glow_navigator.glow_graph import backend_name, convert_graph
+from graph_base import GraphBase
+
+
+@ddt
+class BackendTestCase(GraphBase):
+    """Unit tests for choosing the backend of the commands
+    """
+    def setUp(self):
+        super(BackendTestCase, self).setUp()
+        self.saved = (glow_cli.load_graph, glow_server.run_server, glow_http.run_http)
+        self.loaded, self.served = [], []
+        glow_cli.load_graph = self.load_graph
+        glow_server.run_server = lambda graph, *args: self.served.append(backend_name(graph))
+        glow_http.run_http = lambda graph, *args: self.served.append(backend_name(graph))
+
+    def tearDown(self):
+        glow_cli.load_graph, glow_server.run_server, glow_http.run_http = self.saved
+        super(BackendTestCase, self).tearDown()
+
+    def load_graph(self, backend):
+        """Return the small graph converted to the backend
+        """
+        self.loaded.append(backend)
+        return convert_graph(self.graph, backend)
+
+    @data((["serve"], "networkx"),
+          (["--backend", "compact", "serve"], "compact"),
+          (["--backend", "compact", "http", "--port", "0"], "compact"),
+          (["--backend", "networkx", "http"], "networkx"))
+    @unpack
+    def test_servers(self, args, backend):
+        """The servers use the backend given before the command
+        """
+        result = CliRunner().invoke(glow_cli.main, args)
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self.served, [backend])
+
+    @data((["batch", "--exact"], "networkx"),
+          (["--backend", "compact", "batch", "--exact"], "compact"))
+    @unpack
+    def test_batch(self, args, backend):
+        """Batch mode queries the graph of the backend given before the command
+        """
+        result = CliRunner().invoke(glow_cli.main, args, input="ff\n")
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(json.loads(result.output)["node"], "ff")
+        self.assertEqual(self.loaded, [backend])
+
+    @data("serve", "http", "batch")
+    def test_backend_after_command(self, command):
+        """The backend is only an option of the navigator itself
+        """
+        result = CliRunner().invoke(glow_cli.main, [command, "--backend", "compact"])
+        self.assertEqual(result.exit_code, 2)
+        self.assertEqual(self.loaded, [])
+
+if __name__ == "__main__":
+    unittest.main()
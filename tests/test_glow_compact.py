@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Compact Graph Unit Tests
+"""
+
+import unittest
+from ddt import ddt, data, unpack
+
+from glow_navigator.glow_analysis import (
+    cycles, linked, module_depth, orphans, shortest_cycle)
+from glow_navigator.glow_compact import compact_graph
+from glow_navigator.glow_graph import graph_info, new_graph
+from glow_navigator.glow_navigator import (
+    get_node_data,
+    select_nodes,
+    share_attributes,
+    tree_entries)
+
+
+@ddt
+class CompactGraphTestCase(unittest.TestCase):
+    """Unit tests for querying the compact graph
+    """
+    def setUp(self):
+        self.graph = new_graph(name="Compact", generation="abc")
+        self.graph.add_node("mod", {"name": "Module", "type": "module"})
+        self.graph.add_node("ff", {"name": "Formflow", "type": "formflow"})
+        self.graph.add_node("tpl", {"name": "Template", "type": "template"})
+        self.graph.add_node("alone", {"name": "Alone", "type": "image"})
+        self.graph.add_edge("mod", "ff", attr_dict={"type": "link", "link_type": "module"})
+        self.graph.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": "Tile"})
+        self.graph.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": "Other"})
+        self.graph.add_edge("ff", "ff", attr_dict={"type": "link", "link_type": "jump"})
+        self.graph.add_edge("tpl", "cnd", attr_dict={"type": "link", "link_type": "condition"})
+        share_attributes(self.graph)
+        self.compact = compact_graph(self.graph)
+
+    def tearDown(self):
+        self.graph = None
+        self.compact = None
+
+    def test_nodes(self):
+        """Nodes and their attributes are the same
+        """
+        self.assertEqual(sorted(self.compact), sorted(self.graph))
+        self.assertEqual(len(self.compact), 5)
+        self.assertEqual(self.compact.number_of_nodes(), 5)
+        self.assertEqual(dict(self.compact.nodes_iter(data=True)),
+                         dict(self.graph.nodes_iter(data=True)))
+        self.assertEqual(self.compact.node["mod"], {"name": "Module", "type": "module"})
+        self.assertIn("cnd", self.compact.node)
+        self.assertTrue(self.compact.has_node("alone"))
+        self.assertFalse(self.compact.has_node("missing"))
+        self.assertEqual(self.compact.graph["generation"], "abc")
+        self.assertEqual(self.compact.name, "Compact")
+
+    @data("mod", "ff", "tpl", "cnd", "alone")
+    def test_neighbours(self, node):
+        """Successors and predecessors are the same, once each
+        """
+        self.assertEqual(sorted(self.compact.successors(node)),
+                         sorted(self.graph.successors(node)))
+        self.assertEqual(sorted(self.compact.predecessors(node)),
+                         sorted(self.graph.predecessors(node)))
+        self.assertEqual(self.compact.in_degree(node), self.graph.in_degree(node))
+        self.assertEqual(self.compact.out_degree(node), self.graph.out_degree(node))
+
+    def test_edges(self):
+        """Edges, keys and parallel edges are the same
+        """
+        self.assertEqual(self.compact.number_of_edges(), 5)
+        self.assertEqual(sorted(self.compact.edges_iter(keys=True, data=True)),
+                         sorted(self.graph.edges_iter(keys=True, data=True)))
+        self.assertEqual(sorted(self.compact.edges_iter("ff", data=True)),
+                         sorted(self.graph.edges_iter("ff", data=True)))
+        self.assertEqual(self.compact.edges(["mod", "missing"]), [("mod", "ff")])
+        self.assertEqual(self.compact.get_edge_data("ff", "tpl"),
+                         self.graph.get_edge_data("ff", "tpl"))
+        self.assertIsNone(self.compact.get_edge_data("tpl", "ff"))
+        self.assertIsNone(self.compact.get_edge_data("missing", "ff"))
+        self.assertTrue(self.compact.has_edge("ff", "ff"))
+        self.assertEqual(self.compact.in_degree(), self.graph.in_degree())
+        self.assertIn("Average in degree", graph_info(self.compact))
+
+    def test_records(self):
+        """Shared edge attributes stay shared
+        """
+        self.graph.add_edge("cnd", "ff", attr_dict={"type": "link", "link_type": "module"})
+        share_attributes(self.graph)
+        compact = compact_graph(self.graph)
+        self.assertEqual(len(compact.records), 5)
+        self.assertIs(compact.get_edge_data("cnd", "ff")[0],
+                      compact.get_edge_data("mod", "ff")[0])
+
+    @data(("ff", "successors"), ("tpl", "predecessors"), ("ff", "predecessors"))
+    @unpack
+    def test_queries(self, node, direction):
+        """Expansions, searches and reports give the same results
+        """
+        def entries(graph):
+            """Return the sorted entries of the node
+            """
+            return sorted(tree_entries(graph, node, getattr(graph, direction)))
+        self.assertEqual(entries(self.compact), entries(self.graph))
+        self.assertEqual(sorted(select_nodes(self.compact, "type: t")),
+                         sorted(select_nodes(self.graph, "type: t")))
+        self.assertEqual(get_node_data(self.compact, "ff")["counts"], "2<2")
+        self.assertEqual(cycles(self.compact), cycles(self.graph))
+        self.assertEqual([shortest_cycle(self.compact, x) for x in cycles(self.compact)],
+                         [shortest_cycle(self.graph, x) for x in cycles(self.graph)])
+        self.assertEqual(orphans(self.compact), orphans(self.graph))
+
+    @data(["tile"], ["jump", "tile"], ["condition"], ["missing"])
+    def test_derived(self, link_types):
+        """Link indexes and components are arrays giving the same answers
+        """
+        self.assertNotIn("condensation", self.compact.graph)
+        self.assertIsNot(self.compact.graph, self.graph.graph)
+        for node in self.graph:
+            for direction in ("successors", "predecessors"):
+                self.assertEqual(
+                    linked(self.compact, getattr(self.compact, direction), link_types)(node),
+                    linked(self.graph, getattr(self.graph, direction), link_types)(node))
+            self.assertEqual(module_depth(self.compact, node), module_depth(self.graph, node))
+        self.assertEqual(sorted(self.compact.graph["link_index"]["tile"]["successors"]), ["ff"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Diff Unit Tests
+"""
+
+from io import BytesIO
+import json
+import unittest
+
+from glow_navigator.glow_diff import (
+    diff_summary,
+    fingerprint,
+    graph_diff,
+    write_diff)
+from glow_navigator.glow_graph import new_graph
+
+
+class DiffTestCase(unittest.TestCase):
+    """Unit tests for comparing two builds
+    """
+    def setUp(self):
+        self.old = new_graph(name="Old")
+        self.old.add_node("mod", {"name": "Module", "type": "module"})
+        self.old.add_node("ff", {"name": "Formflow", "type": "formflow"})
+        self.old.add_node("tpl", {"name": "Template", "type": "template"})
+        self.old.add_edge("mod", "ff", attr_dict={"type": "link", "link_type": "module"})
+        self.old.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": "Tile"})
+        self.old.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": "Other"})
+        self.new = self.old.copy()
+
+    def tearDown(self):
+        self.old = None
+        self.new = None
+
+    def changes(self):
+        """Return the differences as sorted tuples
+        """
+        return sorted(tuple(sorted(r.items())) for r in graph_diff(self.old, self.new))
+
+    def test_fingerprint(self):
+        """Counts do not change the fingerprint
+        """
+        self.assertEqual(fingerprint({"name": "A", "counts": "1<0"}), fingerprint({"name": "A"}))
+        self.assertNotEqual(fingerprint({"name": "A"}), fingerprint({"name": "B"}))
+
+    def test_no_differences(self):
+        """Identical graphs have no differences
+        """
+        self.new.node["ff"]["counts"] = "1<2"
+        self.assertEqual(self.changes(), [])
+
+    def test_nodes(self):
+        """Added, removed and changed nodes are found
+        """
+        self.new.add_node("cnd", {"name": "Condition", "type": "condition"})
+        self.new.node["ff"]["name"] = "Renamed"
+        self.new.remove_node("mod")
+        records = list(graph_diff(self.old, self.new))
+        nodes = sorted((r["change"], r["node"]) for r in records if "node" in r)
+        self.assertEqual(nodes, [("added", "cnd"), ("changed", "ff"), ("removed", "mod")])
+        self.assertEqual([r["keys"] for r in records if r["change"] == "changed"], [["name"]])
+        edges = [(r["change"], r["source"]) for r in records if "source" in r]
+        self.assertEqual(edges, [("removed", "mod")])
+
+    def test_parallel_edges(self):
+        """Parallel edges are matched by content
+        """
+        self.new.remove_edge("ff", "tpl")
+        self.new.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": "Third"})
+        self.new.add_edge("ff", "tpl", attr_dict={"type": "link", "link_type": "show form task"})
+        summary = diff_summary(graph_diff(self.old, self.new))
+        self.assertEqual(summary, {"nodes": {},
+                                   "edges": {"tile": {"changed": 1},
+                                             "show form task": {"added": 1}}})
+
+    def test_write_diff(self):
+        """Each difference is a JSON line followed by the summary
+        """
+        self.new.add_node("cnd", {"name": "Condition", "type": "condition"})
+        output = BytesIO()
+        write_diff(self.old, self.new, output)
+        lines = [json.loads(x) for x in output.getvalue().splitlines()]
+        self.assertEqual(lines[0], {"change": "added", "node": "cnd", "type": "condition"})
+        self.assertEqual(lines[-1], {"summary": {"nodes": {"condition": {"added": 1}},
+                                                 "edges": {}}})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Export Unit Tests
+"""
+
+from io import BytesIO
+import json
+import unittest
+from ddt import ddt, data, unpack
+import networkx as nx
+
+from glow_navigator.glow_export import (
+    export_graph,
+    export_nodes,
+    neighbourhood)
+from glow_navigator.glow_graph import new_graph
+
+
+@ddt
+class ExportTestCase(unittest.TestCase):
+    """Unit tests for streaming the graph to other formats
+
+    module -> formflow -> template -> property <- condition
+    """
+    def setUp(self):
+        self.graph = new_graph(name="Test")
+        self.graph.add_node("mod", {"name": "Module", "type": "module"})
+        self.graph.add_node("ff", {"name": u"Formflow é", "type": "formflow",
+                                   "sounds": ["a", "b"], "counts": "1<1"})
+        self.graph.add_node("tpl", {"name": 'Template "<1>"', "type": "template"})
+        self.graph.add_node("cnd", {"name": "Condition", "type": "condition"})
+        self.graph.add_node("Status-Job", {"name": "Status", "type": "property"})
+        self.graph.add_edge("mod", "ff", attr_dict={"type": "link", "link_type": "module"})
+        self.graph.add_edge("ff", "tpl", attr_dict={"type": "link",
+                                                    "link_type": "show form task"})
+        self.graph.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": "Tile"})
+        self.graph.add_edge("tpl", "Status-Job", attr_dict={"type": "link",
+                                                            "link_type": "bound property"})
+        self.graph.add_edge("cnd", "Status-Job", attr_dict={"type": "link",
+                                                            "link_type": "property dependency"})
+
+    def tearDown(self):
+        self.graph = None
+
+    def export(self, export_format, **options):
+        """Return the exported text
+        """
+        output = BytesIO()
+        export_graph(self.graph, output, export_format, **options)
+        return output.getvalue()
+
+    @data(("tpl", 1, ["Status-Job", "ff", "tpl"]),
+          ("tpl", 2, ["Status-Job", "cnd", "ff", "mod", "tpl"]),
+          ("mod", 0, ["Status-Job", "cnd", "ff", "mod", "tpl"]))
+    @unpack
+    def test_neighbourhood(self, node, hops, result):
+        """Nodes within hops in either direction are found
+        """
+        self.assertEqual(sorted(neighbourhood(self.graph, node, hops)), result)
+
+    def test_type_filter(self):
+        """Only nodes of the types are exported
+        """
+        nodes = export_nodes(self.graph, "tpl", 2, ["template", "formflow"])
+        self.assertEqual(sorted(nodes), ["ff", "tpl"])
+        self.assertIs(export_nodes(self.graph), self.graph)
+
+    def test_jsonl(self):
+        """Each node and edge is a JSON line
+        """
+        lines = [json.loads(x) for x in self.export("jsonl", around="ff").splitlines()]
+        nodes = [x for x in lines if "node" in x]
+        edges = [x for x in lines if "source" in x]
+        self.assertEqual(sorted(x["node"] for x in nodes), ["ff", "mod", "tpl"])
+        self.assertEqual(len(edges), 3)
+        ff_data = [x["data"] for x in nodes if x["node"] == "ff"][0]
+        self.assertEqual(ff_data["sounds"], '["a", "b"]')
+        self.assertNotIn("counts", ff_data)
+
+    def test_graphml(self):
+        """GraphML can be read back by networkx
+        """
+        graph = nx.parse_graphml(self.export("graphml"))
+        self.assertEqual(graph.number_of_nodes(), 5)
+        self.assertEqual(graph.number_of_edges(), 5)
+        self.assertEqual(graph.node["tpl"]["name"], 'Template "<1>"')
+        self.assertEqual(graph.node["ff"]["name"], u"Formflow é")
+
+    def test_dot(self):
+        """DOT labels nodes by name and edges by link type
+        """
+        text = self.export("dot", types=["formflow", "template"])
+        self.assertIn('"ff" -> "tpl" [label="show form task"];', text)
+        self.assertIn('"ff" -> "tpl" [label="tile"];', text)
+        self.assertIn('"tpl" [label="Template \\"<1>\\"", type="template"];', text)
+        self.assertNotIn('"mod"', text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Graph Access Layer Unit Tests
+
+The conformance cases run against every backend so each
+answers the graph calls of the navigator the same way
+"""
+
+import unittest
+from ddt import ddt, data
+import networkx as nx
+
+from glow_navigator.glow_analysis import cycles, orphans
+from glow_navigator.glow_graph import (
+    BACKENDS,
+    BUILD_API,
+    GRAPH_API,
+    backend_name,
+    convert_graph,
+    graph_class,
+    graph_info,
+    networkx_version,
+    new_graph)
+from glow_navigator.glow_navigator import share_attributes
+
+
+def sample_graph(backend):
+    """Return the sample graph held by the backend
+    """
+    graph = new_graph(name="Sample", generation="abc")
+    graph.add_node("mod", {"name": "Module", "type": "module"})
+    graph.add_node("ff", {"name": "Formflow", "type": "formflow"})
+    graph.add_node("tpl", {"name": "Template", "type": "template"})
+    graph.add_node("alone", {"name": "Alone", "type": "image"})
+    graph.add_edge("mod", "ff", attr_dict={"type": "link", "link_type": "module"})
+    graph.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": "Tile"})
+    graph.add_edge("ff", "tpl", attr_dict={"type": "tile", "name": "Other"})
+    graph.add_edge("ff", "ff", attr_dict={"type": "link", "link_type": "jump"})
+    graph.add_edge("tpl", "cnd", attr_dict={"type": "link", "link_type": "condition"})
+    share_attributes(graph)
+    return convert_graph(graph, backend)
+
+
+@ddt
+class GraphConformanceTestCase(unittest.TestCase):
+    """Conformance of each backend to the graph calls
+    """
+    @data(*BACKENDS)
+    def test_api(self, backend):
+        """Every call of the access layer is offered
+        """
+        graph = sample_graph(backend)
+        for name in GRAPH_API:
+            self.assertTrue(hasattr(graph, name), name)
+        self.assertEqual(backend_name(graph), backend)
+        self.assertTrue(graph.is_directed())
+        self.assertTrue(graph.is_multigraph())
+
+    @data(*BACKENDS)
+    def test_nodes(self, backend):
+        """Nodes are listed with their attributes
+        """
+        graph = sample_graph(backend)
+        nodes = ["alone", "cnd", "ff", "mod", "tpl"]
+        self.assertEqual(sorted(graph), nodes)
+        self.assertEqual(sorted(graph.nodes()), nodes)
+        self.assertIsInstance(graph.nodes(), list)
+        self.assertEqual(len(graph), 5)
+        self.assertEqual(graph.number_of_nodes(), 5)
+        self.assertEqual(dict(graph.nodes_iter(data=True))["tpl"],
+                         {"name": "Template", "type": "template"})
+        self.assertEqual(graph.node["mod"]["type"], "module")
+        self.assertEqual(graph.node["cnd"], {})
+        self.assertIn("cnd", graph)
+        self.assertTrue(graph.has_node("alone"))
+        self.assertFalse(graph.has_node("missing"))
+        self.assertEqual(graph.graph["generation"], "abc")
+        self.assertEqual(graph.name, "Sample")
+
+    @data(*BACKENDS)
+    def test_neighbours(self, backend):
+        """Neighbours are lists with parallel edges once
+        """
+        graph = sample_graph(backend)
+        self.assertIsInstance(graph.successors("ff"), list)
+        self.assertEqual(sorted(graph.successors("ff")), ["ff", "tpl"])
+        self.assertEqual(sorted(graph.predecessors("ff")), ["ff", "mod"])
+        self.assertEqual(graph.predecessors("tpl"), ["ff"])
+        self.assertEqual(graph.successors("alone"), [])
+        self.assertEqual(graph.in_degree("tpl"), 2)
+        self.assertEqual(graph.out_degree("ff"), 3)
+        self.assertEqual(graph.in_degree(), {"alone": 0, "cnd": 1, "ff": 2, "mod": 0, "tpl": 2})
+        self.assertEqual(graph.out_degree()["mod"], 1)
+
+    @data(*BACKENDS)
+    def test_edges(self, backend):
+        """Edges have keys for parallel edges and attributes
+        """
+        graph = sample_graph(backend)
+        self.assertEqual(graph.number_of_edges(), 5)
+        self.assertIsInstance(graph.edges(), list)
+        self.assertEqual(sorted(graph.edges()), [
+            ("ff", "ff"), ("ff", "tpl"), ("ff", "tpl"), ("mod", "ff"), ("tpl", "cnd")])
+        self.assertEqual(sorted((s, t, k, d["type"]) for s, t, k, d in
+                                graph.edges_iter("ff", keys=True, data=True)), [
+                                    ("ff", "ff", 0, "link"),
+                                    ("ff", "tpl", 0, "tile"),
+                                    ("ff", "tpl", 1, "tile")])
+        self.assertEqual(graph.edges(["mod", "missing"]), [("mod", "ff")])
+        self.assertEqual(sorted(x["name"] for x in graph.get_edge_data("ff", "tpl").values()),
+                         ["Other", "Tile"])
+        self.assertIsNone(graph.get_edge_data("tpl", "ff"))
+        self.assertEqual(graph.get_edge_data("missing", "ff", default={}), {})
+        self.assertTrue(graph.has_edge("ff", "ff"))
+        self.assertFalse(graph.has_edge("cnd", "tpl"))
+
+    @data(*BACKENDS)
+    def test_analysis(self, backend):
+        """Derived data is the same whichever backend
+        """
+        graph = sample_graph(backend)
+        self.assertEqual(cycles(graph), [["ff"]])
+        self.assertEqual([row["node"] for row in orphans(graph)], ["cnd"])
+        info = graph_info(graph)
+        self.assertIn("Name: Sample", info)
+        self.assertIn("Backend: {}".format(backend), info)
+        self.assertIn("Number of edges: 5", info)
+        self.assertIn("Average in degree:   1.0000", info)
+
+
+class GraphLayerTestCase(unittest.TestCase):
+    """Unit tests for choosing and building backends
+    """
+    def test_graph_class(self):
+        """The installed networkx decides the mutable graph
+        """
+        graph = new_graph()
+        self.assertIsInstance(graph, nx.MultiDiGraph)
+        if networkx_version() < (2,):
+            self.assertIs(graph_class(), nx.MultiDiGraph)
+        else:
+            from glow_navigator import glow_networkx
+            self.assertIs(graph_class(), glow_networkx.MultiDiGraph)
+        for name in BUILD_API:
+            self.assertTrue(hasattr(graph, name), name)
+
+    def test_node_dict(self):
+        """A new node keeps its dict and later adds update it
+        """
+        graph = new_graph()
+        attrs = {"type": "property"}
+        graph.add_node("prop", attrs)
+        attrs["type"] = "command"
+        graph.add_node("prop", {"name": "Prop"}, entity="Entity")
+        self.assertEqual(graph.node["prop"],
+                         {"type": "command", "name": "Prop", "entity": "Entity"})
+        graph.add_edge("prop", "other", attr_dict=attrs)
+        attrs["type"] = "changed"
+        self.assertEqual(graph.get_edge_data("prop", "other")[0]["type"], "command")
+
+    def test_unknown_backend(self):
+        """Only known backends are accepted
+        """
+        with self.assertRaises(ValueError):
+            convert_graph(new_graph(), "missing")
+
+    def test_empty(self):
+        """Empty graphs have no averages
+        """
+        self.assertNotIn("Average", graph_info(new_graph()))
+
+if __name__ == "__main__":
+    unittest.main()
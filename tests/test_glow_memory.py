@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Memory Unit Tests
+"""
+
+import sys
+import unittest
+
+from glow_navigator.glow_memory import deep_size, memory_report
+from graph_base import add_tiles, small_graph
+
+
+class MemoryTestCase(unittest.TestCase):
+    """Unit tests for accounting for the memory of the graph
+    """
+    def setUp(self):
+        self.graph = small_graph(name="Memory")
+        add_tiles(self.graph, "Tile", "Tile")
+
+    def tearDown(self):
+        self.graph = None
+
+    def test_deep_size(self):
+        """Shared objects are only counted once
+        """
+        item = ["".join(["a", "b"])]
+        seen = set()
+        size = deep_size([item, item], seen)
+        self.assertEqual(size, sys.getsizeof([item, item]) + sys.getsizeof(item)
+                         + sys.getsizeof(item[0]))
+        self.assertEqual(deep_size(item, seen), 0)
+
+    def test_report(self):
+        """Memory is broken down by node type, link type and key
+        """
+        report = memory_report(self.graph)
+        self.assertEqual(sorted(report["nodes"]), ["formflow", "module", "template"])
+        self.assertEqual(report["nodes"]["module"]["count"], 1)
+        self.assertEqual(report["edges"]["tile"]["count"], 2)
+        self.assertEqual(report["edges"]["module"]["count"], 1)
+        self.assertIn("link_type", report["keys"])
+        self.assertGreater(report["structure"], 0)
+        self.assertIn("name", report["derived"])
+        self.assertGreater(report["peak_rss"], report["bytes"])
+        self.assertEqual(report["bytes"], sum(
+            [x["bytes"] for x in report["nodes"].values()]
+            + [x["bytes"] for x in report["edges"].values()]
+            + [report["structure"]] + report["derived"].values()))
+
+    def test_duplication(self):
+        """Equal edge dicts and strings held twice are found
+        """
+        report = memory_report(self.graph)
+        self.assertEqual(report["edge_dicts"]["dicts"], 4)
+        self.assertEqual(report["edge_dicts"]["distinct"], 3)
+        self.assertEqual(report["edge_dicts"]["duplicates"], 1)
+        self.assertGreater(report["edge_dicts"]["savings"], 0)
+        copied = "".join(["Tem", "plate"])
+        self.graph.node["mod"]["template"] = copied
+        strings = memory_report(self.graph)["strings"]
+        self.assertIn("Template", [x["value"] for x in strings["top"]])
+        self.assertEqual(strings["savings"], sum(x["savings"] for x in strings["top"]))
+
+if __name__ == "__main__":
+    unittest.main()
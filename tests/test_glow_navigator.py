@@ -5,17 +5,34 @@
 """Glow Navigator Unit Tests
 """
 
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
 from ddt import ddt, data, unpack
 
+from glow_navigator.glow_graph import new_graph
 from glow_navigator.glow_utils import (
     flatten,
-    load_yaml_file)
+    load_yaml_file,
+    save_object_to_file)
 from glow_navigator.glow_navigator import (
     BusinessTestParser,
+    CacheLoader,
     GlowObject,
+    GlowSession,
+    GraphBuild,
+    glow_object_class,
+    save_graph,
     settings,
+    share_attributes,
+    TEMPLATE_ELEMENTS,
+    WORKFLOW_ACTIVITIES,
     XMLParser)
+from graph_base import GraphBase
 
 
 class YAMLBase(unittest.TestCase):
@@ -72,6 +89,26 @@ class YAMLTestCase(YAMLBase):
         """
         self.assertEqual(self.formflow.map(), result)
 
+    def test_object_class(self):
+        """Each object type has one slotted class with field properties
+        """
+        cls = glow_object_class(settings["formflow"])
+        self.assertIs(type(self.formflow), cls)
+        self.assertIs(glow_object_class(settings["formflow"]), cls)
+        self.assertTrue(issubclass(cls, GlowObject))
+        self.assertIsInstance(cls.guid, property)
+        self.assertFalse(hasattr(self.formflow, "__dict__"))
+        self.assertEqual(self.formflow.fields, settings["formflow"]["fields"])
+
+    def test_set_field(self):
+        """Setting a field sets the value it is mapped to
+        """
+        self.formflow.name = "Renamed"
+        self.assertEqual(self.formflow_data["VM_Name"], "Renamed")
+        self.assertEqual(self.formflow.map()["name"], "Renamed")
+        self.formflow_data["VM_PK"] = "UPPER"
+        self.assertEqual(self.formflow.guid, "upper")
+
 @ddt
 class NonYAMLTestCase(unittest.TestCase):
     """Unit tests for code not dependent on YAML
@@ -111,6 +148,30 @@ class NonYAMLTestCase(unittest.TestCase):
         target = list(parser.iterfind("ConditionalIfActivity"))
         self.assertEqual(target, result)
 
+    def test_scan_at_start(self):
+        """Elements are given as they start, before the XML is read
+        """
+        xml = ('<form><ConditionalIfActivity DisplayName="If" SelectedCondition="c" />'
+               '<ConditionalIfActivity SelectedCondition="{x:Null}" /><control')
+        scan = XMLParser().scan(xml, ("ConditionalIfActivity",))
+        tag, attrib, found = next(scan)
+        self.assertEqual(tag, "ConditionalIfActivity")
+        self.assertEqual(attrib["SelectedCondition"], "c")
+        self.assertEqual(found["condition"], "c")
+        self.assertEqual(next(scan)[2], None)
+        self.assertRaises(SyntaxError, next, scan)
+
+    def test_scan_nested(self):
+        """Elements made from their children are given once they end
+        """
+        xml = ('<form><control code="TIL"><placeholder name="Text" value="Tile" />'
+               '</control><broken>')
+        scan = XMLParser().scan(xml, ("control", "placeholder"))
+        self.assertEqual([next(scan)[::2], next(scan)[::2]], [
+            ("control", {"name": "Tile"}),
+            ("placeholder", {"name": "Tile"})])
+        self.assertRaises(SyntaxError, next, scan)
+
     @data(("template", ["Foo", "Baz"]),
           ("formflow", ["Bar"]))
     @unpack
@@ -137,6 +198,53 @@ class TemplateBase(unittest.TestCase):
         self.data_parser = None
         self.dep_parser = None
 
+class TemplateScanCase(TemplateBase):
+    """Unit tests for streaming the template XML
+    """
+    def test_same_as_tree(self):
+        """Streaming finds what the whole tree does
+        """
+        parser = XMLParser(self.template.data, TEMPLATE_ELEMENTS)
+        for tag, code in (("control", "TIL"), ("control", "SIM"), ("control", "SRL"),
+                          ("form", None), ("placeholder", None)):
+            self.assertEqual(list(parser.iterfind(tag, code)),
+                             list(self.data_parser.iterfind(tag, code)))
+        self.assertEqual(list(parser.iteritems("control")),
+                         list(self.data_parser.iteritems("control")))
+        self.assertEqual(parser.properties_by_name("caption"),
+                         self.data_parser.properties_by_name("caption"))
+        self.assertIsNone(parser.tree)
+
+    def test_cleared_elements(self):
+        """Elements dropped as the XML is read leave results unchanged
+        """
+        import copy
+        given = []
+        for found in XMLParser().scan(self.template.data, TEMPLATE_ELEMENTS):
+            given.append(copy.deepcopy(found))
+        self.assertEqual(list(XMLParser(self.template.data, TEMPLATE_ELEMENTS).elements), given)
+        self.assertEqual(len(given), len(list(self.data_parser.iteritems("control")))
+                         + len(list(self.data_parser.iteritems("form")))
+                         + len(list(self.data_parser.iteritems("placeholder"))))
+
+    def test_copies(self):
+        """Changes to found data do not change later searches
+        """
+        parser = XMLParser(self.template.data, TEMPLATE_ELEMENTS)
+        for tile in parser.iterfind("control", "TIL"):
+            tile["type"] = "tile"
+        self.assertNotIn("type", next(parser.iterfind("control", "TIL")))
+
+    def test_release(self):
+        """A released payload is returned and no longer held
+        """
+        field = self.template.fields["data"]
+        xml = self.template_data[field]
+        self.assertEqual(self.template.release("data"), xml)
+        self.assertNotIn(field, self.template_data)
+        self.assertIsNone(self.template.data)
+        self.assertIsNone(self.template.release("data"))
+
 @ddt
 class TestTemplateControlsCase(TemplateBase):
     """Unit tests requiring full template
@@ -288,5 +396,304 @@ class TestFormflowFullCase(FormflowBase):
         commands = [d["command"] for d in target if d and "command" in d]
         self.assertEqual(commands, result)
 
+    @data(*WORKFLOW_ACTIVITIES)
+    def test_streamed_activities(self, tag):
+        """Streaming the workflow finds what the whole tree does
+        """
+        parser = XMLParser(self.formflow.data, WORKFLOW_ACTIVITIES)
+        self.assertEqual(list(parser.iterfind(tag)), list(self.data_parser.iterfind(tag)))
+
+@ddt
+class GraphBuildTestCase(unittest.TestCase):
+    """Unit tests for per build lookups
+    """
+    def setUp(self):
+        self.build = GraphBuild()
+        self.build.add_command("Close", "IJob")
+        self.build.add_command("Close", "IOrder")
+
+    def tearDown(self):
+        self.build = None
+
+    @data(("Close", "IOrder", "IOrder"),
+          ("Close", "IShipment", "IJob"),
+          ("Open", "IShipment", "IShipment"))
+    @unpack
+    def test_command_entity(self, command, entity, result):
+        """Commands are inherited from the first entity defining them
+        """
+        self.assertEqual(self.build.command_entity(command, entity), result)
+
+    def test_separate_builds(self):
+        """Each build has its own lookups
+        """
+        self.assertEqual(GraphBuild().commands, {})
+
+    @data((["a.yaml", "b.yaml"], {"Step 1": "tpl-b", "a.yaml": "tpl-a", "b.yaml": "tpl-b"}),
+          (["b.yaml", "a.yaml"], {"Step 1": "tpl-a", "a.yaml": "tpl-a", "b.yaml": "tpl-b"}),
+          (["a.yaml"], {"Step 1": "tpl-a", "a.yaml": "tpl-a"}),
+          ([], {}))
+    @unpack
+    def test_resolve(self, keys, result):
+        """A name added by several sources refers to the last in order
+        """
+        for source, node in (("a.yaml", "tpl-a"), ("b.yaml", "tpl-b")):
+            self.build.names[source] = []
+            self.build.source = source
+            self.build.add_name("formsteps", "Step 1", node)
+            self.build.add_name("formsteps", source, node)
+        self.build.resolve(keys)
+        self.assertEqual(self.build.formsteps, result)
+
+@ddt
+class GlowSessionTestCase(GraphBase):
+    """Unit tests for sessions sharing one graph
+    """
+    def test_shared_graph(self):
+        """Searching and expanding leave the shared node dicts unchanged
+        """
+        session = GlowSession(self.graph)
+        nodes = session.select("Formflow")
+        self.assertEqual(nodes[0][1]["counts"], "1<1")
+        entries = list(session.counted_entries("ff", self.graph.successors))
+        self.assertEqual(entries[0][2]["counts"], "1<0")
+        self.assertEqual(self.graph.node["ff"], {"name": "Formflow", "type": "formflow"})
+        self.assertNotIn("counts", self.graph.node["tpl"])
+
+    @data(("$$max_level=0", "max_level", 0),
+          ("$$ignore=foo bar", "ignore_types", ["foo", "bar"]),
+          ("$$links=show form task, module", "link_types", ["show form task", "module"]),
+          ("$$edges=True", "edge_match", True),
+          ("$$minimal=False", "minimal_display", False))
+    @unpack
+    def test_special_command(self, query, attr, result):
+        """Special commands change the session settings
+        """
+        session = GlowSession(self.graph)
+        self.assertTrue(session.special_command(query))
+        self.assertEqual(getattr(session, attr), result)
+        self.assertNotEqual(getattr(GlowSession(self.graph), attr), result)
+
+    def test_invalid_max_level(self):
+        """Invalid max level is ignored
+        """
+        session = GlowSession(self.graph, max_level=3)
+        self.assertTrue(session.special_command("$$max_level=foo"))
+        self.assertEqual(session.max_level, 3)
+
+    def test_not_special_command(self):
+        """Ordinary queries are not special commands
+        """
+        self.assertFalse(GlowSession(self.graph).special_command("foo"))
+
+    def test_separate_settings(self):
+        """Sessions on one graph have their own settings
+        """
+        shallow = GlowSession(self.graph)
+        deep = GlowSession(self.graph, max_level=0)
+        ignoring = GlowSession(self.graph, ignore_types=["formflow"])
+        self.assertEqual(len(list(shallow.entries("mod", self.graph.successors))), 1)
+        self.assertEqual(len(list(deep.entries("mod", self.graph.successors))), 2)
+        self.assertEqual(len(ignoring.select("Formflow")), 0)
+        self.assertEqual(len(shallow.select("Formflow")), 1)
+
+@ddt
+class GraphCacheTestCase(unittest.TestCase):
+    """Unit tests for saving and loading the graph cache
+    """
+    def setUp(self):
+        self.graph = new_graph(name="Test", generation="abc")
+        self.graph.add_node("mod", {"name": "Module", "type": "module"})
+        self.graph.add_node("ff", {"name": "Formflow", "type": "formflow"})
+        self.graph.add_node("cnd")
+        self.graph.add_edge("mod", "ff", attr_dict={"type": "link", "link_type": "module"})
+        self.graph.add_edge("mod", "ff", attr_dict={"type": "tile", "name": "Tile"})
+        self.graph.add_edge("ff", "cnd", attr_dict={"type": "link", "link_type": "condition"})
+        self.folder = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.folder, "glow_graph.pickle")
+
+    def tearDown(self):
+        self.graph = None
+        shutil.rmtree(self.folder)
+
+    @data(1, 2, 1000)
+    def test_round_trip(self, chunk):
+        """The loaded graph matches the saved graph
+        """
+        import glow_navigator.glow_navigator as navigator
+        navigator.CACHE_CHUNK, chunk = chunk, navigator.CACHE_CHUNK
+        try:
+            save_graph(self.graph, self.file_name)
+        finally:
+            navigator.CACHE_CHUNK = chunk
+        loader = CacheLoader(self.file_name)
+        loader.done.wait(5)
+        self.assertEqual(loader.nodes["mod"], {"name": "Module", "type": "module"})
+        graph = loader.wait()
+        self.assertEqual(graph.graph, {"name": "Test", "generation": "abc"})
+        self.assertEqual(dict(graph.nodes(data=True)), dict(self.graph.nodes(data=True)))
+        self.assertEqual(sorted(graph.edges(data=True)), sorted(self.graph.edges(data=True)))
+        self.assertEqual(graph.predecessors("cnd"), ["ff"])
+        self.assertIs(graph.pred["ff"]["mod"], graph.succ["mod"]["ff"])
+
+    def test_wait_releases_graph(self):
+        """The loader no longer holds the graph once it is returned
+        """
+        save_graph(self.graph, self.file_name)
+        loader = CacheLoader(self.file_name)
+        graph = loader.wait()
+        self.assertEqual(graph.number_of_nodes(), 3)
+        self.assertIsNone(loader.graph)
+        self.assertEqual(loader.nodes, {})
+
+    def test_navigate_releases_loader(self):
+        """The loader holds no graph after the first full query
+        """
+        save_graph(self.graph, self.file_name)
+        script = ("import atexit; import glow_navigator.glow_navigator as navigator; "
+                  "loaders = []; start = navigator.CacheLoader.__init__; "
+                  "navigator.CacheLoader.__init__ = lambda self, file_name: "
+                  "loaders.append(self) or start(self, file_name); "
+                  "atexit.register(lambda: navigator.sys.stdout.write("
+                  "'held: {} {}'.format(loaders[0].graph, loaders[0].nodes))); "
+                  "navigator.navigate()")
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        process = subprocess.Popen([sys.executable, "-c", script], cwd=self.folder, env=env,
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT)
+        output = process.communicate(b"Formflow\n")[0]
+        self.assertIn(b"Number of nodes: 3", output)
+        self.assertIn(b"held: None {}", output)
+
+    def test_shared_attributes(self):
+        """Equal edges share a read only record that survives the cache
+        """
+        self.graph.add_edge("cnd", "".join(["m", "od"]),
+                            attr_dict={"type": "link", "link_type": "module"})
+        self.assertEqual(share_attributes(self.graph), (4, 3))
+        module = self.graph.succ["mod"]["ff"][0]
+        self.assertIs(self.graph.succ["cnd"]["mod"][0], module)
+        self.assertRaises(TypeError, module.update, {"name": "Module"})
+        self.assertIs([x for x in self.graph.succ["cnd"]][0],
+                      [x for x in self.graph.node if x == "mod"][0])
+        save_graph(self.graph, self.file_name)
+        graph = CacheLoader(self.file_name).wait()
+        self.assertIs(graph.succ["cnd"]["mod"][0], graph.succ["mod"]["ff"][0])
+        self.assertEqual(sorted(graph.edges(data=True)), sorted(self.graph.edges(data=True)))
+
+    def test_whole_graph_cache(self):
+        """Caches saved as a single graph still load
+        """
+        save_object_to_file(self.graph, self.file_name)
+        graph = CacheLoader(self.file_name).wait()
+        self.assertEqual(sorted(graph.edges()), sorted(self.graph.edges()))
+
+    def test_missing_cache(self):
+        """Errors loading are raised when waiting
+        """
+        self.assertRaises(IOError, CacheLoader(self.file_name).wait)
+
+    @data(0, 0.5, 0.99)
+    def test_incomplete_cache(self, fraction):
+        """Caches cut short raise an error rather than load in part
+        """
+        save_graph(self.graph, self.file_name)
+        with open(self.file_name, "rb+") as f:
+            f.truncate(int(os.path.getsize(self.file_name) * fraction))
+        loader = CacheLoader(self.file_name)
+        self.assertRaises(ValueError, loader.wait)
+        self.assertIsNone(loader.graph)
+
+    @data(("navigator.load_graph()", b""),
+          ("navigator.navigate()", b"Formflow\nModule\n"))
+    @unpack
+    def test_truncated_cache(self, call, queries):
+        """A cache that cannot be loaded is built afresh once
+        """
+        save_graph(self.graph, self.file_name)
+        with open(self.file_name, "rb+") as f:
+            f.truncate(os.path.getsize(self.file_name) // 2)
+        script = "import glow_navigator.glow_navigator as navigator; " + call
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        process = subprocess.Popen([sys.executable, "-c", script], cwd=self.folder, env=env,
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT)
+        output = process.communicate(queries)[0]
+        self.assertEqual(output.count(b"-> Error"), 1, output)
+        self.assertIn(b"cannot load cache", output)
+        self.assertIn(b"Graph completed", output)
+        graph = CacheLoader(self.file_name).wait()
+        self.assertNotEqual(graph.graph["generation"], "abc")
+
+    def test_cancel(self):
+        """A cancelled load stops before the graph is assembled
+        """
+        import glow_navigator.glow_navigator as navigator
+        save_graph(self.graph, self.file_name)
+        started = threading.Event()
+        created = threading.Event()
+        load = navigator.load_objects_from_file
+
+        def slow_load(file_name):
+            """Wait after the nodes until the load is cancelled
+            """
+            parts = load(file_name)
+            yield next(parts)
+            started.set()
+            created.wait(5)
+            loader.cancelled.wait()
+            for part in parts:
+                yield part
+
+        navigator.load_objects_from_file = slow_load
+        try:
+            loader = CacheLoader(self.file_name)
+            created.set()
+            started.wait(5)
+            loader.cancel()
+        finally:
+            navigator.load_objects_from_file = load
+        self.assertIsNone(loader.graph)
+        self.assertRaises(ValueError, loader.wait)
+
+    def test_regen_while_loading(self):
+        """$$regen during loading replaces the cache whole
+        """
+        save_graph(self.graph, self.file_name)
+        script = ("import time; import glow_navigator.glow_navigator as navigator; "
+                  "load = navigator.load_objects_from_file; "
+                  "navigator.load_objects_from_file = lambda file_name: "
+                  "(time.sleep(0.5) or part for part in load(file_name)); "
+                  "navigator.navigate()")
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        process = subprocess.Popen([sys.executable, "-c", script], cwd=self.folder, env=env,
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT)
+        output = process.communicate(b"$$regen\n")[0]
+        self.assertIn(b"Loading graph from cache", output)
+        self.assertIn(b"Graph completed", output)
+        self.assertNotIn(b"Error", output)
+        graph = CacheLoader(self.file_name).wait()
+        self.assertEqual(graph.number_of_nodes(), 0)
+        self.assertNotEqual(graph.graph["generation"], "abc")
+        self.assertEqual(sorted(os.listdir(self.folder)),
+                         ["glow_build.json", "glow_graph.pickle"])
+
+@ddt
+class ImportTestCase(unittest.TestCase):
+    """Unit tests for the cost of importing the package
+    """
+    @data("glow_navigator.glow_navigator", "glow_navigator.glow_server",
+          "glow_navigator.glow_batch")
+    def test_no_heavy_imports(self, module):
+        """Importing does not load heavy libraries or settings
+        """
+        script = ("import sys, {0}; from glow_navigator.glow_config import settings; "
+                  "print(' '.join(sorted(set(sys.modules) & set(['networkx', 'click', "
+                  "'yaml', 'colorama', 'readline', 'xml.etree']))) or "
+                  "settings.values is not None)").format(module)
+        output = subprocess.check_output([sys.executable, "-c", script])
+        self.assertEqual(output.strip(), b"False")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Profile Unit Tests
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from glow_navigator.glow_navigator import GlowSession
+from glow_navigator.glow_profile import PROFILE_CATEGORIES, profile_categories
+from graph_base import add_tiles, small_graph
+
+
+class ProfileTestCase(unittest.TestCase):
+    """Unit tests for profiling interactive commands
+    """
+    def setUp(self):
+        self.graph = small_graph(name="Profile")
+        add_tiles(self.graph, "Tile", "Other")
+        self.session = GlowSession(self.graph)
+        self.folder = tempfile.mkdtemp()
+        self.stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+
+    def tearDown(self):
+        sys.stdout.close()
+        sys.stdout = self.stdout
+        shutil.rmtree(self.folder)
+
+    def run_command(self, query):
+        """Select and show nodes as the navigator does
+        """
+        with self.session.profiled(query):
+            if not self.session.special_command(query):
+                nodes = self.session.select(query)
+                self.session.print_selected_node(0, nodes)
+
+    def test_off(self):
+        """Commands are not profiled until $$profile=True
+        """
+        self.run_command("Formflow")
+        self.assertIsNone(self.session.profile)
+        self.session.special_command("$$profile=True")
+        self.assertTrue(self.session.profiling)
+        self.assertEqual(len(self.session.profile.commands), 0)
+
+    def test_breakdown(self):
+        """Time is split into categories and touched objects counted
+        """
+        stdout = sys.stdout
+        self.run_command("$$profile=True")
+        self.run_command("Formflow")
+        profile = self.session.profile.commands[-1]
+        self.assertEqual(profile["command"], "Formflow")
+        self.assertEqual(sorted(profile["categories"]), sorted(PROFILE_CATEGORIES))
+        for category in ("serialize", "regex", "traversal", "colorize", "output"):
+            self.assertGreater(profile["categories"][category], 0, category)
+        self.assertAlmostEqual(sum(profile["categories"].values()), profile["seconds"], 2)
+        # three nodes scanned and both neighbours expanded
+        self.assertEqual(profile["nodes"], 5)
+        self.assertEqual(profile["edges"], 2)
+        # nothing of the navigator is replaced while profiling
+        self.assertIs(sys.stdout, stdout)
+        self.assertIsNone(sys.getprofile())
+
+    def test_error(self):
+        """A failing command is still profiled and the profiler stopped
+        """
+        self.run_command("$$profile=True")
+        with self.assertRaises(ValueError):
+            with self.session.profiled("Broken"):
+                self.session.select("Formflow")
+                raise ValueError("broken")
+        self.assertEqual(self.session.profile.commands[-1]["command"], "Broken")
+        self.assertIsNone(sys.getprofile())
+
+    def test_categories(self):
+        """Time of functions without a category goes to their callers
+        """
+        serialize = ("glow_utils.py", 1, "serialize")
+        match = ("glow_utils.py", 2, "match")
+        search = ("re.py", 3, "search")
+        root = ("glow_batch.py", 4, "run_batch")
+        stats = {
+            root:      (1, 1, 0.5, 4.0, {}),
+            match:     (2, 2, 0.5, 3.5, {root: (2, 2, 0.5, 3.5)}),
+            serialize: (2, 2, 1.0, 1.0, {match: (2, 2, 1.0, 1.0)}),
+            search:    (3, 3, 2.0, 2.0, {match: (2, 2, 1.5, 1.5), root: (1, 1, 0.5, 0.5)})}
+        categories = profile_categories(stats)
+        self.assertEqual(categories["regex"], 2.0)
+        self.assertEqual(categories["serialize"], 1.0)
+        self.assertEqual(categories["other"], 1.0)
+
+    def test_summary(self):
+        """The summary covers the recent commands and can be saved
+        """
+        self.run_command("$$profile=True")
+        for query in ("Formflow", "Template", "Module"):
+            self.run_command(query)
+        self.run_command("$$profile=False")
+        self.run_command("Template")
+        summary = self.session.profile.summary()
+        self.assertEqual(summary["commands"], 3)
+        self.assertEqual(len(summary["slowest"]), 3)
+        file_name = os.path.join(self.folder, "profile.json")
+        self.run_command("$$profile={}".format(file_name))
+        with open(file_name) as f:
+            saved = json.load(f)
+        self.assertEqual(saved["summary"]["commands"], 3)
+        self.assertEqual([x["command"] for x in saved["commands"]],
+                         ["Formflow", "Template", "Module"])
+
+if __name__ == "__main__":
+    unittest.main()
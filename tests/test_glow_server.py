@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Server Unit Tests
+"""
+
+import json
+import threading
+import unittest
+import urllib2
+from ddt import ddt, data, unpack
+
+from glow_navigator.glow_http import QueryHTTPServer, parse_request
+from glow_navigator.glow_server import connect, handle_request
+from graph_base import GraphBase
+
+
+@ddt
+class RequestTestCase(GraphBase):
+    """Unit tests for answering client requests
+    """
+    def setUp(self):
+        super(RequestTestCase, self).setUp()
+        self.graph.add_edge("ff", "cnd", attr_dict={"type": "link",
+                                                    "link_type": "conditional task"})
+
+    @data(("form", {}, ["ff"]),
+          ("type: (module|template)", {}, ["mod", "tpl"]),
+          ("m", {"ignore_types": ["formflow", "template"]}, ["mod"]))
+    @unpack
+    def test_select(self, query, options, result):
+        """Selects matching nodes with the client options
+        """
+        request = {"command": "select", "query": query, "options": options}
+        response = handle_request(self.graph, request)
+        self.assertEqual(sorted(node for node, _ in response["nodes"]), result)
+
+    @data(({}, 1, [1, 1]),
+          ({"max_level": 0}, 1, [1, 1]),
+          ({"link_types": ["show form task"]}, 0, [1]))
+    @unpack
+    def test_node(self, options, parents, levels):
+        """Returns node detail with parent and child entries
+        """
+        request = {"command": "node", "node": "ff", "options": options}
+        response = handle_request(self.graph, request)
+        self.assertEqual(response["node"]["counts"], "1<2")
+        self.assertEqual(len(response["parents"]), parents)
+        self.assertEqual([entry[0] for entry in response["children"]], levels)
+
+    def test_deep_node(self):
+        """Expands all levels when max level is zero
+        """
+        request = {"command": "node", "node": "mod", "options": {"max_level": 0}}
+        response = handle_request(self.graph, request)
+        self.assertEqual(sorted(entry[1] for entry in response["children"]),
+                         ["cnd", "ff", "tpl"])
+
+    @data(("parents", "tpl", ["ff"]),
+          ("children", "mod", ["ff"]))
+    @unpack
+    def test_neighbours(self, command, node, result):
+        """Returns parent or child entries only
+        """
+        request = {"command": command, "node": node}
+        response = handle_request(self.graph, request)
+        self.assertEqual([entry[1] for entry in response[command]], result)
+
+    @data(("parents", "ff", "0<1"),
+          ("children", "mod", "1<2"),
+          ("node", "tpl", "1<2"))
+    @unpack
+    def test_neighbour_counts(self, command, node, counts):
+        """Neighbour entries carry counts as the navigator shows them
+        """
+        request = {"command": command, "node": node}
+        response = handle_request(self.graph, request)
+        key = "parents" if command == "node" else command
+        self.assertEqual(response[key][0][2]["counts"], counts)
+
+    @data(({"source": "mod", "target": "tpl"}, [["mod", "ff", "tpl"]]),
+          ({"source": "mod", "target": "tpl", "cutoff": 1}, []),
+          ({"source": "tpl", "target": "mod"}, []))
+    @unpack
+    def test_paths(self, request, result):
+        """Returns the paths between two nodes
+        """
+        request = dict(request, command="paths")
+        self.assertEqual(handle_request(self.graph, request)["paths"], result)
+
+    @data({"command": "select", "query": "(bad"},
+          {"command": "paths", "source": "mod", "target": "foo"},
+          {"command": "node", "node": "foo"},
+          {"command": "foo"})
+    def test_errors(self, request):
+        """Bad requests are answered with an error
+        """
+        self.assertIn("error", handle_request(self.graph, request))
+
+    def test_json_response(self):
+        """Responses can be sent as JSON
+        """
+        request = {"command": "node", "node": "ff"}
+        response = json.loads(json.dumps(handle_request(self.graph, request)))
+        self.assertEqual(response["children"][0][0], 1)
+
+    def test_no_server(self):
+        """Connecting without a running server exits cleanly
+        """
+        with self.assertRaises(SystemExit):
+            connect("/nonexistent/glow.sock", None)
+
+@ddt
+class HTTPRequestTestCase(unittest.TestCase):
+    """Unit tests for mapping URLs to requests
+    """
+    @data(("/select?q=foo&ignore=a,b", "select", "query", "foo"),
+          ("/node?id=foo%20bar&depth=2", "node", "node", "foo bar"),
+          ("/paths?source=a&target=b&cutoff=3", "paths", "cutoff", "3"))
+    @unpack
+    def test_parse_request(self, path, command, key, value):
+        """URL path and parameters become a request
+        """
+        request = parse_request(path)
+        self.assertEqual(request["command"], command)
+        self.assertEqual(request[key], value)
+
+    def test_parse_options(self):
+        """URL parameters become the traversal options
+        """
+        options = parse_request("/children?id=a&depth=0&links=x, y&edges=True")["options"]
+        self.assertEqual(options, {"ignore_types": [], "link_types": ["x", "y"],
+                                   "edge_match": True, "max_level": 0})
+
+@ddt
+class HTTPServerTestCase(GraphBase):
+    """Unit tests for answering over HTTP
+    """
+    def setUp(self):
+        super(HTTPServerTestCase, self).setUp()
+        self.server = QueryHTTPServer(("127.0.0.1", 0), self.graph)
+        thread = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super(HTTPServerTestCase, self).tearDown()
+
+    def get(self, path):
+        """Return the status and JSON body for a path
+        """
+        url = "http://127.0.0.1:{}{}".format(self.server.server_address[1], path)
+        try:
+            response = urllib2.urlopen(url, timeout=5)
+        except urllib2.HTTPError as err_msg:
+            response = err_msg
+        return response.getcode(), json.loads(response.read())
+
+    def test_answer(self):
+        """Queries are answered with JSON
+        """
+        status, body = self.get("/parents?id=tpl")
+        self.assertEqual(status, 200)
+        self.assertEqual([entry[1] for entry in body["parents"]], ["ff"])
+        self.assertIn("/parents?id=tpl", self.server.cache)
+
+    @data("/select?q=(bad", "/select?q=a{2,1}", "/node?id=ff&depth=deep", "/foo")
+    def test_bad_request(self, path):
+        """Invalid requests and regex are answered with 400
+        """
+        status, body = self.get(path)
+        self.assertEqual(status, 400)
+        self.assertIn("error", body)
+        self.assertEqual(self.server.cache, {})
+
+    def test_unexpected_error(self):
+        """Other errors are answered with 500 and not cached
+        """
+        self.server.graph = None
+        status, body = self.get("/info")
+        self.assertEqual(status, 500)
+        self.assertIn("error", body)
+        self.server.graph = self.graph
+        self.assertEqual(self.get("/info"), (200, {"nodes": 3, "edges": 2}))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,19 +5,25 @@
 """Glow Navigator Utils Unit Tests
 """
 
+import os
+import shutil
+import tempfile
 import unittest
 from ddt import ddt, data, unpack
 
 from glow_navigator.glow_utils import (
+    FrozenRecord,
     base_name,
     coloring,
+    file_digest,
     full_guid,
     glow_file_object,
     invalid_regex,
     load_yaml_file,
     match,
     raw_guid,
-    serialize)
+    serialize,
+    shared_dict)
 
 
 class YAMLBase(unittest.TestCase):
@@ -141,5 +147,62 @@ class GlowUtilTestCase(unittest.TestCase):
         """
         self.assertEqual(glow_file_object(first), second)
 
+class FileDigestTestCase(unittest.TestCase):
+    """Unit tests for the digests of source files
+    """
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.yaml_file = os.path.join(self.folder, "a.yaml")
+        with open(self.yaml_file, "w") as f:
+            f.write("name: Alpha\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_changed_contents(self):
+        """Only a change to the contents changes the digest
+        """
+        digest = file_digest(self.yaml_file)
+        self.assertEqual(digest, "8efd3050f0a0a4b218d89fe98928d10818e59763")
+        os.utime(self.yaml_file, (0, 0))
+        self.assertEqual(file_digest(self.yaml_file), digest)
+        with open(self.yaml_file, "w") as f:
+            f.write("name: Alpha Beta\n")
+        self.assertNotEqual(file_digest(self.yaml_file), digest)
+
+class SharedRecordTestCase(unittest.TestCase):
+    """Unit tests for shared attribute records
+    """
+    def test_read_only(self):
+        """Records refuse changes
+        """
+        record = FrozenRecord({"type": "link"})
+        self.assertRaises(TypeError, record.__setitem__, "type", "tile")
+        self.assertRaises(TypeError, record.update, {"type": "tile"})
+        self.assertRaises(TypeError, record.pop, "type")
+        self.assertEqual(record, {"type": "link"})
+
+    def test_copies(self):
+        """Records pickle and copy as records with the same contents
+        """
+        import copy
+        import cPickle
+        record = FrozenRecord({"type": "link"})
+        for other in (cPickle.loads(cPickle.dumps([record, record], 2)),
+                      copy.deepcopy([record, record])):
+            self.assertIsInstance(other[0], FrozenRecord)
+            self.assertEqual(other[0], record)
+            self.assertIs(other[0], other[1])
+
+    def test_shared_strings(self):
+        """Equal strings become one string of the same type
+        """
+        strings = {}
+        first = shared_dict(strings, {"name": "".join(["Tem", "plate"]), "level": 1})
+        second = shared_dict(strings, {"name": "".join(["Tem", "plate"]), "title": u"Template"})
+        self.assertIs(first["name"], second["name"])
+        self.assertIsInstance(second["title"], unicode)
+        self.assertEqual(first["level"], 1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=no-name-in-module
+
+"""Glow Navigator Synthetic Source Unit Tests
+"""
+
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from benchmarks.synthetic import generate_tree
+from glow_navigator.glow_analysis import impact_analysis, orphans
+from glow_navigator.glow_navigator import GraphBuild, create_graph, settings, update_graph
+
+
+class SyntheticTestCase(unittest.TestCase):
+    """Unit tests for building the graph from a synthetic tree
+    """
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.counts = generate_tree(self.folder, 100)
+        self.cwd = os.getcwd()
+        os.chdir(self.folder)
+        self.stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+
+    def tearDown(self):
+        sys.stdout.close()
+        sys.stdout = self.stdout
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder)
+
+    def test_build(self):
+        """Every type of object is added and phases are timed
+        """
+        build = GraphBuild()
+        graph = create_graph(cache_file=None, build=build)
+        types = set(node_data.get("type") for _, node_data in graph.nodes_iter(data=True))
+        for kind in ("entity", "property", "command", "condition", "formflow",
+                     "template", "module", "image", "sound", "test", "index"):
+            self.assertIn(kind, types)
+        self.assertEqual(sum(phase["items"] for phase in build.phases
+                             if phase["phase"].startswith(("Loading", "Analysing"))),
+                         sum(self.counts.values()))
+        self.assertTrue(orphans(graph))
+
+    def test_impact(self):
+        """Index files give their index nodes, deleted files their old nodes
+        """
+        graph = create_graph(cache_file=None)
+        sources = graph.graph["sources"]
+        self.assertEqual(len(sources), sum(self.counts.values()))
+        index_file = next(x for x in sorted(sources) if "/Index/" in x)
+        template_file = next(x for x in sorted(sources) if "/BPMForm/" in x)
+        os.remove(template_file)
+        changed, groups = impact_analysis(graph, [index_file, template_file])
+        self.assertEqual(changed, set(sources[index_file] + sources[template_file]))
+        self.assertTrue(all(graph.node[x]["type"] == "index" for x in sources[index_file]))
+        self.assertTrue(groups)
+
+    def test_update(self):
+        """Updating with changed files gives the graph a full build does
+        """
+        graph = create_graph(cache_file=None)
+        sources = graph.graph["sources"]
+        self.assertEqual(update_graph(graph), [])
+        condition_file = next(x for x in sorted(sources) if "/Conditions/" in x)
+        template_file = next(x for x in sorted(sources) if "/BPMForm/" in x)
+        test_file = next(x for x in sorted(sources) if x.endswith(".feature"))
+        os.remove(condition_file)
+        with open(template_file, "a") as f:
+            f.write("# changed\n")
+        with open(test_file, "a") as f:
+            f.write("    Given I am on the Missing Template form\n")
+        build = GraphBuild()
+        self.assertEqual(update_graph(graph, build),
+                         sorted([condition_file, template_file, test_file]))
+        self.assertEqual(build.report()["phases"][0]["files"], 1)
+        full = create_graph(cache_file=None)
+        self.assertEqual(orphans(graph), orphans(full))
+        self.assertEqual(sorted(graph.nodes(data=True)), sorted(full.nodes(data=True)))
+        self.assertEqual(sorted(graph.edges(data=True)), sorted(full.edges(data=True)))
+        self.assertEqual(graph.graph["digests"], full.graph["digests"])
+        self.assertEqual(sorted(graph.graph["sources"]), sorted(full.graph["sources"]))
+
+    def test_update_formflow_steps(self):
+        """Step names of changed formflows no longer name templates for tests
+        """
+        test_file = sorted(glob.glob(os.path.abspath(settings["test"]["path"])))[0]
+        with open(test_file, "a") as f:
+            f.write("    Given I am on the Step 0 form\n")
+        graph = create_graph(cache_file=None)
+        formflow_files = [x for x in sorted(graph.graph["sources"]) if "/BPMWorkflowTmpl/" in x]
+        for file_name in formflow_files:
+            with open(file_name) as f:
+                text = f.read()
+            with open(file_name, "w") as f:
+                f.write(text.replace('DisplayName="Step 0"', 'DisplayName="Step Zero"'))
+        self.assertIsNotNone(update_graph(graph))
+        self.assertEqual(sorted(graph.edges(data=True)),
+                         sorted(create_graph(cache_file=None).edges(data=True)))
+        for file_name in formflow_files:
+            os.remove(file_name)
+        self.assertIsNotNone(update_graph(graph))
+        full = create_graph(cache_file=None)
+        self.assertEqual(orphans(graph), orphans(full))
+        self.assertEqual(sorted(graph.edges(data=True)), sorted(full.edges(data=True)))
+        self.assertEqual(graph.graph["lookups"], full.graph["lookups"])
+
+    def test_update_needs_build(self):
+        """Changed entities and graphs without digests need a full build
+        """
+        graph = create_graph(cache_file=None)
+        entity_file = next(x for x in sorted(graph.graph["sources"]) if "/Rules/" in x)
+        with open(entity_file, "a") as f:
+            f.write("# changed\n")
+        self.assertIsNone(update_graph(graph))
+        del graph.graph["digests"]
+        self.assertIsNone(update_graph(graph))
+
+    def test_report(self):
+        """Phases count files, bytes and property searches
+        """
+        build = GraphBuild()
+        create_graph(cache_file=None, build=build)
+        report = build.report()
+        phases = dict((phase["phase"], phase) for phase in report["phases"])
+        self.assertEqual(sum(phase["files"] for phase in report["phases"]),
+                         sum(self.counts.values()))
+        self.assertEqual(phases["Analysing templates"]["files"], self.counts["template"])
+        self.assertGreater(phases["Analysing templates"]["bytes"], 0)
+        self.assertGreater(phases["Analysing templates"]["xml_seconds"], 0)
+        self.assertGreater(phases["Analysing templates"]["fallbacks"], 0)
+        self.assertEqual(phases["Indexing"]["files"], 0)
+        for phase in report["phases"]:
+            self.assertGreaterEqual(phase["insert_seconds"], 0)
+        self.assertEqual(len(report["slowest"]), 10)
+        seconds = [entry["seconds"] for entry in report["slowest"]]
+        self.assertEqual(seconds, sorted(seconds, reverse=True))
+
+    def test_repeatable(self):
+        """The same seed writes the same tree
+        """
+        other = tempfile.mkdtemp()
+        try:
+            self.assertEqual(generate_tree(other, 100), self.counts)
+            for folder, _, files in os.walk(self.folder):
+                for name in files:
+                    with open(os.path.join(folder, name)) as f:
+                        first = f.read()
+                    with open(os.path.join(other, os.path.relpath(folder, self.folder),
+                                           name)) as f:
+                        self.assertEqual(f.read(), first)
+        finally:
+            shutil.rmtree(other)
+
+if __name__ == "__main__":
+    unittest.main()